@@ -2,11 +2,17 @@
 import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth import get_current_user
 from app.database import get_async_session
 from app.models import User, AccessToken
+from app.monitoring import get_route_stats, reset_route_stats
+from app.monitoring.profiler import FORMATS, profiler
+from app.pagination import PageParams, page_params, paginate
+from app.responses import FastJSONResponse
+from app.schemas import AdminSessionItem, AdminUserItem
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -31,7 +37,7 @@ async def check_admin_rights(
     
     # Vérifier si l'utilisateur est un superutilisateur au lieu de vérifier un email spécifique
     if not user.is_superuser:
-        logger.warning(f"Tentative d'accès admin non autorisée par {user.email}")
+        logger.warning("Tentative d'accès admin non autorisée par %s", user.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Accès non autorisé à l'espace d'administration"
@@ -43,68 +49,68 @@ async def check_admin_rights(
 @router.get("/users")
 async def get_users(
     request: Request,
+    page: PageParams = Depends(page_params),
     admin: User = Depends(check_admin_rights),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Récupère la liste de tous les utilisateurs"""
-    logger.info(f"Admin {admin.email} accède à la liste des utilisateurs")
-    
-    # Récupérer tous les utilisateurs
-    query = select(User).order_by(User.created_at.desc())
-    result = await session.execute(query)
-    users = result.scalars().all()
+    """Récupère la liste des utilisateurs (pagination par curseur)"""
+    logger.info("Admin %s accède à la liste des utilisateurs", admin.email)
+    
+    # Récupérer une page d'utilisateurs, du plus récent au plus ancien (colonnes utiles uniquement)
+    query = select(
+        User.id, User.email, User.full_name, User.is_active, User.is_verified, User.created_at,
+        User.last_login, User.oidc_sub, User.profile_picture, User.is_superuser
+    )
+    result_page = await paginate(session, query, User.created_at, User.id, page)
+    users = [
+        AdminUserItem(
+            id=user_id,
+            email=email,
+            full_name=full_name,
+            is_active=is_active,
+            is_verified=is_verified,
+            created_at=created_at,
+            last_login=last_login,
+            login_type="oauth" if oidc_sub is not None else "password",
+            profile_picture=profile_picture,
+            is_superuser=is_superuser
+        )
+        for (user_id, email, full_name, is_active, is_verified, created_at,
+             last_login, oidc_sub, profile_picture, is_superuser) in result_page.items
+    ]
     
-    return {
+    return FastJSONResponse(content={
         "success": True,
         "count": len(users),
-        "users": [
-            {
-                "id": user.id,
-                "email": user.email,
-                "full_name": user.full_name,
-                "is_active": user.is_active,
-                "is_verified": user.is_verified,
-                "created_at": user.created_at.isoformat(),
-                "last_login": user.last_login.isoformat() if user.last_login else None,
-                "login_type": "oauth" if user.is_oauth_user() else "password",
-                "profile_picture": user.profile_picture,
-                "is_superuser": user.is_superuser
-            }
-            for user in users
-        ]
-    }
+        "next_cursor": result_page.next_cursor,
+        "users": users
+    })
 
 # Route pour obtenir les sessions actives (tokens)
 @router.get("/sessions")
 async def get_sessions(
     request: Request,
+    page: PageParams = Depends(page_params),
     admin: User = Depends(check_admin_rights),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Récupère la liste des sessions actives (tokens)"""
-    logger.info(f"Admin {admin.email} accède à la liste des sessions")
-    
-    # Récupérer tous les tokens non expirés avec les infos utilisateur
-    query = select(AccessToken, User).join(User).order_by(AccessToken.created_at.desc())
-    result = await session.execute(query)
-    tokens = result.all()
-    
-    return {
+    """Récupère la liste des sessions actives (tokens), paginée par curseur"""
+    logger.info("Admin %s accède à la liste des sessions", admin.email)
+    
+    # Récupérer une page de tokens avec les infos utilisateur (colonnes utiles uniquement)
+    query = select(
+        AccessToken.id, User.id, User.email, User.full_name,
+        AccessToken.created_at, AccessToken.expires_at, User.is_active
+    ).join(User)
+    result_page = await paginate(session, query, AccessToken.created_at, AccessToken.id, page)
+    sessions = [AdminSessionItem(*row) for row in result_page.items]
+    
+    return FastJSONResponse(content={
         "success": True,
-        "count": len(tokens),
-        "sessions": [
-            {
-                "token_id": token.AccessToken.id,
-                "user_id": token.User.id,
-                "user_email": token.User.email,
-                "user_fullname": token.User.full_name,
-                "created_at": token.AccessToken.created_at.isoformat(),
-                "expires_at": token.AccessToken.expires_at.isoformat(),
-                "is_active": token.User.is_active
-            }
-            for token in tokens
-        ]
-    }
+        "count": len(sessions),
+        "next_cursor": result_page.next_cursor,
+        "sessions": sessions
+    })
 
 # Route pour révoquer un token / déconnecter un utilisateur
 @router.delete("/sessions/{token_id}")
@@ -131,7 +137,7 @@ async def revoke_session(
     await session.delete(token)
     await session.commit()
     
-    logger.info(f"Admin {admin.email} a révoqué le token {token_id} de l'utilisateur {user.email}")
+    logger.info("Admin %s a révoqué le token %s de l'utilisateur %s", admin.email, token_id, user.email)
     
     return {
         "success": True,
@@ -177,7 +183,7 @@ async def disable_user(
     
     await session.commit()
     
-    logger.info(f"Admin {admin.email} a désactivé le compte de {user.email}")
+    logger.info("Admin %s a désactivé le compte de %s", admin.email, user.email)
     
     return {
         "success": True,
@@ -207,7 +213,7 @@ async def enable_user(
     session.add(user)
     await session.commit()
     
-    logger.info(f"Admin {admin.email} a réactivé le compte de {user.email}")
+    logger.info("Admin %s a réactivé le compte de %s", admin.email, user.email)
     
     return {
         "success": True,
@@ -237,7 +243,7 @@ async def make_user_admin(
     session.add(user)
     await session.commit()
     
-    logger.info(f"Admin {admin.email} a promu {user.email} au rang d'administrateur")
+    logger.info("Admin %s a promu %s au rang d'administrateur", admin.email, user.email)
     
     return {
         "success": True,
@@ -273,9 +279,99 @@ async def remove_user_admin(
     session.add(user)
     await session.commit()
     
-    logger.info(f"Admin {admin.email} a retiré les droits d'administrateur de {user.email}")
+    logger.info("Admin %s a retiré les droits d'administrateur de %s", admin.email, user.email)
     
     return {
         "success": True,
         "message": f"Les droits d'administrateur ont été retirés à {user.email}"
-    }
\ No newline at end of file
+    }
+
+# Route pour consulter les statistiques SQL par route (détection des N+1)
+@router.get("/db-stats")
+async def get_db_stats(
+    request: Request,
+    reset: bool = False,
+    admin: User = Depends(check_admin_rights)
+):
+    """Nombre de requêtes SQL et temps base par route depuis le démarrage du worker"""
+    stats = get_route_stats()
+    if reset:
+        reset_route_stats()
+    
+    return {
+        "success": True,
+        "routes": stats
+    }
+
+# Route pour consulter l'état du profileur et la liste des profils enregistrés
+@router.get("/profiler")
+async def get_profiler(
+    request: Request,
+    admin: User = Depends(check_admin_rights)
+):
+    """État du profileur par échantillonnage (worker courant) et profils disponibles"""
+    return {
+        "success": True,
+        "profiler": profiler.status()
+    }
+
+# Route pour activer / désactiver le profileur
+@router.post("/profiler")
+async def configure_profiler(
+    request: Request,
+    enabled: bool,
+    rate: float = 1.0,
+    route: Optional[str] = None,
+    interval_ms: Optional[float] = None,
+    format: str = "collapsed",
+    admin: User = Depends(check_admin_rights)
+):
+    """
+    Active le profileur pour une fraction des requêtes (rate) et/ou une seule route
+    (gabarit, ex. /folders/{folder_id}) ; format collapsed ou speedscope
+    """
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format inconnu, formats acceptés : {', '.join(FORMATS)}"
+        )
+    
+    settings = profiler.configure(enabled, rate=rate, route=route, interval_ms=interval_ms, format=format)
+    logger.info("Admin %s a configuré le profileur : %s", admin.email, settings)
+    
+    return {
+        "success": True,
+        "profiler": profiler.status()
+    }
+
+# Route pour télécharger un profil
+@router.get("/profiler/profiles/{name}")
+async def download_profile(
+    name: str,
+    request: Request,
+    admin: User = Depends(check_admin_rights)
+):
+    """Télécharge un profil (collapsed stacks ou JSON speedscope)"""
+    path = profiler.profile_path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+# Route pour supprimer tous les profils
+@router.delete("/profiler/profiles")
+async def clear_profiles(
+    request: Request,
+    admin: User = Depends(check_admin_rights)
+):
+    """Vide l'anneau de profils"""
+    count = profiler.clear_profiles()
+    
+    return {
+        "success": True,
+        "count": count
+    }
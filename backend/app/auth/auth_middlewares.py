@@ -45,7 +45,7 @@ async def get_current_user(
     except HTTPException as e:
         return None, e.detail
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération de l'utilisateur: {str(e)}")
+        logger.error("Erreur lors de la récupération de l'utilisateur: %s", e)
         return None, "Erreur d'authentification"
 
 async def require_authenticated_user(
@@ -100,7 +100,7 @@ async def require_admin_user(
         )
     
     if not user.is_superuser:
-        logger.warning(f"Tentative d'accès admin non autorisée par {user.email}")
+        logger.warning("Tentative d'accès admin non autorisée par %s", user.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Accès non autorisé à l'espace d'administration"
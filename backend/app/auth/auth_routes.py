@@ -8,7 +8,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
 from .auth_service import AuthService
-from .auth_middlewares import get_token_from_request, get_current_user, require_authenticated_user
+from .auth_middlewares import get_token_from_request, get_current_user, require_authenticated_user, require_admin_user
 
 logger = logging.getLogger(__name__)
 
@@ -198,7 +198,7 @@ async def google_login(response: Response):
         
         return RedirectResponse(url=authorization_url)
     except Exception as e:
-        logger.error(f"Erreur lors de la génération de l'URL d'autorisation Google: {str(e)}")
+        logger.error("Erreur lors de la génération de l'URL d'autorisation Google: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur de configuration OAuth Google"
@@ -223,14 +223,14 @@ async def google_callback(
     )
     
     if error:
-        logger.error(f"Erreur d'authentification Google: {error}")
+        logger.error("Erreur d'authentification Google: %s", error)
         return RedirectResponse(f"{FRONTEND_URL}/auth/error?error=oauth_failed")
     
     # Redirection avec le token
     access_token = result["access_token"]
     
     # Log pour le débogage
-    logger.info(f"Redirection vers: {FRONTEND_URL}/auth/callback?token={access_token[:10]}...")
+    logger.info("Redirection vers: %s/auth/callback", FRONTEND_URL)
     
     # Utiliser une redirection 302 au lieu de 307
     response = RedirectResponse(
@@ -378,7 +378,7 @@ async def clean_expired_sessions(
     count = result.rowcount
     await session.commit()
     
-    logger.info(f"Admin {user.email} a supprimé {count} tokens expirés")
+    logger.info("Admin %s a supprimé %s tokens expirés", user.email, count)
     
     return {
         "message": f"{count} tokens expirés supprimés",
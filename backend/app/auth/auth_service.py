@@ -4,10 +4,11 @@ import logging
 from typing import Dict, Any, Tuple, Optional, List
 from fastapi import Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from datetime import datetime, timedelta
+from sqlalchemy import select, delete, update
+from datetime import datetime, timedelta, timezone
 
 from app.database import get_async_session
+from app.db_writer import run_write
 from app.email_utils import send_verification_email, send_reset_password_email
 from .jwt_utils import (
     create_access_token, 
@@ -69,20 +70,6 @@ class AuthService:
         if not user:
             return None, "Erreur d'authentification"
         
-        # Mettre à jour la date de dernière connexion
-        user.last_login = datetime.utcnow()
-        session.add(user)
-        
-        # Gérer les sessions multiples selon la configuration
-        if SINGLE_SESSION_MODE:
-            # Révoquer toutes les sessions existantes de l'utilisateur
-            await self.revoke_all_sessions(session, user.id)
-        else:
-            # Limiter le nombre de sessions actives (supprimer les plus anciennes si dépassé)
-            await self.enforce_session_limit(session, user.id, MAX_SESSIONS_PER_USER)
-        
-        await session.commit()
-        
         # Créer le token JWT
         token = create_access_token({
             "sub": str(user.id),
@@ -94,17 +81,33 @@ class AuthService:
             "profile_picture": user.profile_picture
         })
         
-        # Créer un enregistrement de token dans la base de données
-        access_token = AccessToken(
-            token=token,
-            user_id=user.id,
-            expires_at=datetime.utcnow() + timedelta(minutes=TOKEN_EXPIRY_MINUTES),
-            ip_address=ip_address,
-            user_agent=user_agent[:255] if user_agent else None,
-            is_valid=True
-        )
-        session.add(access_token)
-        await session.commit()
+        user_id = user.id
+        now = datetime.utcnow()
+        
+        async def open_session(db: AsyncSession):
+            # Mettre à jour la date de dernière connexion
+            await db.execute(update(User).where(User.id == user_id).values(last_login=now))
+            
+            # Gérer les sessions multiples selon la configuration
+            if SINGLE_SESSION_MODE:
+                # Révoquer toutes les sessions existantes de l'utilisateur
+                await self.revoke_all_sessions(db, user_id)
+            else:
+                # Limiter le nombre de sessions actives (supprimer les plus anciennes si dépassé)
+                await self.enforce_session_limit(db, user_id, MAX_SESSIONS_PER_USER)
+            
+            # Créer un enregistrement de token dans la base de données
+            db.add(AccessToken(
+                token=token,
+                user_id=user_id,
+                expires_at=now + timedelta(minutes=TOKEN_EXPIRY_MINUTES),
+                ip_address=ip_address,
+                user_agent=user_agent[:255] if user_agent else None,
+                is_valid=True
+            ))
+        
+        # Une seule transaction, passée par la file d'écriture (logins concurrents)
+        await run_write(open_session)
         
         return {
             "access_token": token,
@@ -147,16 +150,11 @@ class AuthService:
 
     async def logout(self, token: str, session: AsyncSession) -> bool:
         """Déconnecte un utilisateur en révoquant son token"""
-        query = select(AccessToken).where(AccessToken.token == token)
-        result = await session.execute(query)
-        access_token = result.scalar_one_or_none()
-        
-        if not access_token:
-            return False
+        async def delete_token(db: AsyncSession) -> int:
+            result = await db.execute(delete(AccessToken).where(AccessToken.token == token))
+            return result.rowcount
         
-        await session.delete(access_token)
-        await session.commit()
-        return True
+        return await run_write(delete_token) > 0
 
     async def register_user(self, 
                            provider: str, 
@@ -207,16 +205,19 @@ class AuthService:
         ip_address = self.password_provider.get_client_ip(request)
         user_agent = request.headers.get("User-Agent", "")
         
-        access_token = AccessToken(
-            token=token,
-            user_id=user.id,
-            expires_at=datetime.utcnow() + timedelta(minutes=TOKEN_EXPIRY_MINUTES),
-            ip_address=ip_address,
-            user_agent=user_agent[:255] if user_agent else None,
-            is_valid=True
-        )
-        session.add(access_token)
-        await session.commit()
+        user_id = user.id
+        
+        async def insert_token(db: AsyncSession):
+            db.add(AccessToken(
+                token=token,
+                user_id=user_id,
+                expires_at=datetime.utcnow() + timedelta(minutes=TOKEN_EXPIRY_MINUTES),
+                ip_address=ip_address,
+                user_agent=user_agent[:255] if user_agent else None,
+                is_valid=True
+            ))
+        
+        await run_write(insert_token)
         
         return {
             "access_token": token,
@@ -246,7 +247,7 @@ class AuthService:
             redirect_uri = data.get("redirect_uri", f"{os.environ.get('BACKEND_URL', 'http://localhost:8000')}/auth/google/callback")
             oauth_result, error = await self.google_provider.get_oauth_token(code, redirect_uri)
             if error:
-                logger.error(f"Erreur OAuth Google: {error}")
+                logger.error("Erreur OAuth Google: %s", error)
                 return None
             return oauth_result
         
@@ -371,11 +372,17 @@ class AuthService:
         if not db_token:
             return None, "Session invalide ou expirée"
         
-        # Vérifier si le token est expiré
-        if db_token.expires_at < datetime.utcnow():
-            db_token.is_valid = False
-            session.add(db_token)
-            await session.commit()
+        # Vérifier si le token est expiré (Postgres renvoie des dates avec fuseau, SQLite des dates naïves UTC)
+        expires_at = db_token.expires_at
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if expires_at < datetime.utcnow():
+            token_id = db_token.id
+            
+            async def invalidate_token(db: AsyncSession):
+                await db.execute(update(AccessToken).where(AccessToken.id == token_id).values(is_valid=False))
+            
+            await run_write(invalidate_token)
             return None, "Session expirée"
         
         # Décoder le JWT
@@ -398,13 +405,14 @@ class AuthService:
         
         if not user.is_active:
             # Si l'utilisateur est désactivé, on révoque toutes ses sessions
-            await self.revoke_all_sessions(session, user.id)
-            await session.commit()
+            user_id = user.id
+            
+            async def revoke_sessions(db: AsyncSession):
+                await self.revoke_all_sessions(db, user_id)
+            
+            await run_write(revoke_sessions)
             return None, "Compte désactivé"
         
-        # Mettre à jour la date de dernière utilisation
-        db_token.updated_at = datetime.utcnow()
-        session.add(db_token)
-        await session.commit()
-        
+        # Pas d'écriture sur le chemin nominal : access_tokens n'a pas de colonne updated_at,
+        # l'ancien commit de "dernière utilisation" ne persistait rien
         return user, None
\ No newline at end of file
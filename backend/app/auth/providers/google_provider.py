@@ -27,7 +27,7 @@ class GoogleOAuthProvider(AuthProvider):
         """
         Récupère le token OAuth et les informations utilisateur
         """
-        logger.info(f"Démarrage de l'échange OAuth - Code reçu: {code[:5]}...")
+        logger.info("Démarrage de l'échange OAuth")
         if not code:
             return None, "Code OAuth manquant"
         
@@ -44,7 +44,7 @@ class GoogleOAuthProvider(AuthProvider):
             
             return {"token": token_response, "user_info": user_info}, None
         except Exception as e:
-            logger.error(f"Erreur lors de l'authentification Google: {str(e)}")
+            logger.error("Erreur lors de l'authentification Google: %s", e)
             return None, f"Erreur d'authentification Google: {str(e)}"
     
     # Dans google_provider.py, modifiez la méthode _exchange_code_for_token
@@ -61,20 +61,20 @@ class GoogleOAuthProvider(AuthProvider):
             "grant_type": "authorization_code"
         }
         
-        logger.debug(f"Échange de code: URL={token_url}, redirect_uri={redirect_uri}")
-        logger.debug(f"Client ID présent: {'Oui' if GOOGLE_CLIENT_ID else 'Non'}")
+        logger.debug("Échange de code: URL=%s, redirect_uri=%s", token_url, redirect_uri)
+        logger.debug("Client ID présent: %s", 'Oui' if GOOGLE_CLIENT_ID else 'Non')
         
         try:
             # Augmentez le timeout à 30 secondes
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.post(token_url, data=data)
                 if response.status_code != 200:
-                    logger.error(f"Erreur d'échange de code: Status={response.status_code}, Réponse={response.text}")
+                    logger.error("Erreur d'échange de code: Status=%s, Réponse=%s", response.status_code, response.text)
                     return None
                 
                 return response.json()
         except Exception as e:
-            logger.error(f"Exception lors de l'échange de code: {type(e).__name__}: {str(e)}")
+            logger.error("Exception lors de l'échange de code: %s: %s", type(e).__name__, e)
             return None
     
     async def _get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
@@ -87,7 +87,7 @@ class GoogleOAuthProvider(AuthProvider):
         async with httpx.AsyncClient() as client:
             response = await client.get(user_info_url, headers=headers)
             if response.status_code != 200:
-                logger.error(f"Erreur de récupération des infos utilisateur: {response.text}")
+                logger.error("Erreur de récupération des infos utilisateur: %s", response.text)
                 return None
             
             return response.json()
@@ -125,7 +125,7 @@ class GoogleOAuthProvider(AuthProvider):
                 user.oidc_sub = sub
                 session.add(user)
                 await session.commit()
-                logger.info(f"Compte existant lié à Google: {email}")
+                logger.info("Compte existant lié à Google: %s", email)
             else:
                 # Créer un nouveau compte
                 return await self.register(session, data, request)
@@ -152,7 +152,7 @@ class GoogleOAuthProvider(AuthProvider):
             session.add(user)
             await session.commit()
         
-        logger.info(f"Authentification Google réussie pour: {email}")
+        logger.info("Authentification Google réussie pour: %s", email)
         return user, None
     
     async def register(self, 
@@ -193,5 +193,5 @@ class GoogleOAuthProvider(AuthProvider):
         await session.commit()
         await session.refresh(new_user)
         
-        logger.info(f"Nouvel utilisateur créé via Google: {email}, id: {new_user.id}")
+        logger.info("Nouvel utilisateur créé via Google: %s, id: %s", email, new_user.id)
         return new_user, None
\ No newline at end of file
@@ -41,13 +41,13 @@ class PasswordAuthProvider(AuthProvider):
         # Utilisateur introuvable
         if not user:
             login_tracker.record_attempt(ip_address, email, success=False)
-            logger.warning(f"Tentative de connexion avec un email inexistant: {email}")
+            logger.warning("Tentative de connexion avec un email inexistant: %s", email)
             return None, "Identifiants incorrects"
         
         # Vérifier que l'utilisateur est actif
         if not user.is_active:
             login_tracker.record_attempt(ip_address, email, success=False)
-            logger.warning(f"Tentative de connexion pour un compte inactif: {email}")
+            logger.warning("Tentative de connexion pour un compte inactif: %s", email)
             return None, "Compte inactif"
         
         # Vérifier le mot de passe
@@ -57,7 +57,7 @@ class PasswordAuthProvider(AuthProvider):
         
         if not verify_result[0]:
             login_tracker.record_attempt(ip_address, email, success=False)
-            logger.warning(f"Échec d'authentification pour: {email}")
+            logger.warning("Échec d'authentification pour: %s", email)
             return None, "Identifiants incorrects"
         
         # Mettre à jour le hash du mot de passe si nécessaire (rehashing)
@@ -68,7 +68,7 @@ class PasswordAuthProvider(AuthProvider):
         
         # Authentification réussie
         login_tracker.record_attempt(ip_address, email, success=True)
-        logger.info(f"Authentification réussie pour: {email}")
+        logger.info("Authentification réussie pour: %s", email)
         return user, None
     
     async def register(self, 
@@ -86,14 +86,14 @@ class PasswordAuthProvider(AuthProvider):
         # Vérifier la robustesse du mot de passe
         is_valid, error_message = validate_password_strength(password)
         if not is_valid:
-            logger.warning(f"Tentative d'inscription avec un mot de passe faible pour: {email}")
+            logger.warning("Tentative d'inscription avec un mot de passe faible pour: %s", email)
             return None, error_message
         
         # Vérifier si l'email existe déjà
         query = select(User).where(User.email == email)
         result = await session.execute(query)
         if result.scalar_one_or_none():
-            logger.warning(f"Tentative d'inscription avec un email déjà utilisé: {email}")
+            logger.warning("Tentative d'inscription avec un email déjà utilisé: %s", email)
             return None, "Cet email est déjà utilisé"
         
         # Créer le hash du mot de passe
@@ -113,5 +113,5 @@ class PasswordAuthProvider(AuthProvider):
         await session.commit()
         await session.refresh(new_user)
         
-        logger.info(f"Nouvel utilisateur créé: {email}, id: {new_user.id}")
+        logger.info("Nouvel utilisateur créé: %s, id: %s", email, new_user.id)
         return new_user, None
\ No newline at end of file
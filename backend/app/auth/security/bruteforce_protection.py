@@ -68,13 +68,13 @@ class LoginAttemptTracker:
         # Vérifier si l'IP est bloquée
         if ip in self.blocked_ips and self.blocked_ips[ip] > now:
             remaining = (self.blocked_ips[ip] - now).total_seconds() / 60
-            logger.warning(f"Tentative depuis une IP bloquée: {ip}. Déblocage dans {remaining:.1f} minutes.")
+            logger.warning("Tentative depuis une IP bloquée: %s. Déblocage dans %.1f minutes.", ip, remaining)
             return True
         
         # Vérifier si l'identifiant est bloqué
         if identifier and identifier in self.blocked_identifiers and self.blocked_identifiers[identifier] > now:
             remaining = (self.blocked_identifiers[identifier] - now).total_seconds() / 60
-            logger.warning(f"Tentative pour un identifiant bloqué: {identifier}. Déblocage dans {remaining:.1f} minutes.")
+            logger.warning("Tentative pour un identifiant bloqué: %s. Déblocage dans %.1f minutes.", identifier, remaining)
             return True
         
         return False
@@ -111,13 +111,13 @@ class LoginAttemptTracker:
         if len(self.ip_attempts.get(ip, [])) >= self.max_attempts:
             block_until = now + self.block_duration
             self.blocked_ips[ip] = block_until
-            logger.warning(f"IP bloquée pour trop de tentatives: {ip}. Bloquée jusqu'à {block_until}")
+            logger.warning("IP bloquée pour trop de tentatives: %s. Bloquée jusqu'à %s", ip, block_until)
         
         # Bloquer l'identifiant si trop de tentatives
         if identifier and len(self.identifier_attempts.get(identifier, [])) >= self.max_attempts:
             block_until = now + self.block_duration
             self.blocked_identifiers[identifier] = block_until
-            logger.warning(f"Identifiant bloqué pour trop de tentatives: {identifier}. Bloqué jusqu'à {block_until}")
+            logger.warning("Identifiant bloqué pour trop de tentatives: %s. Bloqué jusqu'à %s", identifier, block_until)
 
     def reset_attempts(self, ip: str = None, identifier: str = None):
         """Réinitialise les tentatives pour une IP et/ou un identifiant"""
@@ -1,5 +1,12 @@
 # app/base.py
+from sqlalchemy import JSON, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
-    __allow_unmapped__ = True  # Important pour SQLAlchemy 2.x
\ No newline at end of file
+    __allow_unmapped__ = True  # Important pour SQLAlchemy 2.x
+
+# Types portables : JSONB / tableaux natifs sur Postgres (indexables, opérateurs côté serveur),
+# repli en JSON texte sur SQLite. Côté Python, les valeurs sont des dict / list dans les deux cas.
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+IntArray = JSON().with_variant(ARRAY(Integer), "postgresql")
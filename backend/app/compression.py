@@ -0,0 +1,197 @@
+# app/compression.py
+# Compression des réponses (brotli si le module est installé, sinon gzip) :
+# - seuil de taille minimal pour les réponses complètes ;
+# - liste blanche de types de contenu (JSON, NDJSON, SSE, texte) ;
+# - flux (SSE/NDJSON) : chaque morceau est compressé puis vidé (sync flush) pour être
+#   transmis immédiatement au lieu d'être retenu dans le tampon du compresseur ;
+# - niveaux configurables ; les gros corps sont compressés hors de la boucle d'événements ;
+# - Vary: Accept-Encoding sur toute réponse d'un type compressible, compressée ou non.
+import zlib
+from typing import Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_THREAD_THRESHOLD,
+)
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle : gzip uniquement
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Choisit br puis gzip parmi les encodages acceptés (q=0 exclut)"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if brotli_available and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Compresseur incrémental : chunk() vide le tampon après chaque morceau, finish() termine le flux"""
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = en-tête gzip
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compression des réponses (voir l'en-tête du module)"""
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        thread_threshold: int = COMPRESSION_THREAD_THRESHOLD,
+        content_types: Tuple[str, ...] = COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.thread_threshold = thread_threshold
+        self.content_types = content_types
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    message = self._vary_start(message)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                message = self._vary_start(message)
+                headers = Headers(raw=message.get("headers", []))
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or not content_type.startswith(self.content_types)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # En-têtes retenus jusqu'au premier morceau : on ne sait pas encore si on compresse
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                # Suite d'un flux compressé
+                data = compressor.chunk(body) if more_body else compressor.finish(body)
+                await send({**message, "body": data})
+                return
+
+            if not more_body:
+                # Réponse complète : compressée seulement au-delà du seuil
+                if len(body) < self.minimum_size:
+                    await send(start_message)
+                    await send(message)
+                    return
+                if len(body) >= self.thread_threshold:
+                    data = await anyio.to_thread.run_sync(
+                        compress_body, body, encoding, self.gzip_level, self.brotli_quality
+                    )
+                else:
+                    data = compress_body(body, encoding, self.gzip_level, self.brotli_quality)
+                await send(self._compressed_start(start_message, encoding, len(data)))
+                await send({**message, "body": data})
+                return
+
+            # Premier morceau d'un flux : taille totale inconnue, compression morceau par morceau
+            compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+            await send(self._compressed_start(start_message, encoding, None))
+            await send({**message, "body": compressor.chunk(body)})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _vary_start(self, message):
+        """
+        Vary: Accept-Encoding sur toute réponse d'un type compressible, compressée ou non :
+        un cache partagé ne doit pas servir la variante identité à un client qui accepte gzip,
+        ni l'inverse
+        """
+        raw_headers = list(message.get("headers", []))
+        headers = MutableHeaders(raw=raw_headers)
+        if not headers.get("content-type", "").startswith(self.content_types):
+            return message
+        headers.add_vary_header("Accept-Encoding")
+        return {**message, "headers": raw_headers}
+
+    @staticmethod
+    def _compressed_start(message, encoding: str, length: Optional[int]):
+        raw_headers = list(message.get("headers", []))
+        headers = MutableHeaders(raw=raw_headers)
+        headers["Content-Encoding"] = encoding
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        # Le contenu transmis n'est plus octet pour octet celui de l'ETag fort
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return {**message, "headers": raw_headers}
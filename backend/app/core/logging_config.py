@@ -0,0 +1,220 @@
+# app/core/logging_config.py
+# Journalisation non bloquante : les handlers des modules déposent les enregistrements dans une
+# file bornée (QueueHandler) ; un thread dédié (QueueListener) les formate en JSON et les écrit.
+# Aucune écriture sur stderr n'a lieu dans la boucle d'événements.
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.core.config import (
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_QUEUE_SIZE,
+)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Identifiant de la requête HTTP en cours, ajouté à chaque enregistrement émis pendant son traitement
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributs standards d'un LogRecord : tout le reste provient de extra={...} et part dans le JSON
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def parse_log_levels(spec: str) -> Dict[str, str]:
+    """'app.pdf=DEBUG,sqlalchemy.engine=WARNING' -> {"app.pdf": "DEBUG", "sqlalchemy.engine": "WARNING"}"""
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class RequestIdFilter(logging.Filter):
+    """Copie l'identifiant de requête dans l'enregistrement, dans le thread émetteur (le ContextVar n'existe pas côté listener)"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Échantillonne les enregistrements de niveau <= DEBUG (rate = fraction conservée) ;
+    les niveaux supérieurs passent toujours. Appliqué avant la mise en file.
+    """
+    def __init__(self, rate: float, level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler sur file bornée : si le listener ne suit pas, l'enregistrement est abandonné
+    (et compté) plutôt que de bloquer la requête. Le formatage (JSON) est laissé au listener.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Seule l'interpolation du message est faite ici : les arguments peuvent être modifiés
+        # après l'appel. La traceback est figée pour la même raison.
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement"""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        elif record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible pour le développement local (LOG_FORMAT=text)"""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = None
+        return super().format(record)
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    log_format: str = LOG_FORMAT,
+    levels: str = LOG_LEVELS,
+    sample_rate: float = LOG_DEBUG_SAMPLE_RATE,
+    stream=None,
+) -> NonBlockingQueueHandler:
+    """
+    Configure la journalisation de tout le processus (idempotent) : un QueueHandler sur le logger
+    racine, un QueueListener qui écrit sur stderr, les niveaux par module issus de LOG_LEVELS.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    # uvicorn installe ses propres handlers synchrones : tout passe par la file
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    for name, module_level in parse_log_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = queue_handler
+    return queue_handler
+
+
+def shutdown_logging() -> None:
+    """Vide la file et arrête le thread d'écriture (arrêt de l'application)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None and _queue_handler.dropped:
+        sys.stderr.write(f"{_queue_handler.dropped} lignes de journal abandonnées (file pleine)\n")
+        _queue_handler.dropped = 0
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI : reprend l'en-tête X-Request-ID entrant (proxy, frontend) ou en génère un,
+    l'expose dans le contexte de journalisation et le renvoie dans la réponse.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -1,18 +1,113 @@
 # app/database.py
-from typing import AsyncGenerator
+import os
+from typing import AsyncGenerator, Optional
+from alembic import command
+from alembic.config import Config
 from fastapi import Depends
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.base import Base
+from app.core.config import (
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PREPARE_THRESHOLD,
+    DB_QUERY_CACHE_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_PROFILE,
+)
 from app.models import User
 
-DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-engine = create_async_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Clé du verrou consultatif Postgres qui sérialise les migrations entre workers au démarrage
+MIGRATION_LOCK_KEY = 727_001
+
+def normalize_database_url(url: str, sync: bool = False) -> str:
+    """
+    Normalise l'URL de connexion : schémas postgres:// (Fly, Heroku) vers le driver psycopg,
+    et driver synchrone équivalent pour Alembic et les scripts (sync=True).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if backend in ("postgres", "postgresql"):
+        # psycopg 3 fournit à la fois le driver synchrone et asynchrone
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite" if sync else "sqlite+aiosqlite")
+
+    return parsed.render_as_string(hide_password=False)
+
+def _engine_options(url: str, **overrides) -> dict:
+    """Options du moteur selon le backend (pool et cache pour Postgres)"""
+    backend = make_url(url).get_backend_name()
+    options = {
+        "echo": DB_ECHO,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    elif backend == "postgresql":
+        options["connect_args"] = {
+            "prepare_threshold": DB_PREPARE_THRESHOLD,
+            # Les dates naïves de l'application sont en UTC
+            "options": "-c timezone=utc",
+            "application_name": "pdf-qcm-generator",
+        }
+        options["pool_pre_ping"] = True
+        if "poolclass" not in overrides:
+            options.update(
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+            )
+
+    options.update(overrides)
+    return options
+
+def apply_sqlite_profile(sync_engine: Engine) -> None:
+    """
+    Profil SQLite de production : WAL (lecteurs non bloqués par l'écrivain), fsync allégé
+    (synchronous=NORMAL, sûr en WAL), cache et mmap élargis, attente sur verrou plutôt qu'erreur.
+    """
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+def create_engine_from_url(url: Optional[str] = None, sqlite_profile: Optional[bool] = None, **overrides) -> AsyncEngine:
+    """Fabrique du moteur asynchrone partagée par l'application et les scripts (make_admin.py)"""
+    url = normalize_database_url(url or DATABASE_URL)
+    async_engine = create_async_engine(url, **_engine_options(url, **overrides))
+    if async_engine.dialect.name == "sqlite" and (SQLITE_PROFILE if sqlite_profile is None else sqlite_profile):
+        apply_sqlite_profile(async_engine.sync_engine)
+    return async_engine
+
+def create_sync_engine_from_url(url: Optional[str] = None, sqlite_profile: Optional[bool] = None, **overrides) -> Engine:
+    """Équivalent synchrone de create_engine_from_url, utilisé par les migrations Alembic"""
+    url = normalize_database_url(url or DATABASE_URL, sync=True)
+    sync_engine = create_engine(url, **_engine_options(url, **overrides))
+    if sync_engine.dialect.name == "sqlite" and (SQLITE_PROFILE if sqlite_profile is None else sqlite_profile):
+        apply_sqlite_profile(sync_engine)
+    return sync_engine
+
+engine = create_engine_from_url()
 
 async_session_maker = sessionmaker(
     engine,
@@ -20,13 +115,31 @@ async_session_maker = sessionmaker(
     expire_on_commit=False
 )
 
+def get_alembic_config() -> Config:
+    """Configuration Alembic indépendante du répertoire courant"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+def run_migrations(connection, revision: str = "head"):
+    """Applique la chaîne de migrations Alembic sur une connexion synchrone"""
+    if connection.dialect.name == "postgresql":
+        # Plusieurs workers démarrent en même temps : un seul applique les migrations,
+        # les autres attendent la fin de sa transaction puis n'ont plus rien à faire
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    config = get_alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
 async def create_db_and_tables():
+    # Le schéma est géré par les migrations (backend/migrations) et non plus par create_all
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
-    yield SQLAlchemyUserDatabase(session, User)
\ No newline at end of file
+    yield SQLAlchemyUserDatabase(session, User)
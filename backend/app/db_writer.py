@@ -0,0 +1,148 @@
+# app/db_writer.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import SQLITE_WRITE_BATCH_SIZE, SQLITE_WRITE_BATCH_WINDOW_MS, SQLITE_WRITE_QUEUE
+from app.database import async_session_maker, engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Une écriture : coroutine qui reçoit la session de l'écrivain et ne fait pas de commit elle-même.
+# Elle peut être rejouée (lot en échec) : les objets ORM doivent être construits à l'intérieur.
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteQueue:
+    """
+    File d'écriture sérialisée pour SQLite : une seule tâche exécute les écritures,
+    en regroupant celles en attente dans une même transaction (un seul fsync par lot).
+    Un seul écrivain signifie qu'aucune écriture ne se bat pour le verrou de la base ;
+    les lecteurs (WAL) ne sont jamais bloqués.
+    """
+    def __init__(self, session_maker, batch_size: int, batch_window: float):
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="sqlite-writer")
+        logger.info("File d'écriture SQLite démarrée")
+
+    async def stop(self):
+        """Termine les écritures déjà soumises puis arrête la tâche"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("File d'écriture SQLite arrêtée")
+
+    async def submit(self, work: WriteJob) -> T:
+        """Soumet une écriture et attend son commit ; renvoie le résultat de la coroutine"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((work, future))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect_batch(first)
+            try:
+                await self._execute_batch(batch)
+            except Exception as e:
+                # Ne jamais laisser mourir l'écrivain
+                logger.exception("Erreur inattendue dans la file d'écriture")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _collect_batch(self, first) -> Tuple[List, bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._batch_window
+        while len(batch) < self._batch_size:
+            try:
+                if self._queue.empty() and self._batch_window > 0:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _execute_batch(self, batch: List):
+        if len(batch) > 1:
+            try:
+                async with self._session_maker() as session:
+                    results = [await work(session) for work, _ in batch]
+                    await session.commit()
+            except Exception:
+                # Une écriture du lot a échoué : tout est annulé, on rejoue une par une
+                # pour que seule l'écriture fautive reçoive l'erreur
+                logger.warning("Échec d'un lot de %s écritures, rejeu individuel", len(batch), exc_info=True)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+                return
+
+        for work, future in batch:
+            try:
+                async with self._session_maker() as session:
+                    result = await work(session)
+                    await session.commit()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+
+write_queue = WriteQueue(
+    async_session_maker,
+    batch_size=SQLITE_WRITE_BATCH_SIZE,
+    batch_window=SQLITE_WRITE_BATCH_WINDOW_MS / 1000
+)
+
+
+def write_queue_enabled() -> bool:
+    """La file n'a d'intérêt que pour SQLite (un seul écrivain possible) ; Postgres gère la concurrence"""
+    return SQLITE_WRITE_QUEUE and engine.dialect.name == "sqlite"
+
+
+async def run_write(work: WriteJob) -> T:
+    """
+    Exécute une écriture dans sa propre transaction : via la file d'écriture si elle tourne,
+    sinon directement dans une nouvelle session (Postgres, scripts).
+    """
+    if write_queue.running:
+        return await write_queue.submit(work)
+
+    async with async_session_maker() as session:
+        result = await work(session)
+        await session.commit()
+        return result
@@ -36,10 +36,10 @@ def send_email(to_email: str, subject: str, html_content: str) -> bool:
             if SMTP_USER and SMTP_PASSWORD:
                 server.login(SMTP_USER, SMTP_PASSWORD)
             server.sendmail(msg["From"], [to_email], msg.as_string())
-            logger.info(f"Email envoyé à {to_email}")
+            logger.info("Email envoyé à %s", to_email)
             return True
     except Exception as e:
-        logger.error(f"Erreur d'envoi d'e-mail SMTP : {e}")
+        logger.error("Erreur d'envoi d'e-mail SMTP : %s", e)
         return False
 
 def send_verification_email(email: str, token: str) -> bool:
@@ -2,12 +2,15 @@ import os
 import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body
-from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from app.database import get_async_session
 from app.auth import get_current_user
 from app.models import User, Folder, PDF
+from app.pagination import PageParams, page_params, paginate
+from app.http_cache import bump_data_version, if_none_match, list_etag, not_modified, with_etag
+from app.responses import FastJSONResponse
+from app.schemas import FolderItem
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -30,7 +33,7 @@ async def create_folder(
         # Vérifier l'authentification de l'utilisateur
         current_user, error = await get_current_user(request, session)
         if error:
-            logger.error(f"Authentication error: {error}")
+            logger.error("Authentication error: %s", error)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=error,
@@ -61,13 +64,14 @@ async def create_folder(
         )
         
         session.add(new_folder)
+        await bump_data_version(session, current_user.id)
         await session.commit()
         await session.refresh(new_folder)
         
-        logger.info(f"Folder created successfully. ID: {new_folder.id}, User: {current_user.id}")
+        logger.info("Folder created successfully. ID: %s, User: %s", new_folder.id, current_user.id)
         
         # Renvoyer une réponse JSON
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
@@ -81,7 +85,7 @@ async def create_folder(
         # Relancer les HTTPException telles quelles
         raise he
     except Exception as e:
-        logger.exception(f"Error creating folder: {str(e)}")
+        logger.exception("Error creating folder: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la création du dossier: {str(e)}"
@@ -92,10 +96,11 @@ async def create_folder(
 async def list_folders(
     request: Request,
     parent_id: Optional[int] = None,
+    page: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Récupère tous les dossiers d'un utilisateur
+    Récupère les dossiers d'un utilisateur (pagination par curseur)
     Si parent_id est fourni, récupère uniquement les dossiers enfants du dossier spécifié
     """
     # Vérifier l'authentification de l'utilisateur
@@ -107,9 +112,14 @@ async def list_folders(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Liste inchangée depuis la dernière visite : 304 sans exécuter la requête de liste
+    etag = list_etag(request, current_user)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    
     try:
-        # Requête pour récupérer les dossiers de l'utilisateur
-        query = select(Folder).where(Folder.user_id == current_user.id)
+        # Requête pour récupérer les dossiers de l'utilisateur (colonnes utiles uniquement)
+        query = select(Folder.id, Folder.name, Folder.created_at).where(Folder.user_id == current_user.id)
         
         # Si parent_id est fourni, filtrer par parent_id
         if parent_id is not None:
@@ -118,40 +128,43 @@ async def list_folders(
             # Sinon, récupérer les dossiers racine (sans parent)
             query = query.where(Folder.parent_id == None)
         
-        result = await session.execute(query)
-        folders = result.scalars().all()
+        result_page = await paginate(session, query, Folder.created_at, Folder.id, page)
         
-        folder_list = []
-        for folder in folders:
-            # Compter le nombre d'éléments dans le dossier (sous-dossiers et fichiers)
-            subfolders_query = select(Folder).where(Folder.parent_id == folder.id)
-            subfolders_result = await session.execute(subfolders_query)
-            subfolder_count = len(subfolders_result.scalars().all())
-            
-            # Compter le nombre de fichiers dans le dossier
-            files_query = select(PDF).where(PDF.folder_id == folder.id)
-            files_result = await session.execute(files_query)
-            file_count = len(files_result.scalars().all())
+        # Compter les éléments (sous-dossiers et fichiers) de tous les dossiers de la page
+        # en deux requêtes groupées plutôt que deux requêtes par dossier
+        folder_list = [FolderItem(*row) for row in result_page.items]
+        folder_ids = [folder.id for folder in folder_list]
+        subfolder_counts = {}
+        file_counts = {}
+        if folder_ids:
+            subfolders_query = select(Folder.parent_id, func.count()).where(
+                Folder.parent_id.in_(folder_ids)
+            ).group_by(Folder.parent_id)
+            subfolder_counts = dict((await session.execute(subfolders_query)).all())
             
-            folder_list.append({
-                "id": folder.id,
-                "name": folder.name,
-                "created_at": folder.created_at.isoformat(),
-                "subfolder_count": subfolder_count,
-                "file_count": file_count
-            })
+            files_query = select(PDF.folder_id, func.count()).where(
+                PDF.folder_id.in_(folder_ids)
+            ).group_by(PDF.folder_id)
+            file_counts = dict((await session.execute(files_query)).all())
+        
+        for folder in folder_list:
+            folder.subfolder_count = subfolder_counts.get(folder.id, 0)
+            folder.file_count = file_counts.get(folder.id, 0)
         
-        return JSONResponse(
+        return with_etag(FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
                 "count": len(folder_list),
-                "folders": folder_list
+                "folders": folder_list,
+                "next_cursor": result_page.next_cursor
             }
-        )
+        ), etag)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving folders: {str(e)}")
+        logger.error("Error retrieving folders: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la récupération des dossiers: {str(e)}"
@@ -243,11 +256,12 @@ async def delete_folder(
         
         # Supprimer le dossier principal
         await session.delete(folder)
+        await bump_data_version(session, current_user.id)
         await session.commit()
         
-        logger.info(f"Folder deleted successfully. ID: {folder_id}, User: {current_user.id}")
+        logger.info("Folder deleted successfully. ID: %s, User: %s", folder_id, current_user.id)
         
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
@@ -258,7 +272,7 @@ async def delete_folder(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting folder: {str(e)}")
+        logger.error("Error deleting folder: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression du dossier: {str(e)}"
@@ -304,10 +318,11 @@ async def update_folder(
         # Renommer le dossier
         folder.name = name
         session.add(folder)
+        await bump_data_version(session, current_user.id)
         await session.commit()
         await session.refresh(folder)
         
-        logger.info(f"Folder renamed successfully. ID: {folder_id}, User: {current_user.id}")
+        logger.info("Folder renamed successfully. ID: %s, User: %s", folder_id, current_user.id)
         
         # Compter les sous-dossiers et fichiers pour la réponse
         subfolders_query = select(Folder).where(Folder.parent_id == folder.id)
@@ -330,7 +345,7 @@ async def update_folder(
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error updating folder: {str(e)}")
+        logger.error("Error updating folder: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour du dossier: {str(e)}"
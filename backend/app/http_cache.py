@@ -0,0 +1,67 @@
+# app/http_cache.py
+# GET conditionnels pour les listes de l'utilisateur : chaque utilisateur porte un compteur de
+# version (users.data_version) incrémenté dans la même transaction que toute modification de
+# ses dossiers, PDFs ou quiz. L'ETag d'une liste dérive de ce compteur et de l'URL ; il est connu dès
+# l'authentification (l'utilisateur est déjà chargé), donc un 304 ne coûte aucune requête de liste.
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+# Revalidation systématique auprès du serveur, jamais de cache partagé (données par utilisateur)
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_data_version(db: AsyncSession, user_id: int) -> None:
+    """À appeler dans la transaction de toute modification visible dans les listes de l'utilisateur"""
+    await db.execute(
+        update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+    )
+
+
+def list_etag(request: Request, user: User) -> str:
+    """ETag fort : utilisateur, version de ses données et représentation demandée (chemin + paramètres)"""
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{user.id}:{request.url.path}?{query}".encode()).hexdigest()[:16]
+    return f'"v{user.data_version}-{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """ETag fort dérivé du contenu, pour les réponses sans compteur de version"""
+    return f'"{hashlib.sha1(body).hexdigest()[:24]}"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Vrai si l'ETag courant figure dans If-None-Match (comparaison faible, RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def conditional_response(request: Request, response: Response, etag: Optional[str] = None) -> Response:
+    """Réponse déjà rendue : 304 si le client a la même version, sinon la réponse avec son ETag"""
+    etag = etag or content_etag(response.body)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    return with_etag(response, etag)
@@ -5,27 +5,40 @@ import os
 from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from app.database import create_db_and_tables, get_async_session
+from app.database import create_db_and_tables, get_async_session, engine
+from app.db_writer import write_queue, write_queue_enabled
 from app.auth import router as auth_router
 from app.auth import get_current_user
 from app.pdf import router as pdf_router  # Importer le router PDF
+from app.pdf import processing_queue, start_upload_janitor, stop_upload_janitor
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.admin import router as admin_router
 from app.folders import router as folders_router  # Ajoutez cette ligne
+from app.quiz import router as quiz_router
+from app.quiz import review_router
+from app.qcm import router as qcm_router
+from app.monitoring import PrometheusMiddleware, QueryStatsMiddleware, instrument_engine, mark_worker_dead
+from app.monitoring import metrics_router
+from app.core.logging_config import RequestIdMiddleware, setup_logging
+from app.monitoring.profiler import ProfilingMiddleware
+from app.responses import FastJSONResponse
+from app.http_cache import conditional_response
+from app.compression import CompressionMiddleware
+from app.core.config import COMPRESSION_ENABLED
 
-# Logging
-logging.basicConfig(level=logging.DEBUG)
+# Logging : JSON via une file (écriture hors boucle d'événements), niveaux depuis LOG_LEVEL/LOG_LEVELS
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Configuration
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 # Dans main.py, après load_dotenv()
-logger.info(f"GOOGLE_CLIENT_ID présent: {'Oui' if os.environ.get('GOOGLE_CLIENT_ID') else 'Non'}")
-logger.info(f"GOOGLE_CLIENT_SECRET présent: {'Oui' if os.environ.get('GOOGLE_CLIENT_SECRET') else 'Non'}")
+logger.info("GOOGLE_CLIENT_ID présent: %s", 'Oui' if os.environ.get('GOOGLE_CLIENT_ID') else 'Non')
+logger.info("GOOGLE_CLIENT_SECRET présent: %s", 'Oui' if os.environ.get('GOOGLE_CLIENT_SECRET') else 'Non')
 
-# Application FastAPI
-app = FastAPI()
+# Application FastAPI (réponses sérialisées par orjson par défaut)
+app = FastAPI(default_response_class=FastJSONResponse)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", reload=True, log_level="debug")
@@ -35,11 +48,31 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=[FRONTEND_URL],
     allow_credentials=True,
-    allow_methods=["OPTIONS", "GET", "POST", "DELETE", "PUT"],  # Ajout de DELETE et PUT pour les opérations PDF
-    allow_headers=["Authorization-Tunnel", "Content-Type", "Authorization"],
-    expose_headers=["Authorization-Tunnel", "Location"]
+    allow_methods=["OPTIONS", "GET", "HEAD", "POST", "PATCH", "DELETE", "PUT"],  # PATCH/HEAD : uploads reprenables (tus)
+    allow_headers=["Authorization-Tunnel", "Content-Type", "Authorization", "X-Request-ID",
+                   "Tus-Resumable", "Upload-Length", "Upload-Metadata", "Upload-Offset"],
+    expose_headers=["Authorization-Tunnel", "Location", "X-DB-Query-Count", "X-DB-Query-Time-Ms", "X-Request-ID",
+                    "Tus-Resumable", "Tus-Version", "Tus-Max-Size", "Tus-Extension",
+                    "Upload-Offset", "Upload-Length", "Upload-Expires", "Upload-PDF-Id"]
 )
 
+# Compteur de requêtes SQL / temps base par requête HTTP et journal des requêtes lentes
+instrument_engine(engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# Compression des réponses JSON/texte (seuil, flux SSE/NDJSON vidés morceau par morceau)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Métriques Prometheus (latence, taille, statut par route) exposées sur /metrics
+app.add_middleware(PrometheusMiddleware)
+
+# Profileur par échantillonnage, inactif tant qu'un administrateur ne l'active pas (/admin/profiler)
+app.add_middleware(ProfilingMiddleware)
+
+# Identifiant de corrélation X-Request-ID dans chaque ligne de journal (middleware le plus externe)
+app.add_middleware(RequestIdMiddleware)
+
 # Route pour obtenir les informations de l'utilisateur actuel
 @app.get("/custom/me")
 async def get_current_user_info(
@@ -55,7 +88,7 @@ async def get_current_user_info(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    return {
+    response = FastJSONResponse(content={
         "id": user.id,
         "email": user.email,
         "full_name": user.full_name,
@@ -63,7 +96,10 @@ async def get_current_user_info(
         "is_active": user.is_active,
         "is_verified": user.is_verified,
         "is_superuser": user.is_superuser
-    }
+    })
+    
+    # Profil inchangé : 304 (ETag dérivé du contenu, déjà calculé sans requête supplémentaire)
+    return conditional_response(request, response)
 
 # Inclure les routes d'authentification
 app.include_router(auth_router)
@@ -75,6 +111,14 @@ app.include_router(admin_router)
 
 app.include_router(folders_router)
 
+app.include_router(quiz_router)
+
+app.include_router(review_router)
+
+app.include_router(qcm_router)
+
+app.include_router(metrics_router)
+
 @app.on_event("startup")
 async def startup_event():
     # Créer le dossier pour les PDFs s'il n'existe pas
@@ -82,8 +126,25 @@ async def startup_event():
     os.makedirs(pdf_upload_dir, exist_ok=True)
     
     await create_db_and_tables()
+    
+    # SQLite : toutes les écritures chaudes passent par un écrivain unique
+    if write_queue_enabled():
+        await write_queue.start()
+    
+    # Purge périodique des uploads reprenables abandonnés
+    start_upload_janitor()
+    
+    # Traitement des PDFs en arrière-plan (reprend les PDFs non traités)
+    await processing_queue.start()
     logger.info("Application started and ready to receive requests.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_upload_janitor()
+    await processing_queue.stop()
+    await write_queue.stop()
+    mark_worker_dead()
+
 @app.get("/")
 def root():
     logger.debug("Access to root route /")
@@ -98,5 +159,5 @@ async def protected_route(
     if error:
         raise HTTPException(status_code=401, detail=error)
     
-    logger.debug(f"Access to protected route by {user.email}")
+    logger.debug("Access to protected route by %s", user.email)
     return {"message": f"Welcome {user.email}!"}
\ No newline at end of file
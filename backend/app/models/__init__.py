@@ -1,5 +1,9 @@
 from app.models.user_model import User, AccessToken
 from app.models.pdf_model import PDF
 from app.models.folder_model import Folder
+from app.models.upload_model import UploadSession
+from app.models.quiz_model import Quiz, Question, QuizAttempt, QuestionStats
+from app.models.review_model import ReviewCard
+from app.models.qcm_model import QCMChunkResult, QCMDocumentChunks, LLMUsage, LLMUsageDaily, QCMGenerationLease
 
-__all__ = ["User", "AccessToken", "PDF", "Folder"]
\ No newline at end of file
+__all__ = ["User", "AccessToken", "PDF", "Folder", "UploadSession", "Quiz", "Question", "QuizAttempt", "QuestionStats", "ReviewCard", "QCMChunkResult", "QCMDocumentChunks", "LLMUsage", "LLMUsageDaily", "QCMGenerationLease"]
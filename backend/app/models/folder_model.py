@@ -1,12 +1,18 @@
 # app/models/folder_model.py
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, ForeignKey, String, DateTime, Text, func, Integer
+from sqlalchemy import Column, ForeignKey, String, DateTime, Text, Index, func, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.base import Base
 
 class Folder(Base):
     __tablename__ = "folders"
+    __table_args__ = (
+        # Liste paginée des dossiers d'un niveau (WHERE user_id AND parent_id ORDER BY created_at, id)
+        Index("ix_folders_user_id_parent_id_created_at", "user_id", "parent_id", "created_at"),
+        # Sous-dossiers d'un dossier (comptage, suppression récursive)
+        Index("ix_folders_parent_id", "parent_id"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
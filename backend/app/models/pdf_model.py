@@ -1,18 +1,28 @@
 # app/models/pdf_model.py
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import ForeignKey, String, Boolean, Integer, DateTime, Text, func
+from sqlalchemy import ForeignKey, String, Boolean, Integer, DateTime, Text, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.base import Base
 
 class PDF(Base):
     __tablename__ = "pdfs"
+    __table_args__ = (
+        # Liste paginée des PDFs d'un utilisateur (WHERE user_id ORDER BY upload_date, id)
+        Index("ix_pdfs_user_id_upload_date", "user_id", "upload_date"),
+        # Comptage / détachement des fichiers d'un dossier
+        Index("ix_pdfs_folder_id", "folder_id"),
+        # Empreinte du contenu : ETag du fichier, caches par document
+        Index("ix_pdfs_content_hash", "content_hash"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     original_filename: Mapped[str] = mapped_column(String(255), nullable=False)
     filepath: Mapped[str] = mapped_column(String(1024), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)  # en octets
+    # SHA-256 du fichier (hexadécimal) ; calculé à la volée pour les PDFs importés avant son ajout
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     upload_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     
@@ -25,6 +35,8 @@ class PDF(Base):
     
     # Statut du fichier
     is_processed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Reprise au démarrage réclamée par un worker (app/pdf/pdf_processing.py)
+    processing_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Métadonnées supplémentaires
     title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
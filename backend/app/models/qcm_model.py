@@ -0,0 +1,91 @@
+# app/models/qcm_model.py
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.base import Base
+
+class QCMChunkResult(Base):
+    """
+    Questions générées pour un morceau de texte (app/qcm/cache.py) : une génération qui retombe
+    sur le même texte avec le même modèle ne rappelle pas le LLM
+    """
+    __tablename__ = "qcm_chunk_results"
+    
+    # sha256 (hexadécimal) de la version du prompt, du modèle et du texte
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Liste JSON de questions au format QuestionCreate
+    questions: Mapped[str] = mapped_column(Text, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class QCMDocumentChunks(Base):
+    """
+    Découpage d'un document (app/qcm/cache.py) : texte nettoyé, découpé selon ses sections,
+    par empreinte du fichier. Un PDF déjà traité, ou partagé par plusieurs utilisateurs,
+    n'est ni relu ni redécoupé
+    """
+    __tablename__ = "qcm_document_chunks"
+    
+    # sha256 (hexadécimal) de l'empreinte du PDF et des paramètres de découpage
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Origine des titres : outline, fonts, text ou none
+    structure: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Liste JSON des morceaux (texte, pages, tokens, titre) et rapport de nettoyage
+    chunks: Mapped[str] = mapped_column(Text, nullable=False)
+    normalization: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class LLMUsage(Base):
+    """Journal des appels au LLM (ajout seulement) : tokens facturés par utilisateur et par génération"""
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        # Historique d'un utilisateur, reconstruction des agrégats d'une période
+        Index("ix_llm_usage_user_id_created_at", "user_id", "created_at"),
+        # Consommation d'une génération
+        Index("ix_llm_usage_job_id", "job_id"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # Identifiant de la génération (uuid hexadécimal)
+    job_id: Mapped[str] = mapped_column(String(32), nullable=False)
+    # Sans clé étrangère : le journal survit à la suppression du PDF
+    pdf_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class LLMUsageDaily(Base):
+    """Agrégat quotidien de llm_usage par utilisateur (jour UTC), tenu à jour à chaque appel"""
+    __tablename__ = "llm_usage_daily"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class QCMGenerationLease(Base):
+    """
+    Bail d'une génération en cours (app/qcm/singleflight.py) : une génération identique lancée
+    sur un autre worker attend sa fin au lieu de refaire les mêmes appels au LLM. Renouvelé
+    tant que la génération tourne ; expiré, le worker qui le tenait est considéré comme perdu
+    """
+    __tablename__ = "qcm_generation_leases"
+    
+    # sha256 (hexadécimal) des empreintes des documents et des paramètres de génération
+    flight_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Identifiant (uuid hexadécimal) de la génération qui tient le bail
+    owner: Mapped[str] = mapped_column(String(32), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Avancement, pour les générations qui attendent : appels terminés et prévus
+    done_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
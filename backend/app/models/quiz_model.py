@@ -0,0 +1,101 @@
+# app/models/quiz_model.py
+# Banque de QCM. Encodage compact (voir app/quiz/encoding.py) :
+# - options d'une question : une seule colonne texte, options séparées par OPTION_SEPARATOR ;
+# - bonnes réponses : masque de bits (bit i = option i correcte), une ou plusieurs réponses ;
+# - réponses d'une tentative : un masque uint16 par question, dans l'ordre des positions.
+# Statistiques d'items : agrégats incrémentaux dans question_stats.
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, LargeBinary, SmallInteger, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.base import Base
+
+class Quiz(Base):
+    __tablename__ = "quizzes"
+    __table_args__ = (
+        # Liste paginée des quiz d'un utilisateur (WHERE user_id ORDER BY created_at, id)
+        Index("ix_quizzes_user_id_created_at", "user_id", "created_at"),
+        # Banque de questions d'un PDF ou d'un dossier
+        Index("ix_quizzes_pdf_id", "pdf_id"),
+        Index("ix_quizzes_folder_id", "folder_id"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    pdf_id: Mapped[Optional[int]] = mapped_column(ForeignKey("pdfs.id", ondelete="SET NULL"), nullable=True)
+    folder_id: Mapped[Optional[int]] = mapped_column(ForeignKey("folders.id", ondelete="SET NULL"), nullable=True)
+    # Dénormalisé : la liste des quiz n'a pas à compter les questions
+    question_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    
+    # Chargées explicitement (app/quiz/quiz_service.py) : tout chargement implicite lève une erreur
+    questions: Mapped[List["Question"]] = relationship(
+        "Question", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="Question.position", lazy="raise"
+    )
+
+
+class Question(Base):
+    __tablename__ = "questions"
+    __table_args__ = (
+        # Chargement d'un quiz complet : une seule lecture d'index, questions déjà dans l'ordre
+        Index("ix_questions_quiz_id_position", "quiz_id", "position", unique=True),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    position: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Options séparées par OPTION_SEPARATOR
+    options: Mapped[str] = mapped_column(Text, nullable=False)
+    option_count: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    # Masque des bonnes réponses (bit i = option i)
+    answer_mask: Mapped[int] = mapped_column(Integer, nullable=False)
+    explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Page du PDF dont la question est tirée (couverture lors de l'assemblage de quiz)
+    source_page: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    
+    quiz: Mapped["Quiz"] = relationship("Quiz", back_populates="questions", lazy="raise")
+
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        Index("ix_quiz_attempts_quiz_id_created_at", "quiz_id", "created_at"),
+        Index("ix_quiz_attempts_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # Masques des réponses cochées, uint16 little-endian par question
+    answers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Renseignés à la correction
+    score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    correct_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class QuestionStats(Base):
+    """
+    Agrégats glissants par question, mis à jour à chaque correction (app/quiz/item_stats.py).
+    x = réponse exacte (0/1), y = score total de la tentative : n, Σx, Σy, Σy², Σxy suffisent
+    pour la difficulté (p = Σx / n) et la discrimination (corrélation point-bisériale).
+    """
+    __tablename__ = "question_stats"
+    __table_args__ = (
+        # Tableau de bord d'un quiz : une lecture d'index, O(questions)
+        Index("ix_question_stats_quiz_id", "quiz_id"),
+    )
+    
+    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    attempt_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    correct_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    score_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    score_sq_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    # Somme des scores des tentatives où la question est juste
+    correct_score_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
@@ -0,0 +1,30 @@
+# app/models/review_model.py
+# Révision espacée (app/quiz/scheduler.py) : une carte par (utilisateur, question), avec son
+# état SM-2 et sa prochaine échéance.
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.base import Base
+
+class ReviewCard(Base):
+    __tablename__ = "review_cards"
+    __table_args__ = (
+        # File « à réviser maintenant » : parcours borné de l'index (WHERE user_id AND due_at <= now
+        # ORDER BY due_at LIMIT n), jamais de toutes les cartes de l'utilisateur
+        Index("ix_review_cards_user_id_due_at", "user_id", "due_at"),
+        # Suppression des cartes d'un quiz
+        Index("ix_review_cards_quiz_id", "quiz_id"),
+    )
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Intervalle courant (en jours) et facteur de facilité SM-2
+    interval_days: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    ease: Mapped[float] = mapped_column(Float, nullable=False)
+    # Bonnes réponses consécutives et oublis (réponse fausse après au moins une réussite)
+    repetitions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    lapses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_reviewed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,29 @@
+# app/models/upload_model.py
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.base import Base
+
+class UploadSession(Base):
+    """Upload reprenable en cours (protocole tus) : les octets reçus sont déjà sur disque"""
+    __tablename__ = "upload_sessions"
+    __table_args__ = (
+        # Purge des uploads abandonnés
+        Index("ix_upload_sessions_expires_at", "expires_at"),
+        Index("ix_upload_sessions_user_id", "user_id"),
+    )
+    
+    # Identifiant opaque (uuid4 hexadécimal), utilisé dans l'URL de l'upload
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    folder_id: Mapped[Optional[int]] = mapped_column(ForeignKey("folders.id", ondelete="SET NULL"), nullable=True)
+    original_filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Fichier partiel sur disque
+    filepath: Mapped[str] = mapped_column(String(1024), nullable=False)
+    # Taille annoncée et nombre d'octets déjà écrits (en octets)
+    upload_length: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    upload_offset: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Repoussée à chaque morceau reçu
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
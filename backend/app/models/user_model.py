@@ -1,12 +1,16 @@
 # app/models/user_model.py
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import DateTime, ForeignKey, String, Boolean, func
+from sqlalchemy import DateTime, ForeignKey, String, Boolean, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Liste paginée des utilisateurs (admin)
+        Index("ix_users_created_at", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
@@ -24,6 +28,9 @@ class User(Base):
     # Champ pour l'authentification OAuth
     oidc_sub: Mapped[Optional[str]] = mapped_column(String(255), unique=True, nullable=True)
     
+    # Version des données de l'utilisateur (dossiers, PDFs) : ETag des listes (app/http_cache.py)
+    data_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
     # Relations
     access_tokens: Mapped[List["AccessToken"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     pdfs: Mapped[List["PDF"]] = relationship("PDF", back_populates="user", cascade="all, delete-orphan")
@@ -44,6 +51,14 @@ class User(Base):
 
 class AccessToken(Base):
     __tablename__ = "access_tokens"
+    __table_args__ = (
+        # Sessions d'un utilisateur (révocation, limite de sessions, sessions actives)
+        Index("ix_access_tokens_user_id_is_valid", "user_id", "is_valid"),
+        # Purge des tokens expirés
+        Index("ix_access_tokens_expires_at", "expires_at"),
+        # Liste paginée des sessions (admin)
+        Index("ix_access_tokens_created_at", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     token: Mapped[str] = mapped_column(String(1024), unique=True, index=True)
@@ -0,0 +1,11 @@
+# app/monitoring/__init__.py
+from .query_stats import (
+    QueryStatsMiddleware,
+    capture_queries,
+    get_route_stats,
+    instrument_engine,
+    register_route_observer,
+    reset_route_stats,
+)
+from .metrics import PrometheusMiddleware, mark_worker_dead, record_cache
+from .metrics_routes import router as metrics_router
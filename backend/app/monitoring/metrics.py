@@ -0,0 +1,138 @@
+# app/monitoring/metrics.py
+# Métriques Prometheus. En multi-workers (uvicorn --workers N), définir PROMETHEUS_MULTIPROC_DIR
+# (répertoire vide au démarrage) avant le lancement : chaque worker y écrit ses valeurs et
+# /metrics agrège tous les processus.
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .query_stats import QueryStats, register_route_observer, route_path
+
+# Latences HTTP : fines sous 100 ms (routes CRUD), larges au-delà (upload, génération)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# --- HTTP ---
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requêtes HTTP traitées", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Latence des requêtes HTTP", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Taille du corps des réponses HTTP", ["method", "route"],
+    buckets=SIZE_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requêtes HTTP en cours", ["method"],
+    multiprocess_mode="livesum"
+)
+
+# --- Base de données (alimenté par query_stats) ---
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Nombre de requêtes SQL par requête HTTP", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Temps passé en base par requête HTTP", ["route"],
+    buckets=LATENCY_BUCKETS
+)
+
+# --- Métier ---
+PDF_UPLOAD_BYTES = Histogram(
+    "pdf_upload_bytes", "Taille des PDFs téléversés", buckets=SIZE_BUCKETS
+)
+PDF_EXTRACTION_DURATION = Histogram(
+    "pdf_extraction_duration_seconds", "Durée d'extraction du texte d'un PDF", buckets=LATENCY_BUCKETS
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Latence des appels au LLM", ["model", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens consommés auprès du LLM", ["model", "kind"]
+)
+QCM_NORMALIZATION_SAVED_TOKENS = Counter(
+    "qcm_normalization_saved_tokens_total", "Tokens retirés du texte avant génération (en-têtes, pieds de page...)"
+)
+# Ratio de succès d'un cache = hit / (hit + miss) ; cache="auth", "chunks", ...
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Accès aux caches applicatifs", ["cache", "result"]
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def _observe_db_stats(route: str, stats: QueryStats) -> None:
+    DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.count)
+    DB_TIME_PER_REQUEST.labels(route=route).observe(stats.total_time)
+
+
+register_route_observer(_observe_db_stats)
+
+
+def metrics_payload() -> tuple:
+    """Exposition texte des métriques, agrégées sur tous les workers en mode multiprocessus"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """À l'arrêt d'un worker : retire ses jauges "live" de l'agrégat multiprocessus"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI : latence, taille de réponse et code de statut par gabarit de route,
+    nombre de requêtes en cours.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = route_path(scope)
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(time.perf_counter() - start)
+            HTTP_RESPONSE_SIZE.labels(method=method, route=route).observe(response_size)
+            HTTP_REQUESTS.labels(method=method, route=route, status=str(status_code)).inc()
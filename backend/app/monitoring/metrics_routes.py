@@ -0,0 +1,25 @@
+# app/monitoring/metrics_routes.py
+import secrets
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import METRICS_TOKEN
+from .metrics import metrics_payload
+
+# Création du router pour l'exposition des métriques
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Exposition Prometheus (agrégée sur tous les workers en mode multiprocessus)"""
+    if METRICS_TOKEN:
+        auth_header = request.headers.get("Authorization", "")
+        if not secrets.compare_digest(auth_header, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token de métriques invalide",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+    
+    # La lecture des fichiers multiprocessus est bloquante : hors de la boucle d'événements
+    payload, content_type = await run_in_threadpool(metrics_payload)
+    return Response(content=payload, media_type=content_type)
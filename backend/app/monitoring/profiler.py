@@ -0,0 +1,331 @@
+# app/monitoring/profiler.py
+# Profileur par échantillonnage, activable à chaud par un administrateur pour une fraction des
+# requêtes ou pour une seule route. Désactivé, le middleware se réduit à un test de booléen.
+# Activé, un thread échantillonne à intervalle fixe la pile de chaque requête profilée :
+# - la pile du thread de la boucle si la tâche de la requête est en cours d'exécution ;
+# - la chaîne d'await de sa coroutine sinon (temps d'attente : base, disque, LLM).
+# Les profils sont écrits (collapsed stacks ou speedscope) dans un anneau borné sur disque.
+# L'état est propre à chaque processus : en multi-workers, seul le worker qui reçoit l'appel
+# d'administration est concerné.
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from starlette.routing import Match
+
+from app.core.config import PROFILE_DIR, PROFILER_INTERVAL_MS, PROFILER_MAX_CONCURRENT, PROFILER_MAX_FILES
+from app.core.logging_config import request_id_var
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("collapsed", "speedscope")
+MAX_STACK_DEPTH = 128
+MIN_INTERVAL_MS = 1.0
+
+Frame = Tuple[str, str, int]  # (fonction, fichier, ligne de définition)
+
+
+@dataclass
+class ProfilerSettings:
+    enabled: bool = False
+    rate: float = 0.0
+    route: Optional[str] = None
+    interval_ms: float = PROFILER_INTERVAL_MS
+    format: str = "collapsed"
+
+
+@dataclass
+class _ProfiledRequest:
+    task: asyncio.Task
+    label: str
+    started: float
+    samples: Counter
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+def _thread_stack(frame) -> List[Frame]:
+    """Pile d'un thread, de la racine vers la feuille"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_stack(coro) -> List[Frame]:
+    """Chaîne d'await d'une coroutine suspendue, de la racine vers le point d'attente"""
+    stack = []
+    while coro is not None and len(stack) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_key(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    stack.append(("(attente)", "", 0))
+    return stack
+
+
+class SamplingProfiler:
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILER_MAX_FILES,
+                 max_concurrent: int = PROFILER_MAX_CONCURRENT):
+        self.settings = ProfilerSettings()
+        self.directory = directory
+        self.max_files = max_files
+        self.max_concurrent = max_concurrent
+        self._active: Dict[int, _ProfiledRequest] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def configure(self, enabled: bool, rate: float = 1.0, route: Optional[str] = None,
+                  interval_ms: Optional[float] = None, format: str = "collapsed") -> ProfilerSettings:
+        if format not in FORMATS:
+            raise ValueError(f"Format inconnu : {format}")
+        self.settings = ProfilerSettings(
+            enabled=enabled,
+            rate=min(max(rate, 0.0), 1.0),
+            route=route or None,
+            interval_ms=max(interval_ms or PROFILER_INTERVAL_MS, MIN_INTERVAL_MS),
+            format=format,
+        )
+        if enabled:
+            self._ensure_thread()
+        logger.info("Profileur configuré : %s", self.settings)
+        return self.settings
+
+    def status(self) -> dict:
+        return {**asdict(self.settings), "active_requests": len(self._active), "profiles": self.list_profiles()}
+
+    # --- sélection des requêtes ---
+
+    def should_profile(self, scope, app) -> Optional[str]:
+        """Gabarit de route si la requête doit être profilée, None sinon"""
+        settings = self.settings
+        if len(self._active) >= self.max_concurrent:
+            return None
+        template = self._match_route(scope, app)
+        if settings.route is not None and template != settings.route:
+            return None
+        if random.random() >= settings.rate:
+            return None
+        return template or "unmatched"
+
+    @staticmethod
+    def _match_route(scope, app) -> Optional[str]:
+        # Le routage n'a pas encore eu lieu : on cherche le gabarit correspondant au chemin
+        router = getattr(app, "router", None)
+        for route in getattr(router, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", None)
+        return None
+
+    # --- échantillonnage ---
+
+    def start_request(self, label: str) -> Optional[_ProfiledRequest]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+        profiled = _ProfiledRequest(task=task, label=label, started=time.perf_counter(), samples=Counter())
+        with self._lock:
+            self._active[id(task)] = profiled
+        self._wakeup.set()
+        return profiled
+
+    def stop_request(self, profiled: _ProfiledRequest) -> None:
+        with self._lock:
+            self._active.pop(id(profiled.task), None)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            if not self._active:
+                # Aucun échantillonnage tant qu'aucune requête n'est profilée
+                self._wakeup.clear()
+                if not self._active:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+            self._sample_once()
+            time.sleep(self.settings.interval_ms / 1000)
+
+    def _sample_once(self):
+        with self._lock:
+            active = list(self._active.values())
+        if not active:
+            return
+        try:
+            current = asyncio.current_task(self._loop) if self._loop is not None else None
+            loop_frame = sys._current_frames().get(self._loop_thread_id)
+            for profiled in active:
+                if profiled.task is current and loop_frame is not None:
+                    stack = _thread_stack(loop_frame)
+                else:
+                    stack = _await_stack(profiled.task.get_coro())
+                profiled.samples[tuple(stack)] += 1
+        except Exception:
+            # Lecture concurrente des piles : un échantillon incohérent est simplement ignoré
+            pass
+
+    # --- anneau de profils sur disque ---
+
+    def render(self, profiled: _ProfiledRequest, duration: float, fmt: str) -> bytes:
+        if fmt == "speedscope":
+            return _to_speedscope(profiled, duration, self.settings.interval_ms)
+        return _to_collapsed(profiled.samples)
+
+    def save(self, profiled: _ProfiledRequest, duration: float, request_id: Optional[str]) -> Optional[str]:
+        if not profiled.samples:
+            return None
+        fmt = self.settings.format
+        extension = "speedscope.json" if fmt == "speedscope" else "collapsed.txt"
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", profiled.label).strip("_") or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        name = f"{stamp}-{slug}-{request_id or 'sans-id'}-{duration * 1000:.0f}ms.{extension}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), "wb") as f:
+            f.write(self.render(profiled, duration, fmt))
+        self._prune()
+        return name
+
+    def _prune(self):
+        files = self.list_profiles()
+        for name in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def list_profiles(self) -> List[str]:
+        """Profils du plus récent au plus ancien (les noms commencent par l'horodatage)"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (n for n in os.listdir(self.directory) if n.endswith((".collapsed.txt", ".speedscope.json"))),
+            reverse=True
+        )
+
+    def profile_path(self, name: str) -> Optional[str]:
+        # Seuls les noms listés sont servis (pas de chemin arbitraire)
+        if name not in self.list_profiles():
+            return None
+        return os.path.join(self.directory, name)
+
+    def clear_profiles(self) -> int:
+        names = self.list_profiles()
+        for name in names:
+            os.remove(os.path.join(self.directory, name))
+        return len(names)
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})" if filename else name
+
+
+def _to_collapsed(samples: Counter) -> bytes:
+    """Format « collapsed stacks » (flamegraph.pl, speedscope) : "racine;…;feuille nombre" par ligne"""
+    lines = [
+        ";".join(_frame_label(frame).replace(";", ":") for frame in stack) + f" {count}"
+        for stack, count in samples.most_common()
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _to_speedscope(profiled: _ProfiledRequest, duration: float, interval_ms: float) -> bytes:
+    frames: List[dict] = []
+    index: Dict[Frame, int] = {}
+    samples, weights = [], []
+    for stack, count in profiled.samples.items():
+        indices = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                name, filename, line = frame
+                frames.append({"name": name, "file": filename, "line": line} if filename else {"name": name})
+            indices.append(index[frame])
+        samples.append(indices)
+        weights.append(count * interval_ms)
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "pdf-qcm-generator",
+        "name": profiled.label,
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": profiled.label,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(duration * 1000, 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+    return json.dumps(document).encode()
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI : profile les requêtes sélectionnées par le profileur. Désactivé, il ne coûte
+    qu'un test de booléen ; l'écriture du profil se fait hors de la boucle d'événements.
+    """
+    def __init__(self, app, profiler: SamplingProfiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        label = self.profiler.should_profile(scope, scope.get("app"))
+        profiled = self.profiler.start_request(f"{scope['method']} {label}") if label else None
+        if profiled is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.stop_request(profiled)
+            duration = time.perf_counter() - profiled.started
+            request_id = request_id_var.get()
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.profiler.save, profiled, duration, request_id
+                )
+            except Exception:
+                logger.exception("Impossible d'enregistrer le profil de %s", profiled.label)
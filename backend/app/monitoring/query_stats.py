@@ -0,0 +1,188 @@
+# app/monitoring/query_stats.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+
+from app.core.config import DEBUG, SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Compteurs SQL d'une requête HTTP (ou d'un bloc capture_queries)"""
+    count: int = 0
+    total_time: float = 0.0
+    route: Optional[str] = None
+    parent: Optional["QueryStats"] = None
+    scope: Optional[dict] = field(default=None, repr=False)
+
+    def route_label(self) -> Optional[str]:
+        """Route connue dès que le routage a eu lieu (scope["route"]), avant la fin de la requête"""
+        if self.route is None and self.scope is not None:
+            return route_name(self.scope)
+        return self.route
+
+
+@dataclass
+class RouteQueryStats:
+    """Agrégat par route : nombre de requêtes HTTP, de requêtes SQL et temps base cumulé"""
+    requests: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    max_queries: int = 0
+
+
+# Statistiques de la requête HTTP en cours ; l'objet est mutable et partagé par les
+# tâches et greenlets enfants (SQLAlchemy propage le contexte aux greenlets du driver async)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+_route_stats: Dict[str, RouteQueryStats] = {}
+_route_stats_lock = threading.Lock()
+
+# Hooks supplémentaires appelés à la fin de chaque requête HTTP (ex. export de métriques)
+_route_observers = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    stats = _current_stats.get()
+    node = stats
+    while node is not None:
+        node.count += 1
+        node.total_time += elapsed
+        node = node.parent
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        route = stats.route_label() if stats else None
+        logger.warning("Requête SQL lente (%.1f ms) route=%s : %s", elapsed * 1000, route, statement)
+
+
+def _handle_error(exception_context):
+    # La requête a échoué : after_cursor_execute ne sera pas appelé
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Branche les compteurs sur un moteur SQLAlchemy (synchrone ou asynchrone)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def capture_queries(route: Optional[str] = None) -> Iterator[QueryStats]:
+    """
+    Compte les requêtes SQL exécutées dans le bloc, y compris celles des requêtes HTTP
+    traitées dans ce contexte (les compteurs par requête remontent vers le bloc englobant).
+    """
+    parent = _current_stats.get()
+    stats = QueryStats(route=route or (parent.route if parent else None), parent=parent)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def register_route_observer(observer) -> None:
+    """observer(route, stats) est appelé à la fin de chaque requête HTTP instrumentée"""
+    _route_observers.append(observer)
+
+
+def record_route_stats(route: str, stats: QueryStats) -> None:
+    with _route_stats_lock:
+        aggregate = _route_stats.setdefault(route, RouteQueryStats())
+        aggregate.requests += 1
+        aggregate.queries += stats.count
+        aggregate.db_time += stats.total_time
+        aggregate.max_queries = max(aggregate.max_queries, stats.count)
+    for observer in _route_observers:
+        observer(route, stats)
+
+
+def get_route_stats() -> Dict[str, dict]:
+    """Instantané des agrégats par route (moyennes incluses)"""
+    with _route_stats_lock:
+        return {
+            route: {
+                "requests": s.requests,
+                "queries": s.queries,
+                "avg_queries": round(s.queries / s.requests, 2) if s.requests else 0,
+                "max_queries": s.max_queries,
+                "db_time_ms": round(s.db_time * 1000, 2),
+                "avg_db_time_ms": round(s.db_time * 1000 / s.requests, 2) if s.requests else 0,
+            }
+            for route, s in sorted(_route_stats.items())
+        }
+
+
+def reset_route_stats() -> None:
+    with _route_stats_lock:
+        _route_stats.clear()
+
+
+def route_path(scope) -> str:
+    """Gabarit de la route (/folders/{folder_id}) plutôt que le chemin brut, pour borner la cardinalité"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def route_name(scope) -> str:
+    return f"{scope.get('method', '')} {route_path(scope)}"
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI : compte les requêtes SQL et le temps base de chaque requête HTTP,
+    alimente les agrégats par route et, en mode DEBUG, ajoute les en-têtes
+    X-DB-Query-Count et X-DB-Query-Time-Ms à la réponse.
+    """
+    def __init__(self, app, debug_headers: bool = DEBUG):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = _current_stats.get()
+        stats = QueryStats(parent=parent, scope=scope)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                stats.route = route_name(scope)
+                if self.debug_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-query-count", str(stats.count).encode()))
+                    headers.append((b"x-db-query-time-ms", f"{stats.total_time * 1000:.2f}".encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            stats.route = route_name(scope)
+            record_route_stats(stats.route, stats)
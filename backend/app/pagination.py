@@ -0,0 +1,110 @@
+# app/pagination.py
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+@dataclass
+class PageParams:
+    """Paramètres de pagination extraits de la query string"""
+    cursor: Optional[str]
+    limit: int
+
+
+@dataclass
+class Page:
+    """Page de résultats et curseur vers la page suivante (None si dernière page)"""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé par la page précédente"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Nombre d'éléments par page")
+) -> PageParams:
+    """Dépendance FastAPI commune aux routes de liste paginées"""
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode la clé (created_at, id) du dernier élément d'une page en curseur opaque"""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Décode un curseur opaque, lève une erreur 400 s'il est invalide"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def keyset_query(query: Select, created_col, id_col, params: PageParams) -> Select:
+    """
+    Construit la requête d'une page : tri stable (created_at, id) décroissant,
+    filtre sur la clé du curseur et une ligne de plus que la limite pour détecter la page suivante.
+    Les colonnes de clé sont ajoutées en fin de sélection.
+    """
+    query = query.add_columns(created_col, id_col).order_by(created_col.desc(), id_col.desc())
+
+    if params.cursor:
+        cursor_created_at, cursor_id = decode_cursor(params.cursor)
+        # On relit la date stockée de l'élément ancre plutôt que de comparer à la valeur
+        # du curseur : le format stocké peut différer (ex. SQLite sans microsecondes),
+        # ce qui casserait l'égalité. La valeur du curseur sert si l'ancre a été supprimée.
+        anchor = select(created_col).where(id_col == cursor_id).correlate(None).scalar_subquery()
+        anchor_created_at = func.coalesce(anchor, cursor_created_at)
+        query = query.where(
+            or_(
+                created_col < anchor_created_at,
+                and_(created_col == anchor_created_at, id_col < cursor_id)
+            )
+        )
+
+    return query.limit(params.limit + 1)
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    created_col,
+    id_col,
+    params: PageParams
+) -> Page:
+    """
+    Exécute une requête paginée par clé (keyset) sur (created_at, id), du plus récent au plus ancien.
+    Si la requête sélectionne une seule entité, les éléments sont les objets ORM,
+    sinon ce sont des tuples (une valeur par entité/colonne sélectionnée).
+    """
+    single_entity = len(query.column_descriptions) == 1
+
+    result = await session.execute(keyset_query(query, created_col, id_col, params))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last_created_at, last_id = rows[-1][-2:]
+        next_cursor = encode_cursor(last_created_at, last_id)
+
+    if single_entity:
+        items = [row[0] for row in rows]
+    else:
+        items = [tuple(row[:-2]) for row in rows]
+
+    return Page(items=items, next_cursor=next_cursor)
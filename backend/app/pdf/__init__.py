@@ -1,2 +1,9 @@
 # app/pdf/__init__.py
-from app.pdf.pdf_routes import router
\ No newline at end of file
+from app.pdf.pdf_routes import router
+from app.pdf.bulk_routes import router as bulk_router
+from app.pdf.upload_routes import router as upload_router
+from app.pdf.upload_routes import start_upload_janitor, stop_upload_janitor
+from app.pdf.pdf_processing import processing_queue
+
+router.include_router(bulk_router)
+router.include_router(upload_router)
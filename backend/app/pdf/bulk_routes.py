@@ -0,0 +1,191 @@
+# app/pdf/bulk_routes.py
+# Upload groupé : plusieurs PDFs et/ou archives ZIP en une requête. Chaque fichier (ou membre
+# d'archive) est copié par blocs vers le stockage, sans décompresser l'archive en mémoire ;
+# toutes les lignes PDF sont insérées dans une seule transaction, puis mises en file de traitement.
+import logging
+import os
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.core.config import BULK_UPLOAD_MAX_FILES, BULK_UPLOAD_MAX_TOTAL_SIZE
+from app.database import get_async_session
+from app.db_writer import run_write
+from app.http_cache import bump_data_version
+from app.models import Folder, PDF
+from app.monitoring.metrics import PDF_UPLOAD_BYTES
+from app.responses import FastJSONResponse
+from .pdf_processing import processing_queue
+from .pdf_storage import FileTooLarge, new_pdf_path, remove_file, store_stream
+
+logger = logging.getLogger(__name__)
+
+# Monté sous le router PDF (app/pdf/__init__.py) : /pdf/upload/bulk
+router = APIRouter(tags=["pdf"])
+
+
+@dataclass
+class StoredFile:
+    original_filename: str
+    unique_filename: str
+    filepath: str
+    size: int
+    content_hash: str
+    result: dict
+
+
+class _BulkStore:
+    """Copie des fichiers d'une requête vers le stockage, dans les limites de nombre et de volume"""
+    def __init__(self, max_files: int, max_total_size: int):
+        self.max_files = max_files
+        self.remaining_size = max_total_size
+        self.stored: List[StoredFile] = []
+        self.results: List[dict] = []
+
+    def reject(self, name: str, error: str) -> None:
+        self.results.append({"filename": name, "status": "rejected", "error": error})
+
+    def add(self, name: str, original_filename: str, source: BinaryIO) -> None:
+        if not original_filename.lower().endswith(".pdf"):
+            return self.reject(name, "Seuls les fichiers PDF sont acceptés")
+        if len(self.stored) >= self.max_files:
+            return self.reject(name, f"Nombre maximal de fichiers atteint ({self.max_files})")
+
+        unique_filename, filepath = new_pdf_path(original_filename)
+        try:
+            size, content_hash = store_stream(source, filepath, self.remaining_size)
+        except FileTooLarge:
+            return self.reject(name, "Volume total maximal de l'envoi dépassé")
+        self.remaining_size -= size
+
+        result = {"filename": name, "status": "created"}
+        self.results.append(result)
+        self.stored.append(StoredFile(original_filename, unique_filename, filepath, size, content_hash, result))
+
+    def add_archive(self, name: str, source: BinaryIO) -> None:
+        try:
+            archive = zipfile.ZipFile(source)
+        except zipfile.BadZipFile:
+            return self.reject(name, "Archive ZIP invalide")
+        with archive:
+            for info in archive.infolist():
+                member_name = f"{name}/{info.filename}"
+                basename = os.path.basename(info.filename)
+                # Dossiers et métadonnées ajoutées par macOS : ignorés sans résultat
+                if info.is_dir() or info.filename.startswith("__MACOSX/") or basename.startswith("."):
+                    continue
+                try:
+                    with archive.open(info) as member:
+                        self.add(member_name, basename, member)
+                except RuntimeError:
+                    self.reject(member_name, "Membre d'archive chiffré")
+                except (zipfile.BadZipFile, zlib.error, EOFError):
+                    self.reject(member_name, "Membre d'archive corrompu")
+
+    def cleanup(self) -> None:
+        for stored in self.stored:
+            remove_file(stored.filepath)
+
+
+def _store_files(uploads: List[Tuple[str, BinaryIO]]) -> _BulkStore:
+    """Appel bloquant (exécuté dans un thread)"""
+    store = _BulkStore(BULK_UPLOAD_MAX_FILES, BULK_UPLOAD_MAX_TOTAL_SIZE)
+    try:
+        for name, source in uploads:
+            source.seek(0)
+            if name.lower().endswith(".zip"):
+                store.add_archive(name, source)
+            else:
+                store.add(name, name, source)
+    except BaseException:
+        store.cleanup()
+        raise
+    return store
+
+
+@router.post("/upload/bulk")
+async def bulk_upload_pdfs(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    folder_id: Optional[int] = Form(None),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Télécharge plusieurs PDFs (fichiers multiples et/ou archives ZIP) dans un dossier.
+    Renvoie le résultat de chaque fichier : créé (avec son identifiant) ou rejeté (avec la raison).
+    """
+    # Vérifier l'authentification de l'utilisateur
+    current_user, error = await get_current_user(request, session)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=error,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    if folder_id is not None:
+        owned = await session.scalar(
+            select(Folder.id).where(Folder.id == folder_id, Folder.user_id == current_user.id)
+        )
+        if owned is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier non trouvé")
+    # Aucune requête SQL pendant la copie des fichiers : la connexion est rendue au pool
+    await session.close()
+
+    store = await run_in_threadpool(_store_files, [(f.filename or "", f.file) for f in files])
+
+    user_id = current_user.id
+
+    async def insert_pdfs(db: AsyncSession) -> List[int]:
+        new_pdfs = [
+            PDF(
+                filename=stored.unique_filename,
+                original_filename=stored.original_filename,
+                filepath=stored.filepath,
+                file_size=stored.size,
+                content_hash=stored.content_hash,
+                user_id=user_id,
+                folder_id=folder_id
+            )
+            for stored in store.stored
+        ]
+        db.add_all(new_pdfs)
+        await db.flush()
+        await bump_data_version(db, user_id)
+        return [pdf.id for pdf in new_pdfs]
+
+    if store.stored:
+        try:
+            pdf_ids = await run_write(insert_pdfs)
+        except Exception as e:
+            await run_in_threadpool(store.cleanup)
+            logger.exception("Error saving bulk upload: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erreur lors du téléchargement des fichiers: {str(e)}"
+            )
+        for stored, pdf_id in zip(store.stored, pdf_ids):
+            stored.result["file_id"] = pdf_id
+            PDF_UPLOAD_BYTES.observe(stored.size)
+        processing_queue.enqueue(pdf_ids)
+
+    created = len(store.stored)
+    logger.info("Bulk upload: %s created, %s rejected, User: %s", created, len(store.results) - created, user_id)
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": created > 0,
+            "created": created,
+            "rejected": len(store.results) - created,
+            "folder_id": folder_id,
+            "results": store.results
+        }
+    )
@@ -0,0 +1,121 @@
+# app/pdf/pdf_processing.py
+# Traitement des PDFs après upload (nombre de pages, drapeau is_processed), hors requête HTTP :
+# les routes d'upload déposent les identifiants dans une file consommée par quelques tâches.
+# La file est en mémoire ; l'état durable est is_processed : au démarrage, les PDFs non traités
+# (arrêt pendant un traitement, uploads antérieurs) sont remis en file. Avec plusieurs workers,
+# chacun les réclame par une mise à jour conditionnelle (processing_started_at) : un PDF n'est
+# repris que par un seul d'entre eux. Une réclamation plus ancienne que CLAIM_TIMEOUT (worker
+# arrêté avant la fin) peut être reprise.
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import PDF_PROCESSING_CONCURRENCY
+from app.database import async_session_maker
+from app.db_writer import run_write
+from app.models import PDF
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def count_pages(path: str) -> Optional[int]:
+    """Nombre de pages du PDF, None si le fichier est illisible ; appel bloquant"""
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    try:
+        return len(PdfReader(path).pages)
+    except (PdfReadError, OSError, ValueError) as e:
+        logger.warning("Could not read PDF %s: %s", path, e)
+        return None
+
+
+async def process_pdf(pdf_id: int) -> None:
+    async with async_session_maker() as session:
+        filepath = await session.scalar(select(PDF.filepath).where(PDF.id == pdf_id))
+    if filepath is None:
+        return  # supprimé entre-temps
+
+    page_count = await run_in_threadpool(count_pages, filepath)
+
+    async def mark_processed(db: AsyncSession):
+        await db.execute(
+            update(PDF).where(PDF.id == pdf_id).values(is_processed=True, page_count=page_count)
+        )
+
+    await run_write(mark_processed)
+    logger.debug("PDF processed. ID: %s, Pages: %s", pdf_id, page_count)
+
+
+async def claim_pending() -> List[int]:
+    """PDFs non traités que ce worker reprend (non réclamés, ou réclamation expirée)"""
+    async def claim(db: AsyncSession) -> List[int]:
+        now = datetime.utcnow()
+        result = await db.scalars(
+            update(PDF)
+            .where(
+                PDF.is_processed.is_not(True),
+                or_(PDF.processing_started_at.is_(None), PDF.processing_started_at < now - CLAIM_TIMEOUT)
+            )
+            .values(processing_started_at=now)
+            .returning(PDF.id)
+        )
+        return list(result.all())
+
+    return await run_write(claim)
+
+
+class ProcessingQueue:
+    def __init__(self, concurrency: int):
+        self._concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"pdf-processing-{i}") for i in range(self._concurrency)
+        ]
+        pending = await claim_pending()
+        self.enqueue(pending)
+        logger.info("File de traitement des PDFs démarrée (%s en attente)", len(pending))
+
+    async def stop(self):
+        """Arrête les tâches ; les PDFs non traités seront repris au prochain démarrage"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def enqueue(self, pdf_ids: Iterable[int]) -> None:
+        # File arrêtée (tests, scripts) : les PDFs restent non traités jusqu'au prochain démarrage
+        if not self.running:
+            return
+        for pdf_id in pdf_ids:
+            self._queue.put_nowait(pdf_id)
+
+    async def _run(self):
+        while True:
+            pdf_id = await self._queue.get()
+            try:
+                await process_pdf(pdf_id)
+            except Exception:
+                logger.exception("Error processing PDF %s", pdf_id)
+            finally:
+                self._queue.task_done()
+
+
+processing_queue = ProcessingQueue(PDF_PROCESSING_CONCURRENCY)
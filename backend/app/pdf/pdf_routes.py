@@ -1,13 +1,22 @@
 import os
 import logging
-import uuid
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_async_session
+from app.db_writer import run_write
 from app.auth import get_current_user
 from app.models import User, PDF
+from app.pagination import PageParams, page_params, paginate
+from app.http_cache import CACHE_CONTROL, bump_data_version, if_none_match, list_etag, not_modified, with_etag
+from app.responses import FastJSONResponse, SendfileResponse
+from app.schemas import PDFItem
+from app.monitoring.metrics import PDF_UPLOAD_BYTES
+from app.core.config import UPLOAD_MAX_SIZE
+from .pdf_processing import processing_queue
+from .pdf_storage import UPLOAD_DIR, new_pdf_path, sha256_bytes, sha256_file
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -15,9 +24,6 @@ logger = logging.getLogger(__name__)
 # Création du router pour les opérations PDF
 router = APIRouter(prefix="/pdf", tags=["pdf"])
 
-# Configuration du dossier pour les PDFs
-UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads/pdfs")
-
 # Créer le dossier d'upload s'il n'existe pas
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -31,35 +37,29 @@ async def upload_pdf(
     """
     Endpoint pour télécharger un fichier PDF
     """
-    # Debug de l'authentification
-    auth_header = request.headers.get("Authorization")
-    logger.info(f"Auth header: {auth_header[:20] + '...' if auth_header else 'None'}")
-    
     try:
         # Vérifier l'authentification de l'utilisateur
         current_user, error = await get_current_user(request, session)
         if error:
-            logger.error(f"Authentication error: {error}")
+            logger.error("Authentication error: %s", error)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=error,
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        logger.info(f"User authenticated: {current_user.email}")
+        logger.info("User authenticated: %s", current_user.email)
         
         # Vérifier si le fichier est un PDF
         if not file.filename or not file.filename.lower().endswith('.pdf'):
-            logger.warning(f"Invalid file type: {file.filename}")
+            logger.warning("Invalid file type: %s", file.filename)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Seuls les fichiers PDF sont acceptés"
             )
         
         # Générer un nom de fichier unique
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_location = os.path.join(UPLOAD_DIR, unique_filename)
+        unique_filename, file_location = new_pdf_path(file.filename)
         
         # S'assurer que le dossier d'upload existe
         os.makedirs(os.path.dirname(file_location), exist_ok=True)
@@ -67,43 +67,53 @@ async def upload_pdf(
         # Lire le contenu du fichier
         file_content = await file.read()
         
-        # Vérifier la taille du fichier (limite à 10 MB)
-        max_size = 10 * 1024 * 1024  # 10 MB en octets
-        if len(file_content) > max_size:
-            logger.warning(f"File too large: {len(file_content)} bytes")
+        # Vérifier la taille du fichier (au-delà : upload reprenable, /pdf/uploads)
+        if len(file_content) > UPLOAD_MAX_SIZE:
+            logger.warning("File too large: %s bytes", len(file_content))
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="Le fichier est trop volumineux. La limite est de 10 MB."
+                detail=f"Le fichier est trop volumineux. La limite est de {UPLOAD_MAX_SIZE // (1024 * 1024)} MB."
             )
         
+        PDF_UPLOAD_BYTES.observe(len(file_content))
+        
+        content_hash = sha256_bytes(file_content)
+        
         # Sauvegarder le fichier
         with open(file_location, "wb") as f:
             f.write(file_content)
         
-        logger.info(f"File saved to {file_location}")
+        logger.info("File saved to %s", file_location)
         
-        # Enregistrer les informations dans la base de données
-        new_pdf = PDF(
-            filename=unique_filename,
-            original_filename=file.filename,
-            filepath=file_location,
-            file_size=len(file_content),
-            user_id=current_user.id
-        )
+        # Enregistrer les informations dans la base de données (via la file d'écriture)
+        user_id = current_user.id
         
-        session.add(new_pdf)
-        await session.commit()
-        await session.refresh(new_pdf)
+        async def insert_pdf(db: AsyncSession) -> int:
+            new_pdf = PDF(
+                filename=unique_filename,
+                original_filename=file.filename,
+                filepath=file_location,
+                file_size=len(file_content),
+                content_hash=content_hash,
+                user_id=user_id
+            )
+            db.add(new_pdf)
+            await db.flush()
+            await bump_data_version(db, user_id)
+            return new_pdf.id
+        
+        pdf_id = await run_write(insert_pdf)
+        processing_queue.enqueue([pdf_id])
         
-        logger.info(f"PDF uploaded successfully. ID: {new_pdf.id}, User: {current_user.id}")
+        logger.info("PDF uploaded successfully. ID: %s, User: %s", pdf_id, user_id)
         
         # Renvoyer une réponse JSON
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
                 "message": "Fichier PDF téléchargé avec succès",
-                "file_id": new_pdf.id,
+                "file_id": pdf_id,
                 "filename": file.filename
             }
         )
@@ -112,7 +122,7 @@ async def upload_pdf(
         # Relancer les HTTPException telles quelles
         raise he
     except Exception as e:
-        logger.exception(f"Error uploading PDF: {str(e)}")
+        logger.exception("Error uploading PDF: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors du téléchargement du fichier: {str(e)}"
@@ -122,10 +132,11 @@ async def upload_pdf(
 @router.get("/list")
 async def list_pdfs(
     request: Request,
+    page: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Récupère tous les PDFs d'un utilisateur
+    Récupère les PDFs d'un utilisateur, du plus récent au plus ancien (pagination par curseur)
     """
     # Vérifier l'authentification de l'utilisateur
     current_user, error = await get_current_user(request, session)
@@ -136,37 +147,95 @@ async def list_pdfs(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Liste inchangée depuis la dernière visite : 304 sans exécuter la requête de liste
+    etag = list_etag(request, current_user)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    
     try:
-        # Requête pour récupérer tous les PDFs de l'utilisateur
-        query = select(PDF).where(PDF.user_id == current_user.id)
-        result = await session.execute(query)
-        pdfs = result.scalars().all()
-        
-        pdf_list = []
-        for pdf in pdfs:
-            pdf_list.append({
-                "id": pdf.id,
-                "filename": pdf.original_filename,
-                "file_size": pdf.file_size,
-                "uploaded_at": pdf.upload_date.isoformat()
-            })
-        
-        return JSONResponse(
+        # Requête pour récupérer une page de PDFs de l'utilisateur (colonnes utiles uniquement,
+        # sans construire d'objets ORM)
+        query = select(PDF.id, PDF.original_filename, PDF.file_size, PDF.upload_date).where(
+            PDF.user_id == current_user.id
+        )
+        result_page = await paginate(session, query, PDF.upload_date, PDF.id, page)
+        
+        pdf_list = [PDFItem(*row) for row in result_page.items]
+        
+        return with_etag(FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
                 "count": len(pdf_list),
-                "pdfs": pdf_list
+                "pdfs": pdf_list,
+                "next_cursor": result_page.next_cursor
             }
-        )
+        ), etag)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving PDFs: {str(e)}")
+        logger.error("Error retrieving PDFs: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la récupération des PDFs: {str(e)}"
         )
 
+# Route pour télécharger le fichier d'un PDF (Range, ETag fort)
+@router.get("/{pdf_id}/file")
+async def get_pdf_file(
+    pdf_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Renvoie le fichier PDF (requêtes Range pour la lecture paginée côté navigateur).
+    L'ETag est l'empreinte SHA-256 du contenu.
+    """
+    # Vérifier l'authentification de l'utilisateur
+    current_user, error = await get_current_user(request, session)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=error,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    # Propriété vérifiée dans la requête elle-même, sans charger l'objet ORM complet
+    result = await session.execute(
+        select(PDF.filepath, PDF.original_filename, PDF.content_hash).where(
+            PDF.id == pdf_id, PDF.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+    if row is None or not os.path.isfile(row.filepath):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF non trouvé"
+        )
+    
+    content_hash = row.content_hash
+    if content_hash is None:
+        # PDF antérieur au calcul de l'empreinte : calculée une fois, hors de la boucle d'événements
+        content_hash = await run_in_threadpool(sha256_file, row.filepath)
+        
+        async def store_hash(db: AsyncSession):
+            await db.execute(update(PDF).where(PDF.id == pdf_id).values(content_hash=content_hash))
+        
+        await run_write(store_hash)
+    
+    etag = f'"{content_hash}"'
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    
+    return SendfileResponse(
+        row.filepath,
+        media_type="application/pdf",
+        filename=row.original_filename,
+        content_disposition_type="inline",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
 # Route pour supprimer un PDF
 @router.delete("/{pdf_id}")
 async def delete_pdf(
@@ -208,19 +277,20 @@ async def delete_pdf(
         if os.path.exists(pdf.filepath):
             try:
                 os.remove(pdf.filepath)
-                logger.info(f"File deleted from disk: {pdf.filepath}")
+                logger.info("File deleted from disk: %s", pdf.filepath)
             except OSError as e:
-                logger.warning(f"Could not delete file from disk: {str(e)}")
+                logger.warning("Could not delete file from disk: %s", e)
         else:
-            logger.warning(f"File not found on disk: {pdf.filepath}")
+            logger.warning("File not found on disk: %s", pdf.filepath)
         
         # Supprimer l'entrée de la base de données
         await session.delete(pdf)
+        await bump_data_version(session, current_user.id)
         await session.commit()
         
-        logger.info(f"PDF deleted successfully. ID: {pdf_id}, User: {current_user.id}")
+        logger.info("PDF deleted successfully. ID: %s, User: %s", pdf_id, current_user.id)
         
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
@@ -231,7 +301,7 @@ async def delete_pdf(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting PDF: {str(e)}")
+        logger.error("Error deleting PDF: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression du PDF: {str(e)}"
@@ -0,0 +1,65 @@
+# app/pdf/pdf_storage.py
+# Stockage des fichiers PDF sur disque et empreintes de contenu (ETag, déduplication)
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, Tuple
+
+# Configuration du dossier pour les PDFs
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads/pdfs")
+# Fichiers des uploads reprenables en cours
+PARTIAL_DIR = os.path.join(UPLOAD_DIR, "partial")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def new_pdf_path(original_filename: str) -> Tuple[str, str]:
+    """Nom de stockage unique (uuid + extension d'origine) et chemin complet"""
+    unique_filename = f"{uuid.uuid4()}{os.path.splitext(original_filename)[1]}"
+    return unique_filename, os.path.join(UPLOAD_DIR, unique_filename)
+
+
+def sha256_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    """Empreinte SHA-256 d'un fichier, lu par blocs (mémoire constante) ; appel bloquant"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+def store_stream(source: BinaryIO, path: str, max_size: int) -> Tuple[int, str]:
+    """
+    Copie un flux (fichier temporaire d'upload, membre d'archive) vers path par blocs, en calculant
+    l'empreinte au passage ; renvoie (taille, sha256). Au-delà de max_size, le fichier partiel est
+    supprimé et FileTooLarge levée. Appel bloquant.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            for block in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                size += len(block)
+                if size > max_size:
+                    raise FileTooLarge()
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        remove_file(path)
+        raise
+    return size, digest.hexdigest()
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,459 @@
+# app/pdf/upload_routes.py
+# Uploads reprenables (protocole tus 1.0, extensions creation, expiration et termination) :
+# - POST /pdf/uploads crée l'upload (Upload-Length, Upload-Metadata) et renvoie son URL ;
+# - PATCH écrit le morceau reçu directement dans le fichier partiel, à l'offset annoncé ;
+# - HEAD renvoie l'offset courant pour reprendre après une coupure ;
+# - le dernier morceau transforme l'upload en PDF (même transaction que la suppression de l'upload).
+# La mémoire utilisée est bornée par WRITE_BUFFER_SIZE quelle que soit la taille du fichier.
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional, Set, Tuple
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.auth import get_current_user
+from app.core.config import (
+    RESUMABLE_UPLOAD_MAX_SIZE,
+    RESUMABLE_UPLOAD_PURGE_INTERVAL,
+    RESUMABLE_UPLOAD_TTL_HOURS,
+)
+from app.database import async_session_maker, get_async_session
+from app.db_writer import run_write
+from app.http_cache import bump_data_version
+from app.models import Folder, PDF, UploadSession, User
+from app.monitoring.metrics import PDF_UPLOAD_BYTES
+from .pdf_processing import processing_queue
+from .pdf_storage import PARTIAL_DIR, new_pdf_path, remove_file, sha256_file
+
+logger = logging.getLogger(__name__)
+
+# Monté sous le router PDF (app/pdf/__init__.py) : /pdf/uploads
+router = APIRouter(prefix="/uploads", tags=["pdf"])
+
+TUS_VERSION = "1.0.0"
+TUS_EXTENSIONS = "creation,expiration,termination"
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+# Octets accumulés avant chaque écriture sur disque
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Uploads dont un morceau est en cours d'écriture dans ce processus (un seul PATCH à la fois).
+# Suffisant avec un seul worker (SQLite) ; entre workers (Postgres), l'offset n'avance que par
+# une mise à jour conditionnelle (voir upload_chunk) : un seul de deux PATCH simultanés aboutit
+_in_progress: Set[str] = set()
+_janitor_task: Optional[asyncio.Task] = None
+
+
+def _tus_headers(**headers) -> Dict[str, str]:
+    return {"Tus-Resumable": TUS_VERSION, **{k.replace("_", "-"): str(v) for k, v in headers.items()}}
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _new_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(hours=RESUMABLE_UPLOAD_TTL_HOURS)
+
+
+def _is_expired(expires_at: datetime) -> bool:
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return expires_at < datetime.utcnow()
+
+
+def parse_metadata(header: str) -> Dict[str, str]:
+    """Upload-Metadata : paires "clé valeur_base64" séparées par des virgules (valeur facultative)"""
+    metadata = {}
+    for item in header.split(","):
+        parts = item.strip().split(" ")
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode("utf-8") if len(parts) > 1 else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload-Metadata invalide")
+    return metadata
+
+
+def _int_header(request: Request, name: str) -> int:
+    try:
+        value = int(request.headers[name])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"En-tête {name} manquant ou invalide")
+    if value < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"En-tête {name} invalide")
+    return value
+
+
+async def _authenticate(request: Request, session: AsyncSession) -> User:
+    current_user, error = await get_current_user(request, session)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=error,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    version = request.headers.get("tus-resumable")
+    if version is not None and version != TUS_VERSION:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Version du protocole tus non supportée",
+            headers={"Tus-Version": TUS_VERSION}
+        )
+    return current_user
+
+
+async def _get_upload(session: AsyncSession, upload_id: str, user_id: int) -> UploadSession:
+    result = await session.execute(
+        select(UploadSession).where(UploadSession.id == upload_id, UploadSession.user_id == user_id)
+    )
+    upload = result.scalar_one_or_none()
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload non trouvé")
+    if _is_expired(upload.expires_at):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expiré")
+    return upload
+
+
+@router.options("")
+async def upload_options():
+    """Découverte des capacités du serveur (tus)"""
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers=_tus_headers(
+            Tus_Version=TUS_VERSION,
+            Tus_Extension=TUS_EXTENSIONS,
+            Tus_Max_Size=RESUMABLE_UPLOAD_MAX_SIZE,
+        )
+    )
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Crée un upload reprenable. Upload-Length : taille totale en octets ;
+    Upload-Metadata : filename (obligatoire, .pdf) et folder_id (facultatif), encodés en base64.
+    """
+    current_user = await _authenticate(request, session)
+
+    upload_length = _int_header(request, "upload-length")
+    if upload_length == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Le fichier est vide")
+    if upload_length > RESUMABLE_UPLOAD_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Le fichier est trop volumineux. La limite est de {RESUMABLE_UPLOAD_MAX_SIZE // (1024 * 1024)} MB."
+        )
+
+    metadata = parse_metadata(request.headers.get("upload-metadata", ""))
+    filename = metadata.get("filename")
+    if not filename or not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Seuls les fichiers PDF sont acceptés")
+
+    folder_id = None
+    if metadata.get("folder_id"):
+        try:
+            folder_id = int(metadata["folder_id"])
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="folder_id invalide")
+        owned = await session.scalar(
+            select(Folder.id).where(Folder.id == folder_id, Folder.user_id == current_user.id)
+        )
+        if owned is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier non trouvé")
+
+    upload_id = uuid.uuid4().hex
+    filepath = os.path.join(PARTIAL_DIR, f"{upload_id}.part")
+    expires_at = _new_expiry()
+
+    def create_partial_file():
+        os.makedirs(PARTIAL_DIR, exist_ok=True)
+        open(filepath, "wb").close()
+
+    await run_in_threadpool(create_partial_file)
+
+    user_id = current_user.id
+
+    async def insert_upload(db: AsyncSession):
+        db.add(UploadSession(
+            id=upload_id,
+            user_id=user_id,
+            folder_id=folder_id,
+            original_filename=filename,
+            filepath=filepath,
+            upload_length=upload_length,
+            upload_offset=0,
+            expires_at=expires_at
+        ))
+
+    await run_write(insert_upload)
+    logger.info("Resumable upload created. ID: %s, User: %s, Size: %s", upload_id, user_id, upload_length)
+
+    return Response(
+        status_code=status.HTTP_201_CREATED,
+        headers=_tus_headers(
+            Location=request.url_for("upload_chunk", upload_id=upload_id),
+            Upload_Offset=0,
+            Upload_Expires=_http_date(expires_at),
+        )
+    )
+
+
+@router.head("/{upload_id}")
+async def upload_status(
+    upload_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Offset courant : le client reprend l'envoi à partir de cet octet"""
+    current_user = await _authenticate(request, session)
+    upload = await _get_upload(session, upload_id, current_user.id)
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            **_tus_headers(
+                Upload_Offset=upload.upload_offset,
+                Upload_Length=upload.upload_length,
+                Upload_Expires=_http_date(upload.expires_at),
+            ),
+            "Cache-Control": "no-store",
+        }
+    )
+
+
+async def _append_chunk(request: Request, path: str, offset: int, remaining: int) -> Tuple[int, bool]:
+    """
+    Écrit le corps de la requête dans le fichier à partir de offset, par blocs de WRITE_BUFFER_SIZE.
+    Renvoie (octets écrits, dépassement de la taille annoncée). Une coupure du client conserve
+    les octets déjà reçus : le client reprendra à partir du nouvel offset.
+    """
+    written = 0
+    overflow = False
+    buffer = bytearray()
+    async with await anyio.open_file(path, "r+b") as f:
+        await f.seek(offset)
+        try:
+            async for chunk in request.stream():
+                if written + len(buffer) + len(chunk) > remaining:
+                    chunk = chunk[:remaining - written - len(buffer)]
+                    overflow = True
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_SIZE or overflow:
+                    await f.write(bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+                if overflow:
+                    break
+        except ClientDisconnect:
+            logger.info("Client disconnected during chunk upload at offset %s", offset + written + len(buffer))
+        if buffer:
+            await f.write(bytes(buffer))
+            written += len(buffer)
+        # L'offset enregistré ne doit jamais dépasser les octets réellement persistés
+        await f.flush()
+        await anyio.to_thread.run_sync(os.fsync, f.wrapped.fileno())
+    return written, overflow
+
+
+async def _finalize(upload: UploadSession, user_id: int) -> int:
+    """Déplace le fichier complet vers le stockage des PDFs et crée la ligne PDF"""
+    content_hash = await run_in_threadpool(sha256_file, upload.filepath)
+    unique_filename, file_location = new_pdf_path(upload.original_filename)
+    await run_in_threadpool(os.replace, upload.filepath, file_location)
+
+    async def insert_pdf(db: AsyncSession) -> int:
+        new_pdf = PDF(
+            filename=unique_filename,
+            original_filename=upload.original_filename,
+            filepath=file_location,
+            file_size=upload.upload_length,
+            content_hash=content_hash,
+            user_id=user_id,
+            folder_id=upload.folder_id
+        )
+        db.add(new_pdf)
+        await db.flush()
+        await db.execute(delete(UploadSession).where(UploadSession.id == upload.id))
+        await bump_data_version(db, user_id)
+        return new_pdf.id
+
+    try:
+        pdf_id = await run_write(insert_pdf)
+    except Exception:
+        # Le fichier reste associé à l'upload : une nouvelle tentative reste possible
+        await run_in_threadpool(os.replace, file_location, upload.filepath)
+        raise
+
+    PDF_UPLOAD_BYTES.observe(upload.upload_length)
+    processing_queue.enqueue([pdf_id])
+    logger.info("Resumable upload completed. Upload: %s, PDF: %s, User: %s", upload.id, pdf_id, user_id)
+    return pdf_id
+
+
+@router.patch("/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Ajoute un morceau à l'offset Upload-Offset (qui doit être l'offset courant).
+    Le dernier morceau crée le PDF : son identifiant est renvoyé dans l'en-tête Upload-PDF-Id.
+    """
+    current_user = await _authenticate(request, session)
+    if request.headers.get("content-type") != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type attendu : {CHUNK_CONTENT_TYPE}"
+        )
+    offset = _int_header(request, "upload-offset")
+    upload = await _get_upload(session, upload_id, current_user.id)
+    # Aucune requête SQL pendant la réception du morceau : la connexion est rendue au pool
+    await session.close()
+
+    if offset != upload.upload_offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Offset attendu : {upload.upload_offset}",
+            headers=_tus_headers(Upload_Offset=upload.upload_offset)
+        )
+    remaining = upload.upload_length - offset
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > remaining:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Le morceau dépasse la taille annoncée"
+        )
+    if upload_id in _in_progress:
+        raise HTTPException(status_code=status.HTTP_423_LOCKED, detail="Un morceau est déjà en cours d'envoi")
+
+    _in_progress.add(upload_id)
+    try:
+        written, overflow = await _append_chunk(request, upload.filepath, offset, remaining)
+        new_offset = offset + written
+        expires_at = _new_expiry()
+
+        async def save_offset(db: AsyncSession) -> bool:
+            # Seulement si l'offset n'a pas bougé : un PATCH concurrent (autre worker) l'emporte
+            result = await db.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.upload_offset == offset)
+                .values(upload_offset=new_offset, expires_at=expires_at)
+            )
+            return result.rowcount == 1
+
+        saved = await run_write(save_offset)
+    finally:
+        _in_progress.discard(upload_id)
+
+    if not saved:
+        logger.warning("Concurrent chunk upload rejected. Upload: %s, Offset: %s", upload_id, offset)
+        async with async_session_maker() as session:
+            current_offset = await session.scalar(
+                select(UploadSession.upload_offset).where(UploadSession.id == upload_id)
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Offset attendu : {current_offset}",
+            headers=_tus_headers(Upload_Offset=current_offset)
+        )
+
+    headers = _tus_headers(Upload_Offset=new_offset, Upload_Expires=_http_date(expires_at))
+    if overflow:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Le morceau dépasse la taille annoncée",
+            headers=headers
+        )
+    if new_offset == upload.upload_length:
+        upload.upload_offset = new_offset
+        headers["Upload-PDF-Id"] = str(await _finalize(upload, current_user.id))
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+
+
+@router.delete("/{upload_id}")
+async def cancel_upload(
+    upload_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Abandonne l'upload et supprime le fichier partiel"""
+    current_user = await _authenticate(request, session)
+    upload = await _get_upload(session, upload_id, current_user.id)
+    if upload_id in _in_progress:
+        raise HTTPException(status_code=status.HTTP_423_LOCKED, detail="Un morceau est en cours d'envoi")
+
+    async def delete_upload(db: AsyncSession):
+        await db.execute(delete(UploadSession).where(UploadSession.id == upload_id))
+
+    await run_write(delete_upload)
+    await run_in_threadpool(remove_file, upload.filepath)
+    logger.info("Resumable upload cancelled. ID: %s, User: %s", upload_id, current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_tus_headers())
+
+
+async def purge_expired_uploads() -> int:
+    """Supprime les uploads expirés et leurs fichiers partiels ; renvoie le nombre d'uploads purgés"""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(UploadSession.id, UploadSession.filepath).where(UploadSession.expires_at < datetime.utcnow())
+        )
+        expired = [row for row in result.all() if row.id not in _in_progress]
+    if not expired:
+        return 0
+
+    ids = [row.id for row in expired]
+
+    async def delete_uploads(db: AsyncSession):
+        await db.execute(delete(UploadSession).where(UploadSession.id.in_(ids)))
+
+    await run_write(delete_uploads)
+
+    def remove_files():
+        for row in expired:
+            remove_file(row.filepath)
+
+    await run_in_threadpool(remove_files)
+    logger.info("%s expired resumable uploads purged", len(expired))
+    return len(expired)
+
+
+async def _janitor(interval: float):
+    while True:
+        try:
+            await purge_expired_uploads()
+        except Exception:
+            logger.exception("Error purging expired uploads")
+        await asyncio.sleep(interval)
+
+
+def start_upload_janitor(interval: float = RESUMABLE_UPLOAD_PURGE_INTERVAL) -> None:
+    global _janitor_task
+    if _janitor_task is None or _janitor_task.done():
+        _janitor_task = asyncio.create_task(_janitor(interval), name="upload-janitor")
+
+
+async def stop_upload_janitor() -> None:
+    global _janitor_task
+    if _janitor_task is not None:
+        _janitor_task.cancel()
+        try:
+            await _janitor_task
+        except asyncio.CancelledError:
+            pass
+        _janitor_task = None
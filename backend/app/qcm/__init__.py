@@ -0,0 +1,4 @@
+# app/qcm/__init__.py
+from .qcm_routes import router
+
+__all__ = ["router"]
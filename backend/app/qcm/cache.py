@@ -0,0 +1,140 @@
+# app/qcm/cache.py
+# Caches durables (partagés entre workers) de la génération :
+# - qcm_chunk_results : questions générées par morceau de texte. La clé ne dépend pas du nombre
+#   de questions : une entrée sert toute demande d'au plus autant de questions qu'elle en contient ;
+# - qcm_document_chunks : découpage d'un document (nettoyé, aligné sur ses sections) par
+#   empreinte du fichier et paramètres de découpage.
+import hashlib
+import logging
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_writer import run_write
+from app.core.config import QCM_BOILERPLATE_MIN_PAGES, QCM_BOILERPLATE_PAGE_RATIO, QCM_CHUNK_TOKENS
+from app.models import QCMChunkResult, QCMDocumentChunks
+from app.monitoring.metrics import record_cache
+from app.schemas import QuestionCreate
+from .chunking import Chunk
+from .llm import PROMPT_VERSION, Generation
+from .normalize import NormalizationReport
+from .tokens import tokenizer_name
+
+logger = logging.getLogger(__name__)
+
+# Clés par requête IN (limite de paramètres de SQLite)
+_LOOKUP_BATCH = 500
+# À incrémenter à chaque changement du nettoyage ou du découpage : invalide qcm_document_chunks
+CHUNKER_VERSION = "2"
+
+
+def chunk_cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{PROMPT_VERSION}\x00{model}\x00{text}".encode()).hexdigest()
+
+
+async def load_cached(session: AsyncSession, keys: Iterable[str]) -> Dict[str, List[QuestionCreate]]:
+    """Questions en cache pour ces clés (absentes du résultat si non générées)"""
+    keys = list(dict.fromkeys(keys))
+    cached: Dict[str, List[QuestionCreate]] = {}
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        rows = await session.execute(
+            select(QCMChunkResult.cache_key, QCMChunkResult.questions)
+            .where(QCMChunkResult.cache_key.in_(keys[start:start + _LOOKUP_BATCH]))
+        )
+        for key, questions in rows:
+            cached[key] = [QuestionCreate.model_validate(item) for item in orjson.loads(questions)]
+    return cached
+
+
+def take_cached(cached: Dict[str, List[QuestionCreate]], key: str, count: int, partial: bool = False):
+    """
+    Les count premières questions en cache, ou None si l'entrée n'en a pas assez (partial :
+    l'entrée est reprise même avec moins de questions)
+    """
+    questions = cached.get(key)
+    hit = questions is not None and (partial or len(questions) >= count)
+    record_cache("chunks", hit)
+    return questions[:count] if hit else None
+
+
+async def store_result(key: str, generation: Generation) -> None:
+    """Enregistre (ou remplace par une génération plus fournie) les questions d'un morceau"""
+    if not generation.questions:
+        return
+    payload = orjson.dumps([question.model_dump() for question in generation.questions]).decode()
+
+    async def upsert(db: AsyncSession):
+        entry = await db.get(QCMChunkResult, key)
+        if entry is None:
+            db.add(QCMChunkResult(
+                cache_key=key,
+                questions=payload,
+                prompt_tokens=generation.prompt_tokens,
+                completion_tokens=generation.completion_tokens
+            ))
+        elif len(orjson.loads(entry.questions)) < len(generation.questions):
+            entry.questions = payload
+            entry.prompt_tokens = generation.prompt_tokens
+            entry.completion_tokens = generation.completion_tokens
+
+    try:
+        await run_write(upsert)
+    except Exception as e:
+        # Course entre deux workers sur la même clé (Postgres) : le cache reste un cache
+        logger.warning("Could not store chunk result %s: %s", key[:12], e)
+
+
+def document_cache_key(content_hash: str) -> str:
+    params = (
+        CHUNKER_VERSION, content_hash, QCM_CHUNK_TOKENS,
+        QCM_BOILERPLATE_PAGE_RATIO, QCM_BOILERPLATE_MIN_PAGES, tokenizer_name(),
+    )
+    return hashlib.sha256("\x00".join(map(str, params)).encode()).hexdigest()
+
+
+async def load_documents(
+    session: AsyncSession, keys: Iterable[str]
+) -> Dict[str, Tuple[List[Chunk], NormalizationReport, str]]:
+    """(morceaux, rapport de nettoyage, origine des titres) des documents déjà découpés"""
+    keys = list(dict.fromkeys(keys))
+    documents = {}
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        rows = await session.execute(
+            select(QCMDocumentChunks.cache_key, QCMDocumentChunks.chunks,
+                   QCMDocumentChunks.normalization, QCMDocumentChunks.structure)
+            .where(QCMDocumentChunks.cache_key.in_(keys[start:start + _LOOKUP_BATCH]))
+        )
+        for key, chunks, normalization, structure in rows:
+            documents[key] = (
+                [Chunk(**item) for item in orjson.loads(chunks)],
+                NormalizationReport(**orjson.loads(normalization)),
+                structure,
+            )
+    return documents
+
+
+async def store_documents(entries: Dict[str, Tuple[List[Chunk], NormalizationReport, str]]) -> None:
+    """Enregistre des découpages (clé déjà présente : ignorée, le découpage est déterministe)"""
+    rows = [
+        {
+            "cache_key": key,
+            "chunks": orjson.dumps(chunks).decode(),
+            "normalization": orjson.dumps(asdict(report)).decode(),
+            "structure": structure,
+        }
+        for key, (chunks, report, structure) in entries.items()
+    ]
+
+    async def insert_new(db: AsyncSession):
+        existing = set((await db.scalars(
+            select(QCMDocumentChunks.cache_key).where(QCMDocumentChunks.cache_key.in_(entries))
+        )).all())
+        db.add_all(QCMDocumentChunks(**row) for row in rows if row["cache_key"] not in existing)
+
+    try:
+        await run_write(insert_new)
+    except Exception as e:
+        logger.warning("Could not store %s document chunkings: %s", len(rows), e)
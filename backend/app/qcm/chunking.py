@@ -0,0 +1,128 @@
+# app/qcm/chunking.py
+# Découpage du texte d'un document en morceaux d'au plus max_tokens, par paragraphes entiers
+# (un paragraphe trop long est coupé sur les espaces), en gardant les pages couvertes.
+# Les tailles sont comptées par l'estimateur de tokens (tokens.py).
+# Quand le document a des titres (structure.py), les morceaux suivent les sections : une
+# section tient dans un seul morceau, les petites sections voisines sont regroupées (un
+# chapitre commence un nouveau morceau dès que le précédent est à moitié plein) et seule une
+# section plus longue que max_tokens est coupée, entre deux paragraphes.
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .extraction import NONE, TEXT, Heading
+from .structure import Section, split_sections, text_headings
+from .tokens import estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# (page, paragraphe, tokens)
+Paragraph = Tuple[int, str, int]
+
+
+@dataclass(slots=True)
+class Chunk:
+    index: int
+    text: str
+    # Pages couvertes (numérotées à partir de 1)
+    page_start: int
+    page_end: int
+    tokens: int
+    # Titre de la (première) section couverte
+    title: Optional[str] = None
+
+
+def _split_long(paragraph: str, max_chars: int) -> Iterator[str]:
+    while len(paragraph) > max_chars:
+        cut = paragraph.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield paragraph[:cut].strip()
+        paragraph = paragraph[cut:].strip()
+    if paragraph:
+        yield paragraph
+
+
+def _measured(paragraphs: Iterable[Tuple[int, str]], max_tokens: int) -> List[Paragraph]:
+    return [
+        (page_number, piece, estimate_tokens(piece))
+        for page_number, paragraph in paragraphs
+        for piece in _split_long(paragraph, max_tokens * 4)
+    ]
+
+
+def _page_paragraphs(pages: Sequence[str]) -> Iterator[Tuple[int, str]]:
+    for page_number, text in enumerate(pages, start=1):
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            paragraph = " ".join(paragraph.split())
+            if paragraph:
+                yield page_number, paragraph
+
+
+def pack_paragraphs(paragraphs: Iterable[Paragraph], max_tokens: int, chunks: List[Chunk],
+                    title: Optional[str] = None) -> None:
+    """Ajoute à chunks les morceaux formés de paragraphes consécutifs"""
+    parts: List[str] = []
+    tokens = 0
+    page_start = page_end = 0
+
+    def flush():
+        chunks.append(Chunk(len(chunks), "\n\n".join(parts), page_start, page_end, tokens, title))
+
+    for page_number, paragraph, paragraph_tokens in paragraphs:
+        if parts and tokens + paragraph_tokens > max_tokens:
+            flush()
+            parts, tokens = [], 0
+        if not parts:
+            page_start = page_number
+        parts.append(paragraph)
+        tokens += paragraph_tokens
+        page_end = page_number
+    if parts:
+        flush()
+
+
+def chunk_pages(pages: Sequence[str], max_tokens: int) -> List[Chunk]:
+    chunks: List[Chunk] = []
+    pack_paragraphs(_measured(_page_paragraphs(pages), max_tokens), max_tokens, chunks)
+    return chunks
+
+
+def chunk_sections(sections: Sequence[Section], max_tokens: int) -> List[Chunk]:
+    chunks: List[Chunk] = []
+    group: List[Tuple[Section, List[Paragraph]]] = []
+    group_tokens = 0
+
+    def flush_group():
+        title = next((section.title for section, _ in group if section.title), None)
+        pack_paragraphs((paragraph for _, paragraphs in group for paragraph in paragraphs), max_tokens, chunks, title)
+        group.clear()
+
+    for section in sections:
+        paragraphs = _measured(section.paragraphs, max_tokens)
+        tokens = sum(paragraph[2] for paragraph in paragraphs)
+        if group and (
+            group_tokens + tokens > max_tokens
+            or (section.level == 1 and group_tokens >= max_tokens // 2)
+        ):
+            flush_group()
+            group_tokens = 0
+        if tokens > max_tokens:
+            pack_paragraphs(paragraphs, max_tokens, chunks, section.title)
+            continue
+        group.append((section, paragraphs))
+        group_tokens += tokens
+    if group:
+        flush_group()
+    return chunks
+
+
+def chunk_document(pages: Sequence[str], headings: Sequence[Heading], structure: str,
+                   max_tokens: int) -> Tuple[List[Chunk], str]:
+    """Morceaux alignés sur les sections (titres fournis, sinon reconnus dans le texte) et origine des titres"""
+    if not headings:
+        headings = text_headings(pages)
+        structure = TEXT if headings else NONE
+    if not headings:
+        return chunk_pages(pages, max_tokens), NONE
+    return chunk_sections(split_sections(pages, headings), max_tokens), structure
@@ -0,0 +1,148 @@
+# app/qcm/extraction.py
+# Extraction du texte d'un PDF, page par page (pypdf), avec sa structure :
+# - le sommaire (signets) du PDF quand il en a un : titres, niveaux et pages exacts ;
+# - sinon, les titres repérés à la taille de leur police (voir font_headings).
+# Appel bloquant : à exécuter dans un thread.
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from app.monitoring.metrics import PDF_EXTRACTION_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Un titre est écrit au moins HEADING_SIZE_RATIO fois plus gros que le corps du texte
+HEADING_SIZE_RATIO = 1.15
+HEADING_MAX_CHARS = 120
+MAX_HEADING_LEVEL = 3
+
+OUTLINE, FONTS, TEXT, NONE = "outline", "fonts", "text", "none"
+
+
+@dataclass(slots=True)
+class Heading:
+    title: str
+    # Page du titre (numérotée à partir de 1) et niveau (1 = chapitre)
+    page: int
+    level: int = 1
+
+
+@dataclass
+class ExtractedDocument:
+    pages: List[str]
+    headings: List[Heading] = field(default_factory=list)
+    # Origine des titres : OUTLINE, FONTS, TEXT (motifs du texte, voir structure.py) ou NONE
+    structure: str = NONE
+
+
+def outline_headings(reader) -> List[Heading]:
+    """Titres du sommaire du PDF, dans l'ordre du document"""
+    headings: List[Heading] = []
+
+    def walk(items, level: int):
+        for item in items:
+            # Une liste imbriquée contient les enfants de l'entrée précédente
+            if isinstance(item, list):
+                walk(item, level + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(item) + 1
+            except Exception:
+                continue
+            title = " ".join(str(item.title or "").split())
+            if title and page > 0:
+                headings.append(Heading(title, page, min(level, MAX_HEADING_LEVEL)))
+
+    try:
+        walk(reader.outline, 1)
+    except Exception as e:  # sommaire corrompu : on se rabat sur les polices
+        logger.debug("Unreadable PDF outline: %s", e)
+        return []
+    headings.sort(key=lambda heading: heading.page)
+    return headings
+
+
+def _run_lines(runs: Sequence[Tuple[str, float]]) -> List[Tuple[str, float]]:
+    """Fragments consécutifs d'une page regroupés en lignes de même taille (arrondie au demi-point)"""
+    lines: List[list] = []
+    new_line = True
+    for text, size in runs:
+        size = round(size * 2) / 2
+        for i, piece in enumerate(text.split("\n")):
+            if i > 0 or new_line or lines[-1][1] != size:
+                lines.append([piece, size])
+            else:
+                lines[-1][0] += piece
+            new_line = False
+    return [(text, size) for text, size in lines]
+
+
+def font_headings(page_runs: Sequence[Sequence[Tuple[str, float]]]) -> List[Heading]:
+    """
+    Titres d'après la taille de police : (texte, taille) des fragments de chaque page.
+    Le corps du texte est la taille la plus fréquente (pondérée par caractère) ; une ligne
+    nettement plus grosse et courte est un titre, de niveau d'autant plus haut qu'elle est grosse.
+    """
+    lines_by_page = [_run_lines(runs) for runs in page_runs]
+    weights: Dict[float, int] = {}
+    for lines in lines_by_page:
+        for text, size in lines:
+            weights[size] = weights.get(size, 0) + len(text.strip())
+    if not weights:
+        return []
+
+    body_size = max(weights, key=weights.get)
+    candidates = []
+    for page_number, lines in enumerate(lines_by_page, start=1):
+        for text, size in lines:
+            title = " ".join(text.split())
+            if (
+                size >= body_size * HEADING_SIZE_RATIO
+                and 3 <= len(title) <= HEADING_MAX_CHARS
+                and any(character.isalpha() for character in title)
+            ):
+                candidates.append((title, page_number, size))
+
+    sizes = sorted({size for _, _, size in candidates}, reverse=True)
+    levels = {size: min(rank + 1, MAX_HEADING_LEVEL) for rank, size in enumerate(sizes)}
+    return [Heading(title, page, levels[size]) for title, page, size in candidates]
+
+
+def _effective_size(cm: Sequence[float], tm: Sequence[float], font_size: float) -> float:
+    # Taille affichée : taille nominale mise à l'échelle par les matrices de texte et de page
+    scale = math.hypot(tm[2], tm[3]) * math.hypot(cm[2], cm[3])
+    return font_size * scale if scale > 0 else font_size
+
+
+def extract_document(path: str) -> ExtractedDocument:
+    """Texte de chaque page et titres ; document vide si le fichier est illisible"""
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    started = time.perf_counter()
+    try:
+        reader = PdfReader(path)
+        headings = outline_headings(reader)
+        if headings:
+            return ExtractedDocument([page.extract_text() or "" for page in reader.pages], headings, OUTLINE)
+
+        pages: List[str] = []
+        page_runs: List[List[Tuple[str, float]]] = []
+        for page in reader.pages:
+            runs: List[Tuple[str, float]] = []
+
+            def visitor(text, cm, tm, font_dict, font_size, runs=runs):
+                if text and font_size:
+                    runs.append((text, _effective_size(cm, tm, font_size)))
+
+            pages.append(page.extract_text(visitor_text=visitor) or "")
+            page_runs.append(runs)
+        headings = font_headings(page_runs)
+        return ExtractedDocument(pages, headings, FONTS if headings else NONE)
+    except (PdfReadError, OSError, ValueError) as e:
+        logger.warning("Could not extract text from PDF %s: %s", path, e)
+        return ExtractedDocument([])
+    finally:
+        PDF_EXTRACTION_DURATION.observe(time.perf_counter() - started)
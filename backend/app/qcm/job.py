@@ -0,0 +1,356 @@
+# app/qcm/job.py
+# Génération de QCM sur un ensemble de PDFs (un PDF, ou tous les PDFs d'un dossier et de ses
+# sous-dossiers), diffusée sous forme d'événements de progression :
+# 1. extraction du texte et des titres, nettoyage (normalize.py) et découpage selon les
+#    sections (chunking.py), en threads, QCM_EXTRACTION_CONCURRENCY à la fois ; le découpage
+#    est mis en cache par empreinte du PDF (cache.py) ;
+# 2. plan : quotas de questions et budget de tokens (planner.py), morceaux déjà en cache ;
+# 3. appels au LLM en parallèle pour tous les documents, sous une limite globale au worker
+#    (QCM_LLM_CONCURRENCY, partagée par toutes les générations en cours) ;
+# 4. dès qu'un document est terminé, ses questions sont enregistrées en un quiz (banque du PDF).
+# Le budget vient de l'admission (quota.py) ; chaque appel payé est journalisé (usage.py).
+# Une génération identique à une génération en cours attend sa fin (singleflight.py).
+# Événements : coalesced et waiting (génération identique en cours), extracting, planned, chunk,
+# document (aussi pour un PDF illisible), done.
+import asyncio
+import logging
+import uuid
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import (
+    QCM_CHUNK_TOKENS,
+    QCM_EXTRACTION_CONCURRENCY,
+    QCM_LLM_CONCURRENCY,
+    QCM_MAX_QUESTIONS_PER_CHUNK,
+)
+from app.database import async_session_maker
+from app.db_writer import run_write
+from app.models import Folder, PDF
+from app.quiz.quiz_service import create_quiz
+from app.monitoring.metrics import record_cache
+from app.pdf.pdf_storage import sha256_file
+from .cache import (
+    chunk_cache_key,
+    document_cache_key,
+    load_cached,
+    load_documents,
+    store_documents,
+    store_result,
+    take_cached,
+)
+from .chunking import chunk_document
+from .extraction import NONE, extract_document
+from .llm import generate_questions, get_generator
+from .normalize import is_boilerplate, normalize_document
+from .planner import Document, PlannedCall, plan_generation
+from .quota import Admission
+from .singleflight import flight_key, single_flight
+from .tokens import token_cost
+from .usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# Appels LLM simultanés du worker, toutes générations confondues (créé dans la boucle courante)
+_llm_slots: Optional[asyncio.Semaphore] = None
+
+
+def llm_slots() -> asyncio.Semaphore:
+    global _llm_slots
+    if _llm_slots is None:
+        _llm_slots = asyncio.Semaphore(QCM_LLM_CONCURRENCY)
+    return _llm_slots
+
+
+async def folder_subtree(session: AsyncSession, user_id: int, folder_id: int) -> List[int]:
+    """Le dossier et tous ses descendants : une requête par niveau (index parent_id)"""
+    subtree = [folder_id]
+    frontier = [folder_id]
+    while frontier:
+        frontier = list((await session.scalars(
+            select(Folder.id).where(Folder.parent_id.in_(frontier), Folder.user_id == user_id)
+        )).all())
+        subtree.extend(frontier)
+    return subtree
+
+
+# Colonnes d'un PDF à générer : (id, dossier, nom, chemin, empreinte)
+PDF_COLUMNS = (PDF.id, PDF.folder_id, PDF.original_filename, PDF.filepath, PDF.content_hash)
+
+
+async def folder_pdfs(session: AsyncSession, user_id: int, folder_id: int) -> List[tuple]:
+    """PDFs du sous-arbre (PDF_COLUMNS), dans l'ordre d'upload"""
+    folder_ids = await folder_subtree(session, user_id, folder_id)
+    rows = await session.execute(
+        select(*PDF_COLUMNS)
+        .where(PDF.user_id == user_id, PDF.folder_id.in_(folder_ids))
+        .order_by(PDF.upload_date, PDF.id)
+    )
+    return list(rows.all())
+
+
+async def content_hashes(pdfs: Sequence[tuple]) -> Dict[int, Optional[str]]:
+    """
+    Empreinte de chaque PDF ; celles des PDFs importés avant son calcul sont calculées (threads)
+    et enregistrées. None si le fichier est introuvable
+    """
+    hashes = {pdf[0]: pdf[4] for pdf in pdfs}
+    missing = [(pdf_id, filepath) for pdf_id, _, _, filepath, content_hash in pdfs if content_hash is None]
+
+    async def compute(pdf_id: int, filepath: str):
+        try:
+            hashes[pdf_id] = await run_in_threadpool(sha256_file, filepath)
+        except OSError as e:
+            logger.warning("Could not hash PDF %s: %s", pdf_id, e)
+
+    await asyncio.gather(*(compute(*pdf) for pdf in missing))
+    computed = [{"b_id": pdf_id, "b_hash": hashes[pdf_id]} for pdf_id, _ in missing if hashes[pdf_id]]
+    if computed:
+        async def store_hashes(db: AsyncSession):
+            pdfs_table = PDF.__table__
+            await db.execute(
+                update(pdfs_table)
+                .where(pdfs_table.c.id == bindparam("b_id"))
+                .values(content_hash=bindparam("b_hash")),
+                computed
+            )
+
+        await run_write(store_hashes)
+    return hashes
+
+
+def build_document(pdf_id: int, folder_id: Optional[int], title: str, filepath: str) -> Document:
+    """Extraction, nettoyage et découpage d'un PDF ; appel bloquant"""
+    extracted = extract_document(filepath)
+    pages, report, verbatim = normalize_document(extracted.pages)
+    # En-tête courant écrit en gros (ou repris dans le sommaire) : ce n'est pas un titre de section
+    headings = [heading for heading in extracted.headings if not is_boilerplate(heading.title, verbatim)]
+    chunks, structure = chunk_document(pages, headings, extracted.structure, QCM_CHUNK_TOKENS)
+    logger.debug("QCM document prepared. PDF: %s, Tokens: %s -> %s, Structure: %s, Chunks: %s",
+                 pdf_id, report.tokens_before, report.tokens_after, structure, len(chunks))
+    return Document(pdf_id, folder_id, title, chunks, report, structure)
+
+
+async def prepare_documents(
+    pdfs: Sequence[tuple], hashes: Dict[int, Optional[str]]
+) -> Tuple[List[Document], Dict[int, str]]:
+    """
+    Découpage de chaque PDF (PDF_COLUMNS, empreintes de content_hashes) : depuis le cache, ou
+    préparé quelques-uns à la fois. Un PDF illisible donne un document vide et une erreur
+    (par identifiant de PDF)
+    """
+    limit = asyncio.Semaphore(QCM_EXTRACTION_CONCURRENCY)
+    errors: Dict[int, str] = {}
+    keys = {
+        pdf_id: document_cache_key(content_hash)
+        for pdf_id, content_hash in hashes.items() if content_hash
+    }
+    async with async_session_maker() as session:
+        cached = await load_documents(session, keys.values())
+    fresh = {}
+    # Même fichier plusieurs fois dans la génération (copies) : découpé une seule fois
+    building: Dict[str, asyncio.Future] = {}
+
+    async def build(pdf_id: int, folder_id: Optional[int], title: str, filepath: str) -> Document:
+        async with limit:
+            return await run_in_threadpool(build_document, pdf_id, folder_id, title, filepath)
+
+    async def prepare(pdf_id: int, folder_id: Optional[int], title: str, filepath: str, _) -> Document:
+        key = keys.get(pdf_id)
+        if key is not None:
+            record_cache("documents", key in cached or key in building)
+            if key in cached:
+                return Document(pdf_id, folder_id, title, *cached[key])
+            if key not in building:
+                building[key] = asyncio.ensure_future(build(pdf_id, folder_id, title, filepath))
+            task = building[key]
+        else:
+            task = build(pdf_id, folder_id, title, filepath)
+        try:
+            document = await task
+        except Exception as e:
+            logger.warning("QCM text extraction failed. PDF: %s, Error: %s", pdf_id, e)
+            errors[pdf_id] = str(e) or type(e).__name__
+            return Document(pdf_id, folder_id, title)
+        if key is not None and document.chunks:
+            fresh[key] = (document.chunks, document.normalization, document.structure)
+        return Document(pdf_id, folder_id, title, document.chunks, document.normalization, document.structure)
+
+    documents = list(await asyncio.gather(*(prepare(*pdf) for pdf in pdfs)))
+    if fresh:
+        await store_documents(fresh)
+    return documents, errors
+
+
+async def run_generation(
+    user_id: int,
+    pdfs: Sequence[tuple],
+    question_count: int,
+    admission: Admission,
+    title: str
+) -> AsyncIterator[dict]:
+    """Événements de progression d'une génération ; les quiz sont créés au fil de l'eau"""
+    try:
+        hashes = await content_hashes(pdfs)
+        key = flight_key(hashes.values(), question_count, admission.budget, get_generator().model)
+        # Fermeture explicite (client déconnecté) : le bail est rendu tout de suite
+        async with aclosing(single_flight(
+            key, lambda replay: _generate(user_id, pdfs, hashes, question_count, admission, title, replay)
+        )) as events:
+            async for event in events:
+                yield event
+    finally:
+        admission.release()
+
+
+async def _generate(
+    user_id: int,
+    pdfs: Sequence[tuple],
+    hashes: Dict[int, Optional[str]],
+    question_count: int,
+    admission: Admission,
+    title: str,
+    replay: bool = False
+) -> AsyncIterator[dict]:
+    """
+    replay : une génération identique vient de tourner (singleflight.py) ; ses morceaux sont
+    repris tels qu'en cache, même avec moins de questions que demandé, plutôt que regénérés
+    """
+    generator = get_generator()
+    job_id = uuid.uuid4().hex
+    yield {"event": "extracting", "job_id": job_id, "documents": len(pdfs)}
+    documents, extraction_errors = await prepare_documents(pdfs, hashes)
+
+    cache_keys = {
+        index: [chunk_cache_key(generator.model, chunk.text) for chunk in document.chunks]
+        for index, document in enumerate(documents)
+    }
+    async with async_session_maker() as session:
+        cached = await load_cached(session, (key for keys in cache_keys.values() for key in keys))
+    cached_counts = {
+        key: QCM_MAX_QUESTIONS_PER_CHUNK if replay else len(questions) for key, questions in cached.items()
+    }
+    plan = plan_generation(
+        documents, question_count, admission.budget, QCM_MAX_QUESTIONS_PER_CHUNK, cache_keys, cached_counts
+    )
+    yield {
+        "event": "planned",
+        "documents": len(documents),
+        "chunks": sum(len(document.chunks) for document in documents),
+        # Tokens retirés par le nettoyage (en-têtes, pieds de page, filigranes...)
+        "saved_tokens": sum(document.normalization.saved_tokens for document in documents),
+        # Documents découpés selon leurs titres (sommaire, polices ou motifs du texte)
+        "structured_documents": sum(document.structure != NONE for document in documents),
+        "calls": len(plan.calls),
+        "cached_calls": sum(call.cached for call in plan.calls),
+        "skipped_calls": plan.skipped_calls,
+        "requested_questions": plan.requested_questions,
+        "planned_questions": plan.planned_questions,
+        "budget": admission.budget,
+        "estimated_tokens": plan.estimated_tokens,
+        "estimated_cost": plan.estimated_cost,
+    }
+    for pdf_id, error in extraction_errors.items():
+        yield {"event": "document", "pdf_id": pdf_id, "quiz_id": None, "questions": 0, "error": error}
+
+    async def run_call(call: PlannedCall):
+        """(appel, questions, (tokens du prompt, de la réponse), depuis le cache, erreur)"""
+        questions = take_cached(cached, call.cache_key, call.question_count, partial=replay)
+        if questions is not None:
+            return call, questions, (0, 0), True, None
+        try:
+            async with llm_slots():
+                generation = await generate_questions(generator, call.chunk.text, call.question_count)
+        except Exception as e:
+            # Un morceau en échec n'arrête pas la génération : l'erreur est signalée
+            logger.exception("QCM chunk generation failed. PDF: %s, Chunk: %s",
+                             documents[call.document].pdf_id, call.chunk.index)
+            return call, [], (0, 0), False, str(e)
+        usage = (generation.prompt_tokens, generation.completion_tokens)
+        await record_usage(user_id, job_id, documents[call.document].pdf_id, generator.model, *usage)
+        admission.consume(sum(usage))
+        await store_result(call.cache_key, generation)
+        return call, generation.questions, usage, False, None
+
+    remaining: Dict[int, int] = {}
+    for call in plan.calls:
+        remaining[call.document] = remaining.get(call.document, 0) + 1
+    results: Dict[int, List] = {index: [] for index in remaining}
+    tasks = [asyncio.create_task(run_call(call)) for call in plan.calls]
+    quiz_ids: List[int] = []
+    done = failed = generated = prompt_tokens = completion_tokens = 0
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            call, questions, (prompt, completion), from_cache, error = await next_result
+            done += 1
+            prompt_tokens += prompt
+            completion_tokens += completion
+            document = documents[call.document]
+            event = {
+                "event": "chunk",
+                "done": done,
+                "total": len(tasks),
+                "pdf_id": document.pdf_id,
+                "pages": [call.chunk.page_start, call.chunk.page_end],
+                "questions": len(questions),
+                "cached": from_cache,
+            }
+            if error:
+                failed += 1
+                event["error"] = error
+            yield event
+
+            for question in questions:
+                if question.source_page is None:
+                    question.source_page = call.chunk.page_start
+            results[call.document].append((call.chunk.index, questions))
+            remaining[call.document] -= 1
+            if remaining[call.document]:
+                continue
+            # Document terminé : ses questions, dans l'ordre du texte, forment un quiz
+            ordered = [
+                question
+                for _, chunk_questions in sorted(results.pop(call.document), key=lambda result: result[0])
+                for question in chunk_questions
+            ]
+            quiz_id = await save_document_quiz(user_id, document, ordered, title)
+            if quiz_id is not None:
+                quiz_ids.append(quiz_id)
+                generated += len(ordered)
+            yield {"event": "document", "pdf_id": document.pdf_id, "quiz_id": quiz_id, "questions": len(ordered)}
+    finally:
+        # Client déconnecté : les appels encore en file sont abandonnés
+        for task in tasks:
+            task.cancel()
+
+    logger.info("QCM generation finished. Job: %s, Documents: %s, Questions: %s, Prompt tokens: %s, "
+                "Completion tokens: %s, Failed chunks: %s, Failed documents: %s, User: %s",
+                job_id, len(documents), generated, prompt_tokens, completion_tokens, failed,
+                len(extraction_errors), user_id)
+    yield {
+        "event": "done",
+        "job_id": job_id,
+        "quiz_ids": quiz_ids,
+        "questions": generated,
+        "tokens": prompt_tokens + completion_tokens,
+        "cost": token_cost(prompt_tokens, completion_tokens),
+        "failed_chunks": failed,
+        "failed_documents": len(extraction_errors),
+    }
+
+
+async def save_document_quiz(user_id: int, document: Document, questions: List, title: str) -> Optional[int]:
+    if not questions:
+        return None
+
+    async def insert_quiz(db: AsyncSession) -> int:
+        return await create_quiz(
+            db, user_id, f"{title} - {document.title}"[:255], questions, document.pdf_id, document.folder_id
+        )
+
+    return await run_write(insert_quiz)
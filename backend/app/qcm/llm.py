@@ -0,0 +1,141 @@
+# app/qcm/llm.py
+# Génération de questions pour un morceau de texte. Deux fournisseurs :
+# - "openai" : modèle de chat via langchain-openai, réponse JSON ;
+# - "stub" : générateur local déterministe (phrases à compléter), sans réseau ni clé API,
+#   pour le développement, les tests et les bancs de charge.
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from app.core.config import OPENAI_API_KEY, QCM_LLM_MODEL, QCM_LLM_PROVIDER, QCM_LLM_TIMEOUT
+from app.monitoring.metrics import LLM_REQUEST_DURATION, LLM_TOKENS
+from app.schemas import QuestionCreate
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter à chaque changement de prompt : invalide le cache des morceaux
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "Tu rédiges des questions à choix multiples (QCM) en français à partir d'un extrait de cours. "
+    "Chaque question porte sur une notion de l'extrait, a 4 options dont au moins une correcte, "
+    "et une courte explication. Réponds uniquement en JSON : "
+    '{"questions": [{"text": "...", "options": ["...", "...", "...", "..."], '
+    '"correct": [indices des bonnes options], "explanation": "..."}]}'
+)
+USER_PROMPT = "Rédige {count} questions à partir de cet extrait :\n\n{text}"
+
+_WORD = re.compile(r"[^\W\d_]{5,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+@dataclass(slots=True)
+class Generation:
+    questions: List[QuestionCreate] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+def parse_questions(items: Iterable) -> List[QuestionCreate]:
+    """Questions valides de la réponse du modèle ; les autres sont ignorées"""
+    questions = []
+    for item in items:
+        try:
+            questions.append(QuestionCreate.model_validate(item))
+        except (ValidationError, TypeError, ValueError):
+            logger.debug("Invalid generated question skipped: %s", item)
+    return questions
+
+
+class StubGenerator:
+    """Phrases de l'extrait à compléter ; distracteurs tirés du vocabulaire de l'extrait"""
+    model = "stub"
+
+    async def generate(self, text: str, count: int) -> Generation:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+        vocabulary = sorted(set(_WORD.findall(text)))
+        sentences = [s for s in _SENTENCE_END.split(text) if len(_WORD.findall(s)) >= 1]
+        questions = []
+        for sentence in sentences:
+            if len(questions) == count or len(vocabulary) < 4:
+                break
+            answer = max(_WORD.findall(sentence), key=len)
+            distractors = rng.sample([word for word in vocabulary if word != answer], 3)
+            options = distractors + [answer]
+            rng.shuffle(options)
+            questions.append(QuestionCreate(
+                text=f"Quel mot complète la phrase : « {sentence.replace(answer, '_____', 1)} » ?",
+                options=options,
+                correct=[options.index(answer)],
+                explanation=f"La phrase de l'extrait est : « {sentence} »",
+            ))
+        completion = sum(estimate_tokens(q.model_dump_json()) for q in questions)
+        return Generation(questions, estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(text), completion)
+
+
+class OpenAIGenerator:
+    def __init__(self, model: str, api_key: Optional[str], timeout: float):
+        from langchain_openai import ChatOpenAI
+
+        self.model = model
+        self._llm = ChatOpenAI(
+            model=model,
+            api_key=api_key,
+            timeout=timeout,
+            temperature=0.2,
+            model_kwargs={"response_format": {"type": "json_object"}},
+        )
+
+    async def generate(self, text: str, count: int) -> Generation:
+        response = await self._llm.ainvoke([
+            ("system", SYSTEM_PROMPT),
+            ("human", USER_PROMPT.format(count=count, text=text)),
+        ])
+        usage = response.usage_metadata or {}
+        try:
+            items = json.loads(response.content).get("questions", [])
+        except (ValueError, AttributeError):
+            logger.warning("Unparseable LLM response (%s characters)", len(response.content or ""))
+            items = []
+        return Generation(
+            parse_questions(items)[:count],
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+        )
+
+
+_generator = None
+
+
+def get_generator():
+    """Générateur configuré (QCM_LLM_PROVIDER), créé au premier appel"""
+    global _generator
+    if _generator is None:
+        if QCM_LLM_PROVIDER == "openai":
+            _generator = OpenAIGenerator(QCM_LLM_MODEL, OPENAI_API_KEY, QCM_LLM_TIMEOUT)
+        else:
+            _generator = StubGenerator()
+    return _generator
+
+
+async def generate_questions(generator, text: str, count: int) -> Generation:
+    """Appel instrumenté (latence, tokens consommés)"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        generation = await generator.generate(text, count)
+        outcome = "success"
+    finally:
+        LLM_REQUEST_DURATION.labels(model=generator.model, outcome=outcome).observe(time.perf_counter() - started)
+    LLM_TOKENS.labels(model=generator.model, kind="prompt").inc(generation.prompt_tokens)
+    LLM_TOKENS.labels(model=generator.model, kind="completion").inc(generation.completion_tokens)
+    return generation
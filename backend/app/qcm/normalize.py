@@ -0,0 +1,152 @@
+# app/qcm/normalize.py
+# Nettoyage du texte extrait avant découpage : tout ce qui reste est envoyé (et facturé) au LLM.
+# - éléments répétés : les exports de diapositives et de polycopiés répètent en-têtes, pieds de
+#   page, numéros de page et filigranes sur chaque page. Chaque ligne courte est réduite à une
+#   empreinte (casse et espaces neutralisés ; chiffres aussi dans les MARGIN_LINES premières
+#   et dernières lignes de la page : « Page 3/40 » = « Page 17/40 ») ; une empreinte présente
+#   sur au moins QCM_BOILERPLATE_PAGE_RATIO des pages (et sur au moins
+#   QCM_BOILERPLATE_MIN_PAGES pages) est retirée partout. En marge, les lignes réduites à un
+#   numéro de page sont retirées quel que soit le nombre de pages (dans le corps de la page,
+#   un nombre seul est du contenu : valeurs d'un tableau, étapes numérotées) ;
+# - typographie : césures de fin de ligne recollées, ligatures et espaces insécables remplacés,
+#   espaces et lignes vides en série réduits.
+# Le rapport indique les tokens économisés. normalize_document renvoie aussi les lignes répétées à
+# l'identique : un titre du sommaire ou des polices qui en fait partie est un en-tête courant.
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import QCM_BOILERPLATE_MIN_PAGES, QCM_BOILERPLATE_PAGE_RATIO
+from app.monitoring.metrics import QCM_NORMALIZATION_SAVED_TOKENS
+from .tokens import estimate_tokens
+
+# Au-delà, une ligne est du contenu même si elle se répète (définition rappelée sur chaque diapositive)
+MAX_BOILERPLATE_CHARS = 150
+# Lignes d'en-tête et de pied de page, où les numéros varient d'une page à l'autre
+MARGIN_LINES = 2
+# Lignes retirées citées dans le rapport
+REPORT_SAMPLES = 5
+
+_CHARACTERS = str.maketrans({
+    "\u00a0": " ", "\u202f": " ", "\u2009": " ", "\t": " ", "\r": "",
+    "\u00ad": "",  # césure conditionnelle
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+})
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r" {2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# « trans-\nformation » -> « transformation » (la suite commence par une minuscule)
+_HYPHENATION = re.compile(r"(\w)-\n(?=[a-zà-öø-ÿ])")
+_PAGE_NUMBER = re.compile(r"^(?:page|p\.|diapositive|slide)?\s*\d+\s*(?:(?:/|sur|of)\s*\d+)?$", re.IGNORECASE)
+
+
+@dataclass
+class NormalizationReport:
+    tokens_before: int = 0
+    tokens_after: int = 0
+    removed_lines: int = 0
+    # Quelques lignes répétées retirées, telles qu'elles apparaissent la première fois
+    boilerplate: List[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def saved_ratio(self) -> float:
+        return round(self.saved_tokens / self.tokens_before, 3) if self.tokens_before else 0.0
+
+
+def line_key(line: str, margin: bool) -> bytes:
+    """Empreinte d'une ligne : casse et espaces neutralisés, nombres aussi en marge"""
+    normalized = " ".join(line.split()).casefold()
+    if margin:
+        normalized = "\x00" + _DIGITS.sub("#", normalized)
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+
+def _clean_lines(page: str) -> List[str]:
+    return [_SPACES.sub(" ", line).strip() for line in page.translate(_CHARACTERS).split("\n")]
+
+
+def _margin(lines: List[str]) -> Set[int]:
+    """Indices des MARGIN_LINES premières et dernières lignes non vides"""
+    filled = [i for i, line in enumerate(lines) if line]
+    return set(filled[:MARGIN_LINES] + filled[-MARGIN_LINES:])
+
+
+def _line_keys(lines: List[str], margin: Set[int]) -> List[Optional[bytes]]:
+    """Empreinte de chaque ligne candidate (None : ligne vide ou trop longue)"""
+    return [
+        line_key(line, i in margin) if line and len(line) <= MAX_BOILERPLATE_CHARS else None
+        for i, line in enumerate(lines)
+    ]
+
+
+def repeated_keys(page_keys: Sequence[List[Optional[bytes]]]) -> Set[bytes]:
+    """Empreintes présentes sur assez de pages"""
+    if len(page_keys) < QCM_BOILERPLATE_MIN_PAGES:
+        return set()
+    page_counts: Dict[bytes, int] = {}
+    for keys in page_keys:
+        # Une fois par page, même si la ligne s'y répète
+        for key in set(keys):
+            if key is not None:
+                page_counts[key] = page_counts.get(key, 0) + 1
+    threshold = max(QCM_BOILERPLATE_MIN_PAGES, QCM_BOILERPLATE_PAGE_RATIO * len(page_keys))
+    return {key for key, count in page_counts.items() if count >= threshold}
+
+
+def normalize_pages(pages: Sequence[str]) -> Tuple[List[str], NormalizationReport]:
+    """Texte nettoyé de chaque page (même nombre de pages) et rapport"""
+    normalized, report, _ = normalize_document(pages)
+    return normalized, report
+
+
+def is_boilerplate(title: str, verbatim: Set[bytes]) -> bool:
+    """Titre (sommaire, polices) qui n'est qu'une ligne répétée à l'identique : un en-tête courant"""
+    return line_key(" ".join(title.translate(_CHARACTERS).split()), False) in verbatim
+
+
+def _verbatim_keys(page_keys: Sequence[List[Optional[bytes]]], page_lines: Sequence[List[str]],
+                   margins: Sequence[Set[int]]) -> Set[bytes]:
+    """
+    Lignes répétées à l'identique, chiffres compris : « Biochimie L2 » sur chaque page, mais pas
+    « 1. Notion 1 », « 2. Notion 2 » (titres de section en haut de page, dont seuls les numéros
+    changent). Seules les lignes de marge ont une empreinte à recalculer
+    """
+    exact_keys = [
+        [
+            line_key(line, False) if i in margin and key is not None else key
+            for i, (line, key) in enumerate(zip(lines, keys))
+        ]
+        for lines, keys, margin in zip(page_lines, page_keys, margins)
+    ]
+    return repeated_keys(exact_keys)
+
+
+def normalize_document(pages: Sequence[str]) -> Tuple[List[str], NormalizationReport, Set[bytes]]:
+    """normalize_pages, plus les empreintes des lignes répétées à l'identique (voir is_boilerplate)"""
+    report = NormalizationReport(tokens_before=sum(estimate_tokens(page) for page in pages))
+    page_lines = [_clean_lines(page) for page in pages]
+    margins = [_margin(lines) for lines in page_lines]
+    page_keys = [_line_keys(lines, margin) for lines, margin in zip(page_lines, margins)]
+    repeated = repeated_keys(page_keys)
+
+    normalized = []
+    for lines, keys, margin in zip(page_lines, page_keys, margins):
+        kept = []
+        for i, (line, key) in enumerate(zip(lines, keys)):
+            if line and (key in repeated or (i in margin and _PAGE_NUMBER.match(line))):
+                report.removed_lines += 1
+                if key in repeated and line not in report.boilerplate and len(report.boilerplate) < REPORT_SAMPLES:
+                    report.boilerplate.append(line)
+                continue
+            kept.append(line)
+        text = _HYPHENATION.sub(r"\1", "\n".join(kept))
+        normalized.append(_BLANK_LINES.sub("\n\n", text).strip())
+
+    report.tokens_after = sum(estimate_tokens(page) for page in normalized)
+    QCM_NORMALIZATION_SAVED_TOKENS.inc(max(0, report.saved_tokens))
+    return normalized, report, _verbatim_keys(page_keys, page_lines, margins)
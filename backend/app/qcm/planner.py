@@ -0,0 +1,174 @@
+# app/qcm/planner.py
+# Plan d'une génération sur plusieurs documents, avant tout appel au LLM :
+# - quotas de questions par document, proportionnels à la taille de leur contenu (tokens),
+#   puis par morceau au sein du document (plafonnés par morceau) ;
+# - budget de tokens : coût estimé de chaque appel (prompt + réponse, comptés par tokens.py),
+#   nul si le morceau est déjà en cache. Si le total dépasse le budget, les appels sont
+#   retenus à tour de rôle entre documents (morceaux espacés dans chaque document) tant que
+#   le budget le permet ; les questions des morceaux écartés sont reportées, dans la limite
+#   du budget, sur les morceaux retenus du même document (une question coûte bien moins
+#   qu'un morceau).
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.quiz.assembly import apportion
+from .chunking import Chunk
+from .extraction import NONE
+from .normalize import NormalizationReport
+from .llm import SYSTEM_PROMPT, USER_PROMPT
+from .tokens import estimate_tokens, token_cost
+
+# Réponse moyenne par question (énoncé, 4 options, explication, JSON) ; enveloppe des messages
+COMPLETION_TOKENS_PER_QUESTION = 120
+MESSAGE_OVERHEAD_TOKENS = 10
+
+
+@lru_cache(maxsize=None)
+def prompt_overhead_tokens() -> int:
+    """Consignes et format de réponse ajoutés à chaque morceau"""
+    return (
+        estimate_tokens(SYSTEM_PROMPT)
+        + estimate_tokens(USER_PROMPT.format(count=10, text=""))
+        + MESSAGE_OVERHEAD_TOKENS
+    )
+
+
+@dataclass(slots=True)
+class Document:
+    pdf_id: int
+    folder_id: Optional[int]
+    title: str
+    chunks: List[Chunk] = field(default_factory=list)
+    normalization: NormalizationReport = field(default_factory=NormalizationReport)
+    # Origine des titres ayant guidé le découpage (extraction.py)
+    structure: str = NONE
+
+    @property
+    def tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.chunks)
+
+
+@dataclass(slots=True)
+class PlannedCall:
+    document: int  # indice dans la liste des documents
+    chunk: Chunk
+    question_count: int
+    cache_key: str
+    cached: bool
+
+    @property
+    def estimated_prompt_tokens(self) -> int:
+        return 0 if self.cached else self.chunk.tokens + prompt_overhead_tokens()
+
+    @property
+    def estimated_completion_tokens(self) -> int:
+        return 0 if self.cached else self.question_count * COMPLETION_TOKENS_PER_QUESTION
+
+    @property
+    def estimated_tokens(self) -> int:
+        return self.estimated_prompt_tokens + self.estimated_completion_tokens
+
+
+@dataclass
+class GenerationPlan:
+    calls: List[PlannedCall]
+    requested_questions: int
+    # Appels écartés faute de budget
+    skipped_calls: int = 0
+
+    @property
+    def planned_questions(self) -> int:
+        return sum(call.question_count for call in self.calls)
+
+    @property
+    def estimated_tokens(self) -> int:
+        return sum(call.estimated_tokens for call in self.calls)
+
+    @property
+    def estimated_cost(self) -> float:
+        return token_cost(
+            sum(call.estimated_prompt_tokens for call in self.calls),
+            sum(call.estimated_completion_tokens for call in self.calls)
+        )
+
+
+def capped_apportion(total: int, weights: Sequence[float], cap: int) -> List[int]:
+    """Comme apportion, sans dépasser cap par part ; l'excédent va aux parts non plafonnées"""
+    counts = [0] * len(weights)
+    open_parts = [i for i, weight in enumerate(weights) if weight > 0]
+    remaining = min(total, cap * len(open_parts))
+    while remaining > 0 and open_parts:
+        shares = apportion(remaining, [weights[i] for i in open_parts])
+        for i, share in zip(open_parts, shares):
+            counts[i] += share
+        remaining = sum(max(0, counts[i] - cap) for i in open_parts)
+        for i in open_parts:
+            counts[i] = min(counts[i], cap)
+        open_parts = [i for i in open_parts if counts[i] < cap]
+    return counts
+
+
+def spread_order(count: int) -> List[int]:
+    """Indices 0..count-1 dans un ordre qui couvre tout l'intervalle tôt (0, n/2, n/4, 3n/4...)"""
+    bits = max(1, (count - 1).bit_length())
+    return sorted(range(count), key=lambda i: int(f"{i:0{bits}b}"[::-1], 2))
+
+
+def plan_generation(
+    documents: Sequence[Document],
+    question_count: int,
+    budget: int,
+    max_per_chunk: int,
+    cache_keys: Dict[int, List[str]],
+    cached_counts: Dict[str, int]
+) -> GenerationPlan:
+    """
+    cache_keys : clés de cache des morceaux de chaque document (par indice de document) ;
+    cached_counts : nombre de questions déjà en cache par clé
+    """
+    document_quotas = apportion(question_count, [document.tokens for document in documents])
+    per_document: List[List[PlannedCall]] = []
+    for index, (document, quota) in enumerate(zip(documents, document_quotas)):
+        chunk_quotas = capped_apportion(quota, [chunk.tokens for chunk in document.chunks], max_per_chunk)
+        calls = []
+        for chunk, count, key in zip(document.chunks, chunk_quotas, cache_keys[index]):
+            if count:
+                calls.append(PlannedCall(index, chunk, count, key, cached_counts.get(key, 0) >= count))
+        per_document.append(calls)
+
+    plan = GenerationPlan([], question_count)
+    if sum(call.estimated_tokens for calls in per_document for call in calls) <= budget:
+        plan.calls = [call for calls in per_document for call in calls]
+        return plan
+
+    # Budget dépassé : tour de rôle entre documents, morceaux espacés dans chacun
+    queues = [[calls[i] for i in spread_order(len(calls))] for calls in per_document]
+    kept: List[List[PlannedCall]] = [[] for _ in documents]
+    spent = 0
+    for rank in range(max((len(queue) for queue in queues), default=0)):
+        for index, queue in enumerate(queues):
+            if rank >= len(queue):
+                continue
+            call = queue[rank]
+            if spent + call.estimated_tokens <= budget:
+                kept[index].append(call)
+                spent += call.estimated_tokens
+            else:
+                plan.skipped_calls += 1
+
+    # Report des questions écartées sur les appels retenus non mis en cache du même document
+    for index, calls in enumerate(kept):
+        missing = sum(call.question_count for call in per_document[index]) - sum(c.question_count for c in calls)
+        for call in calls:
+            if call.cached:
+                continue
+            extra = min(missing, max_per_chunk - call.question_count,
+                        (budget - spent) // COMPLETION_TOKENS_PER_QUESTION)
+            if extra > 0:
+                call.question_count += extra
+                spent += extra * COMPLETION_TOKENS_PER_QUESTION
+                missing -= extra
+        calls.sort(key=lambda call: call.chunk.index)
+        plan.calls.extend(calls)
+    return plan
@@ -0,0 +1,125 @@
+# app/qcm/qcm_routes.py
+# Génération de QCM par le LLM, pour un PDF ou pour tout un dossier (sous-dossiers compris).
+# La réponse est un flux NDJSON de progression (voir job.py) ; chaque document terminé
+# devient un quiz de sa banque de questions. Les générations sont admises selon les quotas de
+# l'utilisateur (quota.py) ; sa consommation se consulte sur /qcm/usage.
+import logging
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import QCM_JOB_MAX_TOKENS, QCM_USER_DAILY_TOKENS
+from app.database import get_async_session
+from app.models import Folder, PDF
+from app.quiz.quiz_routes import authenticate
+from app.responses import FastJSONResponse, NDJSONResponse
+from app.schemas import QCMGenerate
+from .job import PDF_COLUMNS, folder_pdfs, run_generation
+from .quota import Admission, QuotaExceeded, admit
+from .usage import daily_usage, today
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/qcm", tags=["qcm"])
+
+
+async def admit_job(session: AsyncSession, user_id: int, spec: QCMGenerate) -> Admission:
+    """Admission selon les quotas (429 sinon), avec le budget demandé plafonné par QCM_JOB_MAX_TOKENS"""
+    budget = min(spec.max_tokens or QCM_JOB_MAX_TOKENS, QCM_JOB_MAX_TOKENS)
+    try:
+        return await admit(session, user_id, budget)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+
+# Route pour générer des QCM à partir d'un PDF
+@router.post("/pdf/{pdf_id}/generate")
+async def generate_pdf_qcm(
+    pdf_id: int,
+    spec: QCMGenerate,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Génère des questions à partir d'un PDF ; progression en NDJSON
+    """
+    current_user = await authenticate(request, session)
+    row = (await session.execute(
+        select(*PDF_COLUMNS)
+        .where(PDF.id == pdf_id, PDF.user_id == current_user.id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF non trouvé")
+    admission = await admit_job(session, current_user.id, spec)
+    # Aucune requête pendant la génération : la connexion est rendue au pool
+    await session.close()
+
+    logger.info("QCM generation started. PDF: %s, Questions: %s, Budget: %s, User: %s",
+                pdf_id, spec.question_count, admission.budget, current_user.id)
+    return NDJSONResponse(
+        run_generation(current_user.id, [tuple(row)], spec.question_count, admission, spec.title),
+        # Place rendue à la fin de la réponse, même si la génération n'a jamais démarré
+        on_close=admission.release
+    )
+
+
+# Route pour générer des QCM à partir d'un dossier
+@router.post("/folders/{folder_id}/generate")
+async def generate_folder_qcm(
+    folder_id: int,
+    spec: QCMGenerate,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Génère des questions à partir de tous les PDFs d'un dossier et de ses sous-dossiers :
+    quotas proportionnels à la taille de chaque document, un budget de tokens pour l'ensemble ;
+    progression fusionnée en NDJSON
+    """
+    current_user = await authenticate(request, session)
+    owned = await session.scalar(
+        select(Folder.id).where(Folder.id == folder_id, Folder.user_id == current_user.id)
+    )
+    if owned is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier non trouvé")
+    pdfs = await folder_pdfs(session, current_user.id, folder_id)
+    if not pdfs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aucun PDF dans ce dossier")
+    admission = await admit_job(session, current_user.id, spec)
+    await session.close()
+
+    logger.info("QCM generation started. Folder: %s, PDFs: %s, Questions: %s, Budget: %s, User: %s",
+                folder_id, len(pdfs), spec.question_count, admission.budget, current_user.id)
+    return NDJSONResponse(
+        run_generation(current_user.id, pdfs, spec.question_count, admission, spec.title),
+        # Place rendue à la fin de la réponse, même si la génération n'a jamais démarré
+        on_close=admission.release
+    )
+
+
+# Route pour la consommation de l'utilisateur
+@router.get("/usage")
+async def get_usage(
+    request: Request,
+    days: int = Query(30, ge=1, le=366),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Tokens consommés par jour (UTC, le plus récent d'abord) et reste du quota du jour
+    """
+    current_user = await authenticate(request, session)
+    usage = await daily_usage(session, current_user.id, today() - timedelta(days=days - 1))
+    used_today = sum(day.prompt_tokens + day.completion_tokens for day in usage if day.day == today())
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "daily_limit": QCM_USER_DAILY_TOKENS or None,
+            "used_today": used_today,
+            "remaining_today": max(0, QCM_USER_DAILY_TOKENS - used_today) if QCM_USER_DAILY_TOKENS else None,
+            "days": usage,
+        }
+    )
@@ -0,0 +1,73 @@
+# app/qcm/quota.py
+# Admission des générations : un utilisateur ne peut pas accaparer la limite de débit du
+# fournisseur, partagée par tous.
+# - générations simultanées : au plus QCM_USER_MAX_JOBS par utilisateur et par worker (comme
+#   QCM_LLM_CONCURRENCY, la limite d'appels au LLM qu'elles se partagent) ;
+# - tokens par jour : consommation du jour (llm_usage_daily) + budgets réservés par les
+#   générations en cours ne dépassent pas QCM_USER_DAILY_TOKENS. Le budget d'une génération est
+#   réduit au reste du quota ; la réservation diminue à mesure que la consommation réelle est
+#   enregistrée, et est libérée à la fin de la génération.
+# Vérification et réservation se font sans attente entre elles : pas de course dans un worker.
+import logging
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import QCM_USER_DAILY_TOKENS, QCM_USER_MAX_JOBS
+from .usage import tokens_used_today
+
+logger = logging.getLogger(__name__)
+
+# En dessous, une génération ne produirait presque rien
+MIN_JOB_TOKENS = 1000
+
+# Par utilisateur : générations en cours et tokens réservés (worker courant)
+_jobs: Dict[int, int] = {}
+_reserved: Dict[int, int] = {}
+
+
+class QuotaExceeded(Exception):
+    """Génération refusée ; le message s'adresse à l'utilisateur"""
+
+
+class Admission:
+    """Place d'une génération admise : budget accordé et tokens encore réservés"""
+    def __init__(self, user_id: int, budget: int):
+        self.user_id = user_id
+        self.budget = budget
+        self.reserved = budget
+        self.released = False
+        _jobs[user_id] = _jobs.get(user_id, 0) + 1
+        _reserved[user_id] = _reserved.get(user_id, 0) + budget
+
+    def consume(self, tokens: int) -> None:
+        """Tokens enregistrés dans l'agrégat du jour : ils ne sont plus à réserver"""
+        released = min(tokens, self.reserved)
+        self.reserved -= released
+        _reserved[self.user_id] -= released
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.consume(self.reserved)
+        _jobs[self.user_id] -= 1
+        if not _jobs[self.user_id]:
+            del _jobs[self.user_id]
+            del _reserved[self.user_id]
+
+
+async def admit(session: AsyncSession, user_id: int, budget: int) -> Admission:
+    """Admet une génération de budget tokens au plus ; QuotaExceeded sinon"""
+    used = await tokens_used_today(session, user_id) if QCM_USER_DAILY_TOKENS > 0 else 0
+
+    if _jobs.get(user_id, 0) >= QCM_USER_MAX_JOBS:
+        logger.info("QCM generation refused: too many jobs. User: %s", user_id)
+        raise QuotaExceeded("Trop de générations en cours, réessayez dans quelques instants")
+    if QCM_USER_DAILY_TOKENS > 0:
+        remaining = QCM_USER_DAILY_TOKENS - used - _reserved.get(user_id, 0)
+        if remaining < MIN_JOB_TOKENS:
+            logger.info("QCM generation refused: daily quota reached. User: %s, Used: %s", user_id, used)
+            raise QuotaExceeded("Quota quotidien de génération atteint")
+        budget = min(budget, remaining)
+    return Admission(user_id, budget)
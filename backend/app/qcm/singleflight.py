@@ -0,0 +1,222 @@
+# app/qcm/singleflight.py
+# Générations identiques simultanées (un PDF partagé, toute une classe qui clique en même temps) :
+# une seule tourne, les autres la suivent puis rejouent son résultat depuis le cache.
+# - clé : empreintes des documents et paramètres de génération, budget compris (flight_key), sans
+#   l'utilisateur ;
+# - dans un worker : la première génération ouvre un vol (_flights), les suivantes s'y
+#   rattachent et relaient son avancement (événements coalesced puis waiting) ;
+# - entre workers : le vol prend un bail en base (qcm_generation_leases), renouvelé toutes les
+#   QCM_LEASE_TTL / 3 secondes avec l'avancement. Un autre worker qui trouve le bail attend sa
+#   disparition (fin) ou son expiration (worker perdu) en le consultant régulièrement.
+# À la fin du vol, les générations en attente repassent par le vol (et le bail) : l'une d'elles
+# tourne pour son utilisateur (quiz, quota), les autres la suivent, et ainsi de suite. Elles
+# rejouent les morceaux déjà générés tels qu'ils sont en cache, même avec moins de questions que
+# demandé (replay) ; seuls les morceaux sans résultat (appel en échec, génération abandonnée)
+# sont envoyés au LLM, par une seule génération à la fois.
+import asyncio
+import hashlib
+import logging
+import uuid
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import QCM_LEASE_POLL_INTERVAL, QCM_LEASE_TTL
+from app.database import async_session_maker
+from app.db_writer import run_write
+from app.models import QCMGenerationLease
+from app.monitoring.metrics import record_cache
+from .cache import CHUNKER_VERSION
+from .llm import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Flight:
+    """Génération en cours dans ce worker, suivie par les générations identiques"""
+    owner: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # Appels au LLM terminés et prévus
+    done: int = 0
+    total: int = 0
+    finished: bool = False
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def publish(self, done: int, total: int) -> None:
+        self.done, self.total = done, total
+        self._notify()
+
+    def finish(self) -> None:
+        self.finished = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[dict]:
+        """Avancement jusqu'à la fin du vol (les étapes intermédiaires peuvent être sautées)"""
+        while not self.finished:
+            changed = self._changed
+            yield waiting_event(self.done, self.total)
+            await changed.wait()
+
+
+# Vols ouverts dans ce worker, par clé
+_flights: Dict[str, Flight] = {}
+
+
+def flight_key(
+    content_hashes: Iterable[Optional[str]], question_count: int, budget: int, model: str
+) -> Optional[str]:
+    """
+    Clé d'une génération ; None (pas de regroupement) si une empreinte manque. Le budget fait
+    partie de la clé : deux budgets différents ne retiennent pas les mêmes appels
+    """
+    hashes = list(content_hashes)
+    if not hashes or any(content_hash is None for content_hash in hashes):
+        return None
+    # Ordre des documents sans effet sur les appels au LLM
+    params = (PROMPT_VERSION, CHUNKER_VERSION, model, question_count, budget, *sorted(hashes))
+    return hashlib.sha256("\x00".join(map(str, params)).encode()).hexdigest()
+
+
+def waiting_event(done: int, total: int) -> dict:
+    return {"event": "waiting", "done": done, "total": total}
+
+
+async def lease_progress(key: str) -> Optional[Tuple[int, int]]:
+    """(appels terminés, prévus) de la génération qui tient le bail ; None si libre ou expiré"""
+    async with async_session_maker() as session:
+        row = (await session.execute(
+            select(QCMGenerationLease.done_calls, QCMGenerationLease.total_calls)
+            .where(QCMGenerationLease.flight_key == key, QCMGenerationLease.expires_at >= datetime.utcnow())
+        )).one_or_none()
+    return tuple(row) if row is not None else None
+
+
+async def acquire_lease(key: str, owner: str) -> bool:
+    """Prend le bail s'il est libre ou expiré"""
+    async def acquire(db: AsyncSession) -> bool:
+        now = datetime.utcnow()
+        await db.execute(
+            delete(QCMGenerationLease)
+            .where(QCMGenerationLease.flight_key == key, QCMGenerationLease.expires_at < now)
+        )
+        if await db.scalar(select(QCMGenerationLease.owner).where(QCMGenerationLease.flight_key == key)):
+            return False
+        db.add(QCMGenerationLease(
+            flight_key=key, owner=owner, expires_at=now + timedelta(seconds=QCM_LEASE_TTL)
+        ))
+        await db.flush()
+        return True
+
+    try:
+        return await run_write(acquire)
+    except IntegrityError:
+        # Pris au même instant par un autre worker (Postgres)
+        return False
+
+
+async def renew_lease(key: str, flight: Flight) -> None:
+    async def renew(db: AsyncSession):
+        await db.execute(
+            update(QCMGenerationLease)
+            .where(QCMGenerationLease.flight_key == key, QCMGenerationLease.owner == flight.owner)
+            .values(
+                expires_at=datetime.utcnow() + timedelta(seconds=QCM_LEASE_TTL),
+                done_calls=flight.done,
+                total_calls=flight.total
+            )
+        )
+
+    await run_write(renew)
+
+
+async def release_lease(key: str, owner: str) -> None:
+    async def release(db: AsyncSession):
+        await db.execute(
+            delete(QCMGenerationLease)
+            .where(QCMGenerationLease.flight_key == key, QCMGenerationLease.owner == owner)
+        )
+
+    try:
+        await run_write(release)
+    except Exception as e:
+        # Le bail expirera de lui-même
+        logger.warning("Could not release QCM generation lease %s: %s", key[:12], e)
+
+
+async def _heartbeat(key: str, flight: Flight) -> None:
+    while True:
+        await asyncio.sleep(QCM_LEASE_TTL / 3)
+        try:
+            await renew_lease(key, flight)
+        except Exception as e:
+            logger.warning("Could not renew QCM generation lease %s: %s", key[:12], e)
+
+
+async def single_flight(
+    key: Optional[str], run: Callable[[bool], AsyncIterator[dict]]
+) -> AsyncIterator[dict]:
+    """
+    Événements de run(replay), exécuté une fois les générations identiques en cours terminées
+    (ici ou sur un autre worker), sous leur vol ; en attendant : coalesced puis waiting
+    (avancement). replay : une génération identique a tourné avant celle-ci
+    """
+    if key is None:
+        async with aclosing(run(False)) as events:
+            async for event in events:
+                yield event
+        return
+
+    attached = False
+    # Vols de ce worker suivis l'un après l'autre, jusqu'à pouvoir ouvrir le sien
+    while key in _flights:
+        flight = _flights[key]
+        if not attached:
+            attached = True
+            record_cache("generations", True)
+            yield {"event": "coalesced"}
+        async for event in flight.follow():
+            yield event
+
+    flight = _flights[key] = Flight()
+    heartbeat = None
+    try:
+        # Génération identique sur un autre worker : attente de la fin (ou de l'expiration) de son bail
+        progress = None
+        while not await acquire_lease(key, flight.owner):
+            if not attached:
+                attached = True
+                record_cache("generations", True)
+                logger.info("QCM generation waiting for another worker. Flight: %s", key[:12])
+                yield {"event": "coalesced"}
+            current = await lease_progress(key)
+            if current is not None and current != progress:
+                progress = current
+                flight.publish(*progress)
+                yield waiting_event(*progress)
+            await asyncio.sleep(QCM_LEASE_POLL_INTERVAL)
+        if not attached:
+            record_cache("generations", False)
+
+        heartbeat = asyncio.create_task(_heartbeat(key, flight))
+        async with aclosing(run(attached)) as events:
+            async for event in events:
+                if event["event"] == "planned":
+                    flight.publish(0, event["calls"])
+                elif event["event"] == "chunk":
+                    flight.publish(event["done"], event["total"])
+                yield event
+    finally:
+        _flights.pop(key, None)
+        flight.finish()
+        if heartbeat is not None:
+            heartbeat.cancel()
+            await release_lease(key, flight.owner)
@@ -0,0 +1,101 @@
+# app/qcm/structure.py
+# Découpage d'un document en sections d'après ses titres (extraction.py : sommaire du PDF ou
+# tailles de police ; à défaut, motifs du texte : « Chapitre 2 », « 1.3 Titre », LIGNE EN
+# MAJUSCULES). Chaque titre est recherché parmi les lignes de sa page ; introuvable (retiré
+# par le nettoyage, coupé autrement), la section commence en haut de la page.
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from .extraction import MAX_HEADING_LEVEL, Heading
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# « Chapitre 3 », « Partie II », « 2. », « 2.1 », « 2.1.4 » suivis d'un titre commençant par
+# une majuscule, sans point final (sinon, plutôt un élément de liste)
+_NUMBERED_HEADING = re.compile(
+    r"^(?:(?P<named>(?i:chapitre|partie|section|chapter|part|leçon|module))\s+[\dIVXLC]+\b"
+    r"|(?P<number>\d{1,2}(?:\.\d{1,2}){0,2})\.?\s+(?=[A-ZÀ-Ý]))"
+    r".{0,100}(?<![.;,])$"
+)
+TEXT_HEADING_MAX_CHARS = 80
+
+
+@dataclass
+class Section:
+    title: Optional[str]
+    level: int
+    page_start: int
+    page_end: int
+    # (page, paragraphe) dans l'ordre du texte
+    paragraphs: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _is_upper_heading(line: str) -> bool:
+    letters = [character for character in line if character.isalpha()]
+    return len(line.split()) >= 2 and len(letters) >= 6 and all(character.isupper() for character in letters)
+
+
+def text_headings(pages: Sequence[str]) -> List[Heading]:
+    """Titres reconnus à leur forme, faute de sommaire et de polices"""
+    headings = []
+    for page_number, text in enumerate(pages, start=1):
+        for line in text.split("\n"):
+            line = " ".join(line.split())
+            if not 3 <= len(line) <= TEXT_HEADING_MAX_CHARS:
+                continue
+            match = _NUMBERED_HEADING.match(line)
+            if match:
+                level = 1 if match.group("named") else min(match.group("number").count(".") + 1, MAX_HEADING_LEVEL)
+                headings.append(Heading(line, page_number, level))
+            elif _is_upper_heading(line):
+                headings.append(Heading(line, page_number, 1))
+    return headings
+
+
+def _key(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _heading_line(lines: List[str], title: str, start: int) -> Optional[int]:
+    """Indice de la ligne du titre à partir de start (titre éventuellement sur deux lignes)"""
+    title_key = _key(title)
+    for i in range(start, len(lines)):
+        line_key = _key(lines[i])
+        if len(line_key) >= 3 and (title_key.startswith(line_key) or line_key.startswith(title_key)):
+            return i
+    return None
+
+
+def split_sections(pages: Sequence[str], headings: Sequence[Heading]) -> List[Section]:
+    """Sections du document ; le texte qui précède le premier titre forme une section sans titre"""
+    by_page: List[List[Heading]] = [[] for _ in pages]
+    for heading in headings:
+        if 1 <= heading.page <= len(pages):
+            by_page[heading.page - 1].append(heading)
+
+    sections = [Section(None, 1, 1, 1)]
+
+    def add_text(page_number: int, lines: List[str]):
+        section = sections[-1]
+        for paragraph in _PARAGRAPH_BREAK.split("\n".join(lines)):
+            paragraph = " ".join(paragraph.split())
+            if paragraph:
+                if not section.paragraphs:
+                    section.page_start = page_number
+                section.paragraphs.append((page_number, paragraph))
+                section.page_end = page_number
+
+    for page_number, (text, page_headings) in enumerate(zip(pages, by_page), start=1):
+        lines = text.split("\n")
+        # Début de la section en cours sur cette page ; recherche du titre suivant après le précédent
+        position = search_from = 0
+        for heading in page_headings:
+            found = _heading_line(lines, heading.title, search_from)
+            cut = found if found is not None else position
+            add_text(page_number, lines[position:cut])
+            sections.append(Section(heading.title, heading.level, page_number, page_number))
+            position = cut
+            search_from = cut + 1 if found is not None else search_from
+        add_text(page_number, lines[position:])
+
+    return [section for section in sections if section.paragraphs]
@@ -0,0 +1,101 @@
+# app/qcm/tokens.py
+# Estimation hors ligne du nombre de tokens d'un texte, pour dimensionner les morceaux et prévoir
+# le coût d'une génération avant tout appel au LLM.
+# - tiktoken (dépendance optionnelle) : comptage exact, si l'encodage se charge (fichier déjà
+#   présent dans TIKTOKEN_CACHE_DIR en production hors ligne ; chargé au premier comptage) ;
+# - sinon, approximation du découpage BPE : le texte est pré-découpé comme le font les
+#   encodeurs GPT (mots avec leur espace, nombres par 3 chiffres, ponctuation), puis chaque
+#   mot compte 1 token, plus 1 par tranche de WORD_CHARS_PER_TOKEN lettres au-delà des
+#   FIRST_TOKEN_CHARS premières. Approximation suffisante pour un budget ou un devis ; les
+#   tokens réellement consommés sont ceux que renvoie le fournisseur (usage.py).
+import logging
+import math
+import re
+from functools import lru_cache
+
+from app.core.config import QCM_COMPLETION_PRICE_PER_MTOK, QCM_LLM_MODEL, QCM_PROMPT_PRICE_PER_MTOK
+
+try:
+    import tiktoken
+except ImportError:  # dépendance optionnelle : approximation
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Lettres d'un mot par token : les mots courants tiennent en un token, les mots longs ou
+# accentués sont découpés en sous-mots d'environ 4 à 5 caractères
+WORD_CHARS_PER_TOKEN = 4.5
+FIRST_TOKEN_CHARS = 7
+
+# Pré-découpage des encodeurs GPT, sans \p{L} (absent du module re) : lettres = [^\W\d_]
+_PIECES = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}|_+| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+",
+    re.IGNORECASE,
+)
+
+
+def _load_encoding():
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(QCM_LLM_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # encodage absent du cache local et pas de réseau
+        logger.warning("tiktoken encoding unavailable, using approximate token counts: %s", e)
+        return None
+
+
+_encoding = None
+_encoding_loaded = False
+
+
+@lru_cache(maxsize=65536)
+def _piece_tokens(piece: str) -> int:
+    word = piece.strip()
+    if not word:
+        return 1
+    if word[0].isalpha() or word[-1].isalpha():
+        letters = len(word)
+        if letters <= FIRST_TOKEN_CHARS:
+            return 1
+        return 1 + math.ceil((letters - FIRST_TOKEN_CHARS) / WORD_CHARS_PER_TOKEN)
+    if word.isdigit():  # au plus 3 chiffres
+        return 1
+    # Ponctuation : les suites courantes (« ... », « ?! ») tiennent en un token
+    return math.ceil(len(word) / 2)
+
+
+def approximate_tokens(text: str) -> int:
+    return sum(_piece_tokens(piece) for piece in _PIECES.findall(text))
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding, _encoding_loaded = _load_encoding(), True
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    """Encodage utilisé pour compter (nom tiktoken, ou « approx »)"""
+    encoding = _get_encoding()
+    return encoding.name if encoding is not None else "approx"
+
+
+def estimate_tokens(text: str) -> int:
+    """Nombre de tokens du texte pour le modèle configuré (exact avec tiktoken, sinon approché)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return approximate_tokens(text)
+
+
+def token_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """Coût en USD aux tarifs configurés"""
+    return round(
+        (prompt_tokens * QCM_PROMPT_PRICE_PER_MTOK + completion_tokens * QCM_COMPLETION_PRICE_PER_MTOK) / 1_000_000, 6
+    )
@@ -0,0 +1,151 @@
+# app/qcm/usage.py
+# Comptabilité des tokens consommés. Chaque appel au LLM ajoute une ligne à llm_usage (journal,
+# jamais modifié) et incrémente, dans la même transaction, l'agrégat du jour de l'utilisateur
+# (llm_usage_daily) : quotas et tableau de bord lisent une ligne par jour, jamais le journal.
+# Les agrégats d'une période se reconstruisent depuis le journal :
+#   python -m app.qcm.usage --since 2026-10-01
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_writer import run_write
+from app.models import LLMUsage, LLMUsageDaily
+from app.schemas import UsageDay
+from .tokens import token_cost
+
+logger = logging.getLogger(__name__)
+
+# Lignes du journal relues par bloc lors d'une reconstruction
+ROLLUP_CHUNK_SIZE = 5000
+
+_daily_table = LLMUsageDaily.__table__
+
+_add_daily = (
+    update(_daily_table)
+    .where(_daily_table.c.user_id == bindparam("b_user_id"), _daily_table.c.day == bindparam("b_day"))
+    .values(
+        calls=_daily_table.c.calls + 1,
+        prompt_tokens=_daily_table.c.prompt_tokens + bindparam("b_prompt_tokens"),
+        completion_tokens=_daily_table.c.completion_tokens + bindparam("b_completion_tokens"),
+    )
+)
+
+
+def today() -> date:
+    return datetime.utcnow().date()
+
+
+async def add_usage(
+    db: AsyncSession,
+    user_id: int,
+    job_id: str,
+    pdf_id: Optional[int],
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int
+) -> None:
+    """Journalise un appel et met à jour l'agrégat du jour (dans la transaction de db)"""
+    db.add(LLMUsage(
+        user_id=user_id, job_id=job_id, pdf_id=pdf_id, model=model,
+        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+    ))
+    result = await db.execute(_add_daily, {
+        "b_user_id": user_id, "b_day": today(),
+        "b_prompt_tokens": prompt_tokens, "b_completion_tokens": completion_tokens,
+    })
+    if result.rowcount == 0:
+        await db.execute(insert(_daily_table).values(
+            user_id=user_id, day=today(), calls=1,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        ))
+
+
+async def record_usage(
+    user_id: int,
+    job_id: str,
+    pdf_id: Optional[int],
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int
+) -> None:
+    async def write(db: AsyncSession):
+        await add_usage(db, user_id, job_id, pdf_id, model, prompt_tokens, completion_tokens)
+
+    try:
+        await run_write(write)
+    except Exception:
+        # L'appel est payé : la génération continue, l'agrégat se reconstruit depuis les journaux
+        logger.exception("Could not record LLM usage. User: %s, Job: %s, Prompt: %s, Completion: %s",
+                         user_id, job_id, prompt_tokens, completion_tokens)
+
+
+async def tokens_used_today(session: AsyncSession, user_id: int) -> int:
+    row = (await session.execute(
+        select(LLMUsageDaily.prompt_tokens, LLMUsageDaily.completion_tokens)
+        .where(LLMUsageDaily.user_id == user_id, LLMUsageDaily.day == today())
+    )).first()
+    return sum(row) if row else 0
+
+
+async def daily_usage(session: AsyncSession, user_id: int, since: date) -> List[UsageDay]:
+    rows = await session.execute(
+        select(LLMUsageDaily.day, LLMUsageDaily.calls, LLMUsageDaily.prompt_tokens, LLMUsageDaily.completion_tokens)
+        .where(LLMUsageDaily.user_id == user_id, LLMUsageDaily.day >= since)
+        .order_by(LLMUsageDaily.day.desc())
+    )
+    return [
+        UsageDay(day, calls, prompt_tokens, completion_tokens, token_cost(prompt_tokens, completion_tokens))
+        for day, calls, prompt_tokens, completion_tokens in rows
+    ]
+
+
+async def rebuild_daily_usage(db: AsyncSession, since: date, user_id: Optional[int] = None) -> int:
+    """Recalcule les agrégats à partir du jour since (tous les utilisateurs ou un seul)"""
+    totals: Dict[Tuple[int, date], List[int]] = {}
+    query = (
+        select(LLMUsage.user_id, LLMUsage.created_at, LLMUsage.prompt_tokens, LLMUsage.completion_tokens)
+        .where(LLMUsage.created_at >= datetime.combine(since, time.min))
+        .execution_options(yield_per=ROLLUP_CHUNK_SIZE)
+    )
+    if user_id is not None:
+        query = query.where(LLMUsage.user_id == user_id)
+    async for current_user, created_at, prompt_tokens, completion_tokens in await db.stream(query):
+        total = totals.setdefault((current_user, created_at.date()), [0, 0, 0])
+        total[0] += 1
+        total[1] += prompt_tokens
+        total[2] += completion_tokens
+
+    cleared = delete(LLMUsageDaily).where(LLMUsageDaily.day >= since)
+    if user_id is not None:
+        cleared = cleared.where(LLMUsageDaily.user_id == user_id)
+    await db.execute(cleared)
+    if totals:
+        await db.execute(insert(_daily_table), [
+            {"user_id": current_user, "day": day, "calls": calls,
+             "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+            for (current_user, day), (calls, prompt_tokens, completion_tokens) in totals.items()
+        ])
+    return len(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruit les agrégats quotidiens de consommation du LLM")
+    parser.add_argument("--since", type=date.fromisoformat, default=today(), help="Premier jour (AAAA-MM-JJ, UTC)")
+    parser.add_argument("--user-id", type=int, default=None, help="Un seul utilisateur (par défaut : tous)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def rebuild(db: AsyncSession) -> int:
+        return await rebuild_daily_usage(db, args.since, args.user_id)
+
+    count = asyncio.run(run_write(rebuild))
+    print(f"{count} agrégats quotidiens reconstruits depuis le {args.since.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# app/quiz/__init__.py
+from app.quiz.quiz_routes import router
+from app.quiz.attempt_routes import router as attempt_router
+from app.quiz.assembly_routes import router as assembly_router
+from app.quiz.review_routes import router as review_router
+
+router.include_router(attempt_router)
+router.include_router(assembly_router)
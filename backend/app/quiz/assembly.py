@@ -0,0 +1,256 @@
+# app/quiz/assembly.py
+# Assemblage de quiz à partir de la banque de questions existante d'un PDF ou d'un dossier,
+# sans appel au LLM. Chaque banque est indexée une fois puis gardée en mémoire (par worker) :
+# - questions dédoublonnées par énoncé (un quiz assemblé recopie des questions de la banque) ;
+# - une strate par niveau de difficulté (d'après question_stats), triée par page source dans
+#   des tableaux compacts : une plage de pages est une tranche trouvée par bisection.
+# Un assemblage répartit N questions entre tranches de pages et niveaux selon les contraintes,
+# tire au hasard dans chaque strate en excluant les questions vues récemment, puis complète
+# avec les strates voisines. L'index est invalidé par data_version (création ou suppression de
+# quiz) et, pour suivre l'évolution des statistiques, au bout de QUIZ_POOL_CACHE_TTL secondes.
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from random import Random
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import QUIZ_POOL_CACHE_SIZE, QUIZ_POOL_CACHE_TTL, QUIZ_POOL_MIN_ATTEMPTS
+from app.models import Question, QuestionStats, Quiz, ReviewCard
+from app.monitoring.metrics import record_cache
+
+EASY, MEDIUM, HARD = "easy", "medium", "hard"
+DIFFICULTY_LEVELS = (EASY, MEDIUM, HARD)
+# Proportion de réponses exactes : au-dessus, question facile ; en dessous, difficile
+EASY_THRESHOLD = 0.7
+HARD_THRESHOLD = 0.3
+
+
+class InsufficientPool(Exception):
+    """La banque ne contient pas assez de questions éligibles : il faut en générer"""
+    def __init__(self, available: int):
+        super().__init__(f"{available} questions disponibles")
+        self.available = available
+
+
+def difficulty_level(attempt_count: int, correct_count: int) -> str:
+    """Niveau d'une question ; moyen tant qu'elle n'a pas assez de tentatives"""
+    if attempt_count < max(1, QUIZ_POOL_MIN_ATTEMPTS):
+        return MEDIUM
+    p_value = correct_count / attempt_count
+    if p_value >= EASY_THRESHOLD:
+        return EASY
+    if p_value < HARD_THRESHOLD:
+        return HARD
+    return MEDIUM
+
+
+class QuestionPool:
+    """Index d'une banque : par niveau, identifiants et pages triés par page (page 0 = inconnue)"""
+    def __init__(self, rows: Sequence[tuple], data_version: int):
+        self.data_version = data_version
+        self.built_at = time.monotonic()
+        # Identifiant de chaque question -> question retenue pour son énoncé
+        self.canonical: Dict[int, int] = {}
+        first_by_text: Dict[str, int] = {}
+        entries: Dict[str, List[Tuple[int, int]]] = {level: [] for level in DIFFICULTY_LEVELS}
+        for question_id, text, source_page, attempt_count, correct_count in rows:
+            original = first_by_text.setdefault(" ".join(text.split()).casefold(), question_id)
+            self.canonical[question_id] = original
+            if original == question_id:
+                level = difficulty_level(attempt_count or 0, correct_count or 0)
+                entries[level].append((source_page or 0, question_id))
+
+        self.pages: Dict[str, array] = {}
+        self.ids: Dict[str, array] = {}
+        for level, items in entries.items():
+            items.sort()
+            self.pages[level] = array("i", [page for page, _ in items])
+            self.ids[level] = array("i", [question_id for _, question_id in items])
+
+    @property
+    def size(self) -> int:
+        return sum(len(ids) for ids in self.ids.values())
+
+    def last_page(self) -> int:
+        return max((pages[-1] for pages in self.pages.values() if pages), default=0)
+
+    def slice(self, level: str, first_page: int, last_page: int) -> Tuple[int, int]:
+        pages = self.pages[level]
+        return bisect_left(pages, first_page), bisect_right(pages, last_page)
+
+
+@dataclass(frozen=True)
+class AssemblyConstraints:
+    question_count: int
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    # Couverture : la plage de pages est découpée en page_bins tranches servies à parts égales
+    page_bins: int = 5
+    # Part de questions faciles, moyennes, difficiles
+    difficulty_mix: Tuple[float, float, float] = (0.3, 0.5, 0.2)
+
+
+@dataclass
+class Assembly:
+    question_ids: List[int] = field(default_factory=list)
+    composition: Dict[str, int] = field(default_factory=dict)
+
+
+def apportion(total: int, weights: Sequence[float]) -> List[int]:
+    """Répartit total selon les poids (plus forts restes)"""
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        weights, weight_sum = [1.0] * len(weights), float(len(weights))
+    raw = [total * weight / weight_sum for weight in weights]
+    counts = [int(value) for value in raw]
+    by_remainder = sorted(range(len(raw)), key=lambda i: raw[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def page_bins(first_page: int, last_page: int, bins: int) -> List[Tuple[int, int]]:
+    """Tranches contiguës de pages (bornes incluses), au plus une par page"""
+    span = last_page - first_page + 1
+    if span <= 0:
+        return []
+    bins = max(1, min(bins, span))
+    bounds = [first_page + span * i // bins for i in range(bins + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(bins)]
+
+
+def _draw(
+    ids: array, lo: int, hi: int, count: int, taken: Set[int], excluded: Set[int], rng: Random
+) -> List[int]:
+    """Tire jusqu'à count identifiants de ids[lo:hi], hors taken et excluded (taken est mis à jour)"""
+    if count <= 0 or hi <= lo:
+        return []
+    picked: List[int] = []
+    size = hi - lo
+    # Grande strate : tirage par rejet, sans parcourir la tranche
+    if size > 4 * count:
+        for _ in range(8 * count):
+            question_id = ids[lo + rng.randrange(size)]
+            if question_id in taken or question_id in excluded:
+                continue
+            taken.add(question_id)
+            picked.append(question_id)
+            if len(picked) == count:
+                return picked
+    candidates = [question_id for question_id in ids[lo:hi] if question_id not in taken and question_id not in excluded]
+    for question_id in rng.sample(candidates, min(count - len(picked), len(candidates))):
+        taken.add(question_id)
+        picked.append(question_id)
+    return picked
+
+
+def assemble(
+    pool: QuestionPool,
+    constraints: AssemblyConstraints,
+    excluded: Set[int],
+    rng: Random
+) -> Assembly:
+    """Choisit les questions d'un quiz ; InsufficientPool si la banque ne suffit pas"""
+    # Sans plage demandée, les questions sans page source (page 0) sont éligibles
+    first_page = constraints.page_from if constraints.page_from is not None else 0
+    last_page = constraints.page_to if constraints.page_to is not None else pool.last_page()
+    # Tranches de couverture sur les pages connues ; la page 0 va avec la première
+    bins = page_bins(max(first_page, 1), last_page, constraints.page_bins) or [(first_page, last_page)]
+    bins[0] = (first_page, bins[0][1])
+
+    targets = apportion(constraints.question_count, constraints.difficulty_mix)
+    taken: Set[int] = set()
+    assembly = Assembly(composition={level: 0 for level in DIFFICULTY_LEVELS})
+
+    def take(level: str, first: int, last: int, count: int) -> int:
+        lo, hi = pool.slice(level, first, last)
+        picked = _draw(pool.ids[level], lo, hi, count, taken, excluded, rng)
+        assembly.question_ids.extend(picked)
+        assembly.composition[level] += len(picked)
+        return len(picked)
+
+    missing = 0
+    for level, target in zip(DIFFICULTY_LEVELS, targets):
+        # Quotas par tranche de pages ; le reste va à des tranches tirées au hasard
+        quotas = [target // len(bins)] * len(bins)
+        for i in rng.sample(range(len(bins)), target % len(bins)):
+            quotas[i] += 1
+        short = sum(quota - take(level, first, last, quota) for (first, last), quota in zip(bins, quotas))
+        # Tranches trop petites : même niveau, n'importe où dans la plage
+        missing += short - take(level, first_page, last_page, short)
+
+    # Niveau épuisé : les autres niveaux complètent, du plus proche (moyen) au plus éloigné
+    for level in (MEDIUM, EASY, HARD):
+        missing -= take(level, first_page, last_page, missing)
+
+    if missing:
+        raise InsufficientPool(len(assembly.question_ids))
+    return assembly
+
+
+# Index des banques : (utilisateur, "pdf" ou "folder", identifiant) -> QuestionPool, LRU
+_pools: "OrderedDict[Tuple[int, str, int], QuestionPool]" = OrderedDict()
+
+
+def pool_query(user_id: int, pdf_id: Optional[int], folder_id: Optional[int]):
+    query = (
+        select(
+            Question.id, Question.text, Question.source_page,
+            QuestionStats.attempt_count, QuestionStats.correct_count
+        )
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .outerjoin(QuestionStats, QuestionStats.question_id == Question.id)
+        .where(Quiz.user_id == user_id)
+        .order_by(Question.id)
+    )
+    if pdf_id is not None:
+        return query.where(Quiz.pdf_id == pdf_id)
+    return query.where(Quiz.folder_id == folder_id)
+
+
+async def get_pool(
+    session: AsyncSession,
+    user_id: int,
+    data_version: int,
+    pdf_id: Optional[int] = None,
+    folder_id: Optional[int] = None
+) -> QuestionPool:
+    """Index de la banque d'un PDF (ou, à défaut, d'un dossier), reconstruit s'il est périmé"""
+    key = (user_id, "pdf", pdf_id) if pdf_id is not None else (user_id, "folder", folder_id)
+    pool = _pools.get(key)
+    if (
+        pool is not None
+        and pool.data_version == data_version
+        and time.monotonic() - pool.built_at < QUIZ_POOL_CACHE_TTL
+    ):
+        _pools.move_to_end(key)
+        record_cache("question_pool", True)
+        return pool
+
+    record_cache("question_pool", False)
+    rows = (await session.execute(pool_query(user_id, pdf_id, folder_id))).all()
+    pool = QuestionPool(rows, data_version)
+    _pools[key] = pool
+    _pools.move_to_end(key)
+    while len(_pools) > QUIZ_POOL_CACHE_SIZE:
+        _pools.popitem(last=False)
+    return pool
+
+
+async def recently_seen(session: AsyncSession, user_id: int, pool: QuestionPool, days: int) -> Set[int]:
+    """Questions de la banque révisées ou répondues par l'utilisateur depuis days jours"""
+    if days <= 0:
+        return set()
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    question_ids = await session.scalars(
+        select(ReviewCard.question_id)
+        .where(ReviewCard.user_id == user_id, ReviewCard.last_reviewed_at >= cutoff)
+    )
+    canonical = pool.canonical
+    return {canonical[question_id] for question_id in question_ids if question_id in canonical}
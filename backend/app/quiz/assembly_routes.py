@@ -0,0 +1,96 @@
+# app/quiz/assembly_routes.py
+# Assemblage d'un quiz depuis la banque de questions existante (voir assembly.py) : aucun appel
+# au LLM ; 409 si la banque est trop petite, le client lance alors une génération.
+import logging
+from random import Random
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_session
+from app.db_writer import run_write
+from app.models import Question
+from app.responses import FastJSONResponse
+from app.schemas import QuizAssemble
+from .assembly import AssemblyConstraints, InsufficientPool, assemble, get_pool, recently_seen
+from .quiz_routes import authenticate, check_sources
+from .quiz_service import insert_quiz
+
+logger = logging.getLogger(__name__)
+
+# Monté sous le router des quiz (app/quiz/__init__.py) : /quizzes/assemble
+router = APIRouter(tags=["quizzes"])
+
+
+# Route pour assembler un quiz depuis la banque
+@router.post("/assemble")
+async def assemble_quiz(
+    spec: QuizAssemble,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Crée un quiz en tirant des questions de la banque d'un PDF ou d'un dossier, sous contraintes
+    de couverture des pages, de difficulté et d'exclusion des questions vues récemment
+    """
+    current_user = await authenticate(request, session)
+    await check_sources(session, current_user.id, spec.pdf_id, spec.folder_id)
+    user_id = current_user.id
+
+    pool = await get_pool(session, user_id, current_user.data_version, spec.pdf_id, spec.folder_id)
+    excluded = await recently_seen(session, user_id, pool, spec.exclude_seen_days)
+    constraints = AssemblyConstraints(
+        question_count=spec.question_count,
+        page_from=spec.page_from,
+        page_to=spec.page_to,
+        page_bins=spec.page_bins,
+        difficulty_mix=(spec.difficulty.easy, spec.difficulty.medium, spec.difficulty.hard),
+    )
+    try:
+        assembly = assemble(pool, constraints, excluded, Random(spec.seed))
+    except InsufficientPool as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Banque de questions insuffisante : {e.available} questions disponibles "
+                   f"pour {spec.question_count} demandées"
+        )
+
+    rows = (await session.execute(
+        select(
+            Question.id, Question.text, Question.options, Question.option_count, Question.answer_mask,
+            Question.explanation, Question.source_page
+        ).where(Question.id.in_(assembly.question_ids))
+    )).all()
+    # Ordre de lecture du document
+    rows.sort(key=lambda row: (row.source_page or 0, row.id))
+
+    async def insert_assembled(db: AsyncSession) -> int:
+        new_questions = [
+            Question(
+                position=position,
+                text=row.text,
+                options=row.options,
+                option_count=row.option_count,
+                answer_mask=row.answer_mask,
+                explanation=row.explanation,
+                source_page=row.source_page
+            )
+            for position, row in enumerate(rows)
+        ]
+        return await insert_quiz(db, user_id, spec.title, new_questions, spec.pdf_id, spec.folder_id)
+
+    quiz_id = await run_write(insert_assembled)
+    logger.info("Quiz assembled from pool. ID: %s, Questions: %s, Pool: %s, User: %s",
+                quiz_id, len(rows), pool.size, user_id)
+
+    return FastJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "success": True,
+            "quiz_id": quiz_id,
+            "question_count": len(rows),
+            "composition": assembly.composition,
+            "pool_size": pool.size
+        }
+    )
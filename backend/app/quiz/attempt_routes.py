@@ -0,0 +1,148 @@
+# app/quiz/attempt_routes.py
+# Soumission et correction des tentatives : un lot (une classe qui termine ensemble) est corrigé
+# en une passe vectorisée puis inséré en une seule instruction (executemany + RETURNING) ; les
+# statistiques d'items et les cartes de révision sont mises à jour dans la même transaction.
+# Les cartes de révision ne suivent que les tentatives individuelles : un lot rassemble les
+# copies de toute une classe, pas des révisions successives de l'utilisateur qui l'envoie.
+import logging
+from datetime import datetime
+from typing import List, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_session
+from app.db_writer import run_write
+from app.models import QuizAttempt
+from app.responses import FastJSONResponse
+from app.schemas import AttemptAnswers, AttemptBatchSubmit, AttemptResult, AttemptSubmit, GradingOptions
+from .encoding import MAX_OPTIONS, pack_answers
+from .grading import AnswerKey, GradingRules, grade_batch
+from .item_stats import apply_increments
+from .quiz_routes import authenticate
+from .scheduler import schedule_reviews
+from .quiz_service import load_answer_key
+
+logger = logging.getLogger(__name__)
+
+# Monté sous le router des quiz (app/quiz/__init__.py) : /quizzes/{quiz_id}/attempts
+router = APIRouter(tags=["quizzes"])
+
+
+def pack_submission(attempt: AttemptAnswers, option_counts: Sequence[int], index: int) -> bytes:
+    """Réponses d'une tentative en masques uint16 ; 400 si elles ne correspondent pas au quiz"""
+    if len(attempt.answers) != len(option_counts):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tentative {index} : {len(option_counts)} réponses attendues, {len(attempt.answers)} reçues"
+        )
+    masks = []
+    for selected, option_count in zip(attempt.answers, option_counts):
+        mask = 0
+        for option in selected:
+            if not 0 <= option < min(option_count, MAX_OPTIONS):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Tentative {index} : option {option} inexistante"
+                )
+            mask |= 1 << option
+        masks.append(mask)
+    return pack_answers(masks)
+
+
+async def grade_and_store(
+    request: Request,
+    session: AsyncSession,
+    quiz_id: int,
+    attempts: Sequence[AttemptAnswers],
+    options: GradingOptions,
+    schedule: bool
+) -> dict:
+    current_user = await authenticate(request, session)
+
+    answer_key = await load_answer_key(session, quiz_id, current_user.id)
+    if answer_key is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz non trouvé")
+    masks, option_counts, question_ids = answer_key
+
+    packed = [pack_submission(attempt, option_counts, index) for index, attempt in enumerate(attempts)]
+    key = AnswerKey(masks, GradingRules(options.negative_marking, options.partial_credit))
+    if len(packed) > 1:
+        grades = await run_in_threadpool(grade_batch, key, packed)
+    else:
+        grades = grade_batch(key, packed)
+
+    user_id = current_user.id
+    graded_at = datetime.utcnow()
+    rows = [
+        {
+            "quiz_id": quiz_id,
+            "user_id": user_id,
+            "answers": answers,
+            "score": score,
+            "max_score": grades.max_score,
+            "correct_count": correct_count,
+            "graded_at": graded_at,
+        }
+        for answers, score, correct_count in zip(packed, grades.scores, grades.correct_counts)
+    ]
+
+    # Révision espacée : les réponses de la tentative de l'utilisateur
+    outcomes = []
+    if schedule:
+        correct = grades.correct.tolist() if hasattr(grades.correct, "tolist") else grades.correct
+        outcomes = [(question_id, bool(exact)) for question_id, exact in zip(question_ids, correct[0])]
+    quiz_ids = dict.fromkeys(question_ids, quiz_id)
+
+    async def insert_attempts(db: AsyncSession) -> List[int]:
+        result = await db.execute(
+            insert(QuizAttempt).returning(QuizAttempt.id, sort_by_parameter_order=True), rows
+        )
+        attempt_ids = list(result.scalars())
+        await apply_increments(db, question_ids, grades)
+        await schedule_reviews(db, user_id, quiz_ids, outcomes, graded_at)
+        return attempt_ids
+
+    attempt_ids = await run_write(insert_attempts)
+    logger.info("%s attempts graded. Quiz: %s, User: %s", len(attempt_ids), quiz_id, user_id)
+
+    return {
+        "success": True,
+        "max_score": grades.max_score,
+        "results": [
+            AttemptResult(attempt_id, score, correct_count)
+            for attempt_id, score, correct_count in zip(attempt_ids, grades.scores, grades.correct_counts)
+        ]
+    }
+
+
+# Route pour soumettre une tentative
+@router.post("/{quiz_id}/attempts")
+async def submit_attempt(
+    quiz_id: int,
+    attempt: AttemptSubmit,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Corrige et enregistre une tentative
+    """
+    content = await grade_and_store(request, session, quiz_id, [attempt], attempt, schedule=True)
+    return FastJSONResponse(status_code=status.HTTP_201_CREATED, content=content)
+
+
+# Route pour soumettre un lot de tentatives
+@router.post("/{quiz_id}/attempts/batch")
+async def submit_attempt_batch(
+    quiz_id: int,
+    batch: AttemptBatchSubmit,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Corrige un lot de tentatives en une passe et les enregistre en une insertion groupée
+    """
+    content = await grade_and_store(request, session, quiz_id, batch.attempts, batch, schedule=False)
+    return FastJSONResponse(status_code=status.HTTP_201_CREATED, content=content)
@@ -0,0 +1,43 @@
+# app/quiz/encoding.py
+# Encodage compact des questions et des réponses (voir app/models/quiz_model.py)
+import struct
+from typing import Iterable, List, Sequence
+
+# Séparateur d'unités ASCII : ne figure pas dans un texte d'option normal
+OPTION_SEPARATOR = "\x1f"
+# Les réponses d'une tentative sont des masques uint16 : 16 options au plus par question
+MAX_OPTIONS = 16
+
+
+def pack_options(options: Sequence[str]) -> str:
+    if not 2 <= len(options) <= MAX_OPTIONS:
+        raise ValueError(f"Une question doit avoir entre 2 et {MAX_OPTIONS} options")
+    if any(OPTION_SEPARATOR in option for option in options):
+        raise ValueError("Caractère interdit dans une option")
+    return OPTION_SEPARATOR.join(options)
+
+
+def unpack_options(packed: str) -> List[str]:
+    return packed.split(OPTION_SEPARATOR)
+
+
+def mask_from_indices(indices: Iterable[int]) -> int:
+    mask = 0
+    for index in indices:
+        if not 0 <= index < MAX_OPTIONS:
+            raise ValueError(f"Indice d'option invalide : {index}")
+        mask |= 1 << index
+    return mask
+
+
+def indices_from_mask(mask: int) -> List[int]:
+    return [i for i in range(MAX_OPTIONS) if mask >> i & 1]
+
+
+def pack_answers(masks: Sequence[int]) -> bytes:
+    """Un masque uint16 little-endian par question, dans l'ordre des positions"""
+    return struct.pack(f"<{len(masks)}H", *masks)
+
+
+def unpack_answers(packed: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(packed) // 2}H", packed))
@@ -0,0 +1,117 @@
+# app/quiz/grading.py
+# Correction de tentatives par lots. Clés et réponses sont des masques de bits uint16 (une colonne
+# par question) : un lot de N tentatives est une matrice N x Q corrigée en une passe vectorisée
+# (NumPy), sans boucle Python par tentative ni par question.
+# Barème par question :
+# - réponse exacte (masque identique à la clé) : 1 point ;
+# - crédit partiel (facultatif, questions à plusieurs réponses) : (bonnes cochées - mauvaises
+#   cochées) / bonnes réponses, borné à [0, 1] ;
+# - réponse fausse (cochée, sans aucun crédit) : -negative_marking ; sans réponse : 0.
+# NumPy est facultatif : sans lui, une implémentation Python pure donne les mêmes résultats.
+from dataclasses import dataclass
+from typing import Any, List, Sequence
+
+from .encoding import MAX_OPTIONS, unpack_answers
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle : correction en Python pur
+    np = None
+
+# Nombre de bits à 1 de chaque masque uint16 (table de 64 Ko)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << MAX_OPTIONS)], dtype=np.int8) if np is not None else None
+
+
+@dataclass(frozen=True)
+class GradingRules:
+    # Fraction de point retirée par réponse fausse (0 = pas de points négatifs)
+    negative_marking: float = 0.0
+    partial_credit: bool = False
+
+
+class AnswerKey:
+    """Clé de correction d'un quiz : masques des bonnes réponses dans l'ordre des positions"""
+    def __init__(self, masks: Sequence[int], rules: GradingRules = GradingRules()):
+        self.masks = list(masks)
+        self.rules = rules
+        self.key_counts = [mask.bit_count() for mask in self.masks]
+        self.multiple = [count > 1 for count in self.key_counts]
+        if np is not None:
+            self._masks = np.array(self.masks, dtype=np.uint16)
+            self._key_counts = np.array(self.key_counts, dtype=np.float64)
+            self._multiple = np.array(self.multiple, dtype=bool)
+
+    @property
+    def question_count(self) -> int:
+        return len(self.masks)
+
+    @property
+    def max_score(self) -> float:
+        return float(len(self.masks))
+
+
+@dataclass
+class BatchGrades:
+    scores: List[float]
+    correct_counts: List[int]
+    # Matrice tentatives x questions : réponse exacte (ndarray bool avec NumPy, listes sinon)
+    correct: Any
+    max_score: float
+
+
+def grade_batch(key: AnswerKey, answers: Sequence[bytes]) -> BatchGrades:
+    """Corrige un lot de tentatives (réponses au format pack_answers, une par tentative)"""
+    expected = 2 * key.question_count
+    if any(len(packed) != expected for packed in answers):
+        raise ValueError("Nombre de réponses différent du nombre de questions")
+    if not answers:
+        return BatchGrades([], [], [], key.max_score)
+    if np is None:
+        return _grade_python(key, answers)
+
+    submitted = np.frombuffer(b"".join(answers), dtype="<u2").reshape(len(answers), key.question_count)
+    exact = submitted == key._masks
+    if key.rules.partial_credit:
+        hits = _POPCOUNT[submitted & key._masks]
+        extra = _POPCOUNT[submitted & ~key._masks]
+        partial = np.clip((hits - extra) / key._key_counts, 0.0, 1.0)
+        credit = np.where(key._multiple, partial, exact)
+    else:
+        credit = exact.astype(np.float64)
+    item_scores = credit
+    if key.rules.negative_marking:
+        wrong = (submitted != 0) & (credit == 0)
+        item_scores = credit - wrong * key.rules.negative_marking
+
+    return BatchGrades(
+        scores=item_scores.sum(axis=1).tolist(),
+        correct_counts=exact.sum(axis=1).tolist(),
+        correct=exact,
+        max_score=key.max_score,
+    )
+
+
+def _grade_python(key: AnswerKey, answers: Sequence[bytes]) -> BatchGrades:
+    rules = key.rules
+    scores, correct_counts, correct = [], [], []
+    for packed in answers:
+        total = 0.0
+        row = []
+        for submitted, mask, key_count, multiple in zip(unpack_answers(packed), key.masks, key.key_counts, key.multiple):
+            exact = submitted == mask
+            row.append(exact)
+            if exact:
+                credit = 1.0
+            elif rules.partial_credit and multiple:
+                hits = (submitted & mask).bit_count()
+                extra = (submitted & ~mask).bit_count()
+                credit = min(max((hits - extra) / key_count, 0.0), 1.0)
+            else:
+                credit = 0.0
+            if credit == 0 and submitted:
+                credit = -rules.negative_marking
+            total += credit
+        scores.append(total)
+        correct_counts.append(sum(row))
+        correct.append(row)
+    return BatchGrades(scores, correct_counts, correct, key.max_score)
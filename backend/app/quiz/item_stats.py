@@ -0,0 +1,227 @@
+# app/quiz/item_stats.py
+# Statistiques d'items (difficulté et discrimination) maintenues de façon incrémentale.
+# Pour chaque question, avec x = réponse exacte (0/1) et y = score total de la tentative,
+# question_stats garde n, Σx, Σy, Σy² et Σxy, mis à jour dans la transaction qui enregistre
+# les tentatives. Le tableau de bord lit donc O(questions) lignes, jamais les tentatives :
+# - difficulté (p-value) : p = Σx / n ;
+# - discrimination (corrélation point-bisériale entre x et y) :
+#   r = (n·Σxy - Σx·Σy) / sqrt((n·Σx - Σx²) · (n·Σy² - (Σy)²)), x² = x pour une variable 0/1.
+# La reconstruction complète (rattrapage, changement de barème) relit les tentatives par blocs
+# et les corrige en lots vectorisés : python -m app.quiz.item_stats [--quiz-id N]
+import argparse
+import asyncio
+import logging
+import math
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.db_writer import run_write
+from app.models import Question, QuestionStats, Quiz, QuizAttempt
+from app.schemas import QuestionStatsItem
+from .grading import AnswerKey, BatchGrades, grade_batch, np
+
+logger = logging.getLogger(__name__)
+
+# Tentatives relues par bloc lors d'une reconstruction
+REBUILD_CHUNK_SIZE = 5000
+
+_stats_table = QuestionStats.__table__
+
+# Incréments appliqués en une instruction (executemany), sans lire les lignes au préalable
+_increment_stats = (
+    update(_stats_table)
+    .where(_stats_table.c.question_id == bindparam("b_question_id"))
+    .values(
+        attempt_count=_stats_table.c.attempt_count + bindparam("b_attempt_count"),
+        correct_count=_stats_table.c.correct_count + bindparam("b_correct_count"),
+        score_sum=_stats_table.c.score_sum + bindparam("b_score_sum"),
+        score_sq_sum=_stats_table.c.score_sq_sum + bindparam("b_score_sq_sum"),
+        correct_score_sum=_stats_table.c.correct_score_sum + bindparam("b_correct_score_sum"),
+    )
+)
+
+
+class StatsAccumulator:
+    """Sommes par question d'un ou plusieurs lots corrigés"""
+    def __init__(self, question_ids: Sequence[int]):
+        self.question_ids = list(question_ids)
+        count = len(self.question_ids)
+        self.attempt_count = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.correct_count = [0] * count
+        self.correct_score_sum = [0.0] * count
+
+    def add(self, grades: BatchGrades, scores: Optional[Sequence[float]] = None) -> None:
+        """Ajoute un lot ; scores remplace grades.scores (scores enregistrés, barème d'origine)"""
+        scores = list(grades.scores if scores is None else scores)
+        if not scores:
+            return
+        self.attempt_count += len(scores)
+        if np is not None and isinstance(grades.correct, np.ndarray):
+            y = np.asarray(scores, dtype=np.float64)
+            correct = grades.correct
+            self.score_sum += float(y.sum())
+            self.score_sq_sum += float(y @ y)
+            counts = correct.sum(axis=0)
+            sums = y @ correct
+            for index in range(len(self.question_ids)):
+                self.correct_count[index] += int(counts[index])
+                self.correct_score_sum[index] += float(sums[index])
+            return
+
+        for score, row in zip(scores, grades.correct):
+            self.score_sum += score
+            self.score_sq_sum += score * score
+            for index, exact in enumerate(row):
+                if exact:
+                    self.correct_count[index] += 1
+                    self.correct_score_sum[index] += score
+
+    def rows(self) -> List[Dict]:
+        return [
+            {
+                "question_id": question_id,
+                "attempt_count": self.attempt_count,
+                "correct_count": self.correct_count[index],
+                "score_sum": self.score_sum,
+                "score_sq_sum": self.score_sq_sum,
+                "correct_score_sum": self.correct_score_sum[index],
+            }
+            for index, question_id in enumerate(self.question_ids)
+        ]
+
+
+async def apply_increments(db: AsyncSession, question_ids: Sequence[int], grades: BatchGrades) -> None:
+    """Ajoute un lot corrigé aux agrégats ; à exécuter dans la transaction des tentatives"""
+    accumulator = StatsAccumulator(question_ids)
+    accumulator.add(grades)
+    if not accumulator.attempt_count:
+        return
+    params = [{f"b_{name}": value for name, value in row.items()} for row in accumulator.rows()]
+    await db.execute(_increment_stats, params)
+
+
+def difficulty(attempt_count: int, correct_count: int) -> Optional[float]:
+    """Proportion de réponses exactes (p-value) ; None sans tentative"""
+    if not attempt_count:
+        return None
+    return correct_count / attempt_count
+
+
+def discrimination(
+    attempt_count: int,
+    correct_count: int,
+    score_sum: float,
+    score_sq_sum: float,
+    correct_score_sum: float
+) -> Optional[float]:
+    """Corrélation point-bisériale ; None si l'une des deux variables est constante"""
+    n = attempt_count
+    x_spread = n * correct_count - correct_count * correct_count
+    y_spread = n * score_sq_sum - score_sum * score_sum
+    # Erreur d'arrondi des sommes flottantes : un écart quasi nul est une variance nulle
+    if x_spread <= 0 or y_spread <= 1e-9 * max(1.0, n * score_sq_sum):
+        return None
+    r = (n * correct_score_sum - correct_count * score_sum) / math.sqrt(x_spread * y_spread)
+    return max(-1.0, min(1.0, r))
+
+
+async def load_quiz_stats(session: AsyncSession, quiz_id: int, user_id: int) -> Optional[List[QuestionStatsItem]]:
+    """Statistiques des questions d'un quiz de l'utilisateur, par position ; None s'il n'existe pas"""
+    query = (
+        select(
+            Question.id, Question.position,
+            QuestionStats.attempt_count, QuestionStats.correct_count, QuestionStats.score_sum,
+            QuestionStats.score_sq_sum, QuestionStats.correct_score_sum
+        )
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .outerjoin(QuestionStats, QuestionStats.question_id == Question.id)
+        .where(Quiz.id == quiz_id, Quiz.user_id == user_id)
+        .order_by(Question.position)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return None
+
+    items = []
+    for question_id, position, *sums in rows:
+        attempt_count, correct_count, score_sum, score_sq_sum, correct_score_sum = (value or 0 for value in sums)
+        items.append(QuestionStatsItem(
+            question_id=question_id,
+            position=position,
+            attempt_count=attempt_count,
+            correct_count=correct_count,
+            difficulty=difficulty(attempt_count, correct_count),
+            discrimination=discrimination(attempt_count, correct_count, score_sum, score_sq_sum, correct_score_sum),
+        ))
+    return items
+
+
+async def rebuild_quiz_stats(db: AsyncSession, quiz_id: int) -> int:
+    """
+    Recalcule les agrégats d'un quiz à partir de toutes ses tentatives ; à exécuter dans une
+    écriture (run_write), sans commit. Renvoie le nombre de tentatives prises en compte.
+    """
+    key_rows = (await db.execute(
+        select(Question.id, Question.answer_mask)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.position)
+    )).all()
+    question_ids = [row[0] for row in key_rows]
+    key = AnswerKey([row[1] for row in key_rows])
+    accumulator = StatsAccumulator(question_ids)
+    expected = 2 * key.question_count
+
+    result = await db.stream(
+        select(QuizAttempt.answers, QuizAttempt.score)
+        .where(QuizAttempt.quiz_id == quiz_id)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    async for chunk in result.partitions():
+        # Réponses illisibles (ne correspondent pas aux questions) : ignorées
+        chunk = [row for row in chunk if len(row[0]) == expected]
+        if chunk:
+            # L'exactitude ne dépend pas du barème ; y reste le score enregistré
+            accumulator.add(grade_batch(key, [row[0] for row in chunk]), [row[1] for row in chunk])
+
+    await db.execute(delete(QuestionStats).where(QuestionStats.quiz_id == quiz_id))
+    if question_ids:
+        await db.execute(
+            insert(QuestionStats),
+            [dict(row, quiz_id=quiz_id) for row in accumulator.rows()]
+        )
+    return accumulator.attempt_count
+
+
+async def rebuild_all_stats(quiz_id: Optional[int] = None) -> int:
+    """Reconstruit les statistiques d'un quiz ou de tous, une transaction par quiz"""
+    if quiz_id is not None:
+        quiz_ids = [quiz_id]
+    else:
+        async with async_session_maker() as session:
+            quiz_ids = list((await session.scalars(select(Quiz.id).order_by(Quiz.id))).all())
+
+    for current_id in quiz_ids:
+        async def rebuild(db: AsyncSession, current_id: int = current_id) -> int:
+            return await rebuild_quiz_stats(db, current_id)
+
+        attempt_count = await run_write(rebuild)
+        logger.info("Item stats rebuilt. Quiz: %s, Attempts: %s", current_id, attempt_count)
+    return len(quiz_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruit les statistiques d'items à partir des tentatives")
+    parser.add_argument("--quiz-id", type=int, default=None, help="Un seul quiz (par défaut : tous)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(rebuild_all_stats(args.quiz_id))
+    print(f"Statistiques reconstruites pour {count} quiz")
+
+
+if __name__ == "__main__":
+    main()
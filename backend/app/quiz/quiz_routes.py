@@ -0,0 +1,222 @@
+# app/quiz/quiz_routes.py
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.database import get_async_session
+from app.db_writer import run_write
+from app.http_cache import bump_data_version, if_none_match, list_etag, not_modified, with_etag
+from app.models import Folder, PDF, Quiz, User
+from app.pagination import PageParams, page_params, paginate
+from app.responses import FastJSONResponse
+from app.schemas import QuestionItem, QuizCreate, QuizItem
+from .item_stats import load_quiz_stats
+from .quiz_service import create_quiz, delete_quiz_children, load_quiz
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Création du router pour les quiz
+router = APIRouter(prefix="/quizzes", tags=["quizzes"])
+
+
+async def authenticate(request: Request, session: AsyncSession) -> User:
+    current_user, error = await get_current_user(request, session)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=error,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return current_user
+
+
+async def check_sources(session: AsyncSession, user_id: int, pdf_id: Optional[int], folder_id: Optional[int]):
+    """Le PDF et le dossier source doivent appartenir à l'utilisateur"""
+    if pdf_id is not None and await session.scalar(
+        select(PDF.id).where(PDF.id == pdf_id, PDF.user_id == user_id)
+    ) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF non trouvé")
+    if folder_id is not None and await session.scalar(
+        select(Folder.id).where(Folder.id == folder_id, Folder.user_id == user_id)
+    ) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier non trouvé")
+
+
+# Route pour enregistrer un quiz
+@router.post("")
+async def create_quiz_route(
+    quiz: QuizCreate,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Enregistre un quiz et ses questions (une transaction)
+    """
+    current_user = await authenticate(request, session)
+    await check_sources(session, current_user.id, quiz.pdf_id, quiz.folder_id)
+
+    user_id = current_user.id
+
+    async def insert_quiz(db: AsyncSession) -> int:
+        return await create_quiz(db, user_id, quiz.title, quiz.questions, quiz.pdf_id, quiz.folder_id)
+
+    quiz_id = await run_write(insert_quiz)
+    logger.info("Quiz created. ID: %s, Questions: %s, User: %s", quiz_id, len(quiz.questions), user_id)
+
+    return FastJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={"success": True, "quiz_id": quiz_id, "question_count": len(quiz.questions)}
+    )
+
+
+# Route pour lister les quiz d'un utilisateur
+@router.get("/list")
+async def list_quizzes(
+    request: Request,
+    pdf_id: Optional[int] = None,
+    folder_id: Optional[int] = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Récupère les quiz de l'utilisateur, du plus récent au plus ancien (pagination par curseur),
+    éventuellement limités à un PDF ou à un dossier
+    """
+    current_user = await authenticate(request, session)
+
+    # Liste inchangée depuis la dernière visite : 304 sans exécuter la requête de liste
+    etag = list_etag(request, current_user)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
+    query = select(
+        Quiz.id, Quiz.title, Quiz.question_count, Quiz.pdf_id, Quiz.folder_id, Quiz.created_at
+    ).where(Quiz.user_id == current_user.id)
+    if pdf_id is not None:
+        query = query.where(Quiz.pdf_id == pdf_id)
+    if folder_id is not None:
+        query = query.where(Quiz.folder_id == folder_id)
+
+    result_page = await paginate(session, query, Quiz.created_at, Quiz.id, page)
+    quizzes = [QuizItem(*row) for row in result_page.items]
+
+    return with_etag(FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "count": len(quizzes),
+            "quizzes": quizzes,
+            "next_cursor": result_page.next_cursor
+        }
+    ), etag)
+
+
+# Route pour récupérer un quiz complet
+@router.get("/{quiz_id}")
+async def get_quiz(
+    quiz_id: int,
+    request: Request,
+    include_answers: bool = Query(False, description="Inclure les bonnes réponses et les explications"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Récupère un quiz et toutes ses questions (une requête)
+    """
+    current_user = await authenticate(request, session)
+
+    quiz = await load_quiz(session, quiz_id, current_user.id)
+    if quiz is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz non trouvé")
+
+    questions = [
+        QuestionItem(
+            id=question.id,
+            position=question.position,
+            text=question.text,
+            options=question.options,
+            multiple=(question.answer_mask & (question.answer_mask - 1)) != 0,
+            source_page=question.source_page,
+            correct=question.correct if include_answers else None,
+            explanation=question.explanation if include_answers else None
+        )
+        for question in quiz.questions
+    ]
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "id": quiz.id,
+            "title": quiz.title,
+            "pdf_id": quiz.pdf_id,
+            "folder_id": quiz.folder_id,
+            "created_at": quiz.created_at,
+            "questions": questions
+        }
+    )
+
+
+# Route pour les statistiques d'items d'un quiz
+@router.get("/{quiz_id}/stats")
+async def get_quiz_stats(
+    quiz_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Difficulté et discrimination de chaque question, lues dans les agrégats (une requête,
+    sans parcourir les tentatives)
+    """
+    current_user = await authenticate(request, session)
+
+    questions = await load_quiz_stats(session, quiz_id, current_user.id)
+    if questions is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz non trouvé")
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "quiz_id": quiz_id,
+            "attempt_count": max((question.attempt_count for question in questions), default=0),
+            "questions": questions
+        }
+    )
+
+
+# Route pour supprimer un quiz
+@router.delete("/{quiz_id}")
+async def delete_quiz(
+    quiz_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Supprime un quiz, ses questions et ses tentatives
+    """
+    current_user = await authenticate(request, session)
+    user_id = current_user.id
+
+    async def delete_owned_quiz(db: AsyncSession) -> int:
+        result = await db.execute(delete(Quiz).where(Quiz.id == quiz_id, Quiz.user_id == user_id))
+        if not result.rowcount:
+            return 0
+        # Suppression explicite des lignes dépendantes (SQLite n'applique pas ON DELETE CASCADE
+        # sans PRAGMA foreign_keys)
+        await delete_quiz_children(db, quiz_id)
+        await bump_data_version(db, user_id)
+        return result.rowcount
+
+    if not await run_write(delete_owned_quiz):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz non trouvé")
+
+    logger.info("Quiz deleted. ID: %s, User: %s", quiz_id, user_id)
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"success": True, "message": "Quiz supprimé avec succès"}
+    )
@@ -0,0 +1,145 @@
+# app/quiz/quiz_service.py
+# Création et chargement des quiz. Un quiz complet (quiz + questions) est lu en une seule
+# requête, par l'index (quiz_id, position) : aucun chargement paresseux par question.
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.http_cache import bump_data_version
+from app.models import Question, QuestionStats, Quiz, QuizAttempt, ReviewCard
+from app.schemas import QuestionCreate
+from .encoding import indices_from_mask, mask_from_indices, pack_options, unpack_options
+
+
+@dataclass(slots=True)
+class LoadedQuestion:
+    id: int
+    position: int
+    text: str
+    options: List[str]
+    answer_mask: int
+    explanation: Optional[str]
+    source_page: Optional[int]
+
+    @property
+    def correct(self) -> List[int]:
+        return indices_from_mask(self.answer_mask)
+
+
+@dataclass(slots=True)
+class LoadedQuiz:
+    id: int
+    title: str
+    pdf_id: Optional[int]
+    folder_id: Optional[int]
+    created_at: datetime
+    questions: List[LoadedQuestion] = field(default_factory=list)
+
+
+def build_questions(questions: Sequence[QuestionCreate]) -> List[Question]:
+    return [
+        Question(
+            position=position,
+            text=question.text,
+            options=pack_options(question.options),
+            option_count=len(question.options),
+            answer_mask=mask_from_indices(question.correct),
+            explanation=question.explanation,
+            source_page=question.source_page
+        )
+        for position, question in enumerate(questions)
+    ]
+
+
+async def create_quiz(
+    db: AsyncSession,
+    user_id: int,
+    title: str,
+    questions: Sequence[QuestionCreate],
+    pdf_id: Optional[int] = None,
+    folder_id: Optional[int] = None
+) -> int:
+    """Insère le quiz et ses questions ; à exécuter dans une écriture (run_write), sans commit"""
+    return await insert_quiz(db, user_id, title, build_questions(questions), pdf_id, folder_id)
+
+
+async def insert_quiz(
+    db: AsyncSession,
+    user_id: int,
+    title: str,
+    new_questions: List[Question],
+    pdf_id: Optional[int] = None,
+    folder_id: Optional[int] = None
+) -> int:
+    """Comme create_quiz, avec des questions déjà encodées (positions comprises)"""
+    quiz = Quiz(title=title, user_id=user_id, pdf_id=pdf_id, folder_id=folder_id, question_count=len(new_questions))
+    db.add(quiz)
+    await db.flush()
+    for question in new_questions:
+        question.quiz_id = quiz.id
+    db.add_all(new_questions)
+    await db.flush()
+    # Agrégats des statistiques d'items, incrémentés à chaque correction (item_stats.py)
+    await db.execute(insert(QuestionStats), [
+        {
+            "question_id": question.id, "quiz_id": quiz.id, "attempt_count": 0, "correct_count": 0,
+            "score_sum": 0.0, "score_sq_sum": 0.0, "correct_score_sum": 0.0
+        }
+        for question in new_questions
+    ])
+    await bump_data_version(db, user_id)
+    return quiz.id
+
+
+async def delete_quiz_children(db: AsyncSession, quiz_id: int) -> None:
+    await db.execute(delete(QuestionStats).where(QuestionStats.quiz_id == quiz_id))
+    await db.execute(delete(ReviewCard).where(ReviewCard.quiz_id == quiz_id))
+    await db.execute(delete(Question).where(Question.quiz_id == quiz_id))
+    await db.execute(delete(QuizAttempt).where(QuizAttempt.quiz_id == quiz_id))
+
+
+async def load_quiz(session: AsyncSession, quiz_id: int, user_id: int) -> Optional[LoadedQuiz]:
+    """Quiz de l'utilisateur et ses questions dans l'ordre, en une requête ; None s'il n'existe pas"""
+    query = (
+        select(
+            Quiz.id, Quiz.title, Quiz.pdf_id, Quiz.folder_id, Quiz.created_at,
+            Question.id, Question.position, Question.text, Question.options,
+            Question.answer_mask, Question.explanation, Question.source_page
+        )
+        .select_from(Quiz)
+        .outerjoin(Question, Question.quiz_id == Quiz.id)
+        .where(Quiz.id == quiz_id, Quiz.user_id == user_id)
+        .order_by(Question.position)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return None
+
+    quiz = LoadedQuiz(*rows[0][:5])
+    for row in rows:
+        if row[5] is None:
+            continue  # quiz sans question (jointure externe)
+        question_id, position, text, options, answer_mask, explanation, source_page = row[5:]
+        quiz.questions.append(LoadedQuestion(
+            question_id, position, text, unpack_options(options), answer_mask, explanation, source_page
+        ))
+    return quiz
+
+
+async def load_answer_key(
+    session: AsyncSession, quiz_id: int, user_id: int
+) -> Optional[Tuple[List[int], List[int], List[int]]]:
+    """(masques des bonnes réponses, nombre d'options, identifiants) par position, sans le texte des questions"""
+    query = (
+        select(Question.answer_mask, Question.option_count, Question.id)
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .where(Quiz.id == quiz_id, Quiz.user_id == user_id)
+        .order_by(Question.position)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return None
+    return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
@@ -0,0 +1,110 @@
+# app/quiz/review_routes.py
+# Révision espacée : file des questions à revoir et réponses hors quiz (voir scheduler.py).
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_session
+from app.db_writer import run_write
+from app.models import Question, Quiz
+from app.responses import FastJSONResponse
+from app.schemas import ReviewItem, ReviewResult, ReviewSubmit
+from .encoding import MAX_OPTIONS, unpack_options
+from .quiz_routes import authenticate
+from .scheduler import due_cards, schedule_reviews
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/reviews", tags=["reviews"])
+
+
+# Route pour la file de révision
+@router.get("/due")
+async def get_due_reviews(
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Questions à réviser maintenant, les plus en retard d'abord (sans les réponses)
+    """
+    current_user = await authenticate(request, session)
+
+    rows = await due_cards(session, current_user.id, limit)
+    reviews = [
+        ReviewItem(
+            question_id=question_id,
+            quiz_id=quiz_id,
+            due_at=due_at,
+            repetitions=repetitions,
+            text=text,
+            options=unpack_options(options),
+            multiple=(answer_mask & (answer_mask - 1)) != 0,
+            source_page=source_page
+        )
+        for question_id, quiz_id, due_at, repetitions, text, options, answer_mask, source_page in rows
+    ]
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"success": True, "count": len(reviews), "reviews": reviews}
+    )
+
+
+# Route pour enregistrer des révisions
+@router.post("")
+async def submit_reviews(
+    submission: ReviewSubmit,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Corrige des réponses à des questions de la banque et replanifie leurs cartes (une écriture)
+    """
+    current_user = await authenticate(request, session)
+    user_id = current_user.id
+
+    question_ids = list({review.question_id for review in submission.reviews})
+    rows = await session.execute(
+        select(Question.id, Question.quiz_id, Question.answer_mask, Question.option_count)
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .where(Question.id.in_(question_ids), Quiz.user_id == user_id)
+    )
+    keys = {row[0]: row[1:] for row in rows}
+
+    outcomes = []
+    for review in submission.reviews:
+        if review.question_id not in keys:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question non trouvée")
+        _, answer_mask, option_count = keys[review.question_id]
+        mask = 0
+        for option in review.answers:
+            if not 0 <= option < min(option_count, MAX_OPTIONS):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Question {review.question_id} : option {option} inexistante"
+                )
+            mask |= 1 << option
+        outcomes.append((review.question_id, mask == answer_mask))
+
+    quiz_ids = {question_id: key[0] for question_id, key in keys.items()}
+    now = datetime.utcnow()
+
+    async def reschedule(db: AsyncSession):
+        return await schedule_reviews(db, user_id, quiz_ids, outcomes, now)
+
+    due = await run_write(reschedule)
+    logger.info("%s reviews recorded. User: %s", len(outcomes), user_id)
+
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "results": [
+                ReviewResult(question_id, correct, due[question_id]) for question_id, correct in outcomes
+            ]
+        }
+    )
@@ -0,0 +1,151 @@
+# app/quiz/scheduler.py
+# Révision espacée (SM-2) sur la banque de questions. Chaque réponse d'un utilisateur à une
+# question met à jour sa carte (review_cards) : intervalle, facilité et prochaine échéance.
+# - Bonne réponse : 1 jour, puis 6 jours, puis intervalle précédent x facilité.
+# - Réponse fausse : la question revient après REVIEW_RELEARN_MINUTES, la série repart de zéro.
+# Les mises à jour d'une correction (toutes les questions, toutes les tentatives) sont écrites
+# en lot : une lecture des cartes par clé primaire, un UPDATE et un INSERT groupés (executemany).
+# La file « à réviser » est un parcours borné de l'index (user_id, due_at).
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import REVIEW_INITIAL_EASE, REVIEW_MAX_INTERVAL_DAYS, REVIEW_RELEARN_MINUTES
+from app.models import Question, ReviewCard
+
+# Qualité de rappel SM-2 (0 à 5) déduite d'une réponse : exacte ou non
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+MIN_EASE = 1.3
+
+_cards = ReviewCard.__table__
+
+_update_card = (
+    update(_cards)
+    .where(_cards.c.user_id == bindparam("b_user_id"), _cards.c.question_id == bindparam("b_question_id"))
+    .values(
+        due_at=bindparam("b_due_at"),
+        interval_days=bindparam("b_interval_days"),
+        ease=bindparam("b_ease"),
+        repetitions=bindparam("b_repetitions"),
+        lapses=bindparam("b_lapses"),
+        last_reviewed_at=bindparam("b_last_reviewed_at"),
+    )
+)
+
+
+@dataclass(slots=True)
+class CardState:
+    interval_days: float = 0.0
+    ease: float = REVIEW_INITIAL_EASE
+    repetitions: int = 0
+    lapses: int = 0
+
+
+def review(state: CardState, quality: int) -> CardState:
+    """Nouvel état d'une carte après une révision de qualité 0 à 5 (SM-2)"""
+    repetitions, lapses = state.repetitions, state.lapses
+    if quality >= 3:
+        if repetitions == 0:
+            interval = 1.0
+        elif repetitions == 1:
+            interval = 6.0
+        else:
+            interval = round(state.interval_days * state.ease)
+        repetitions += 1
+    else:
+        if repetitions:
+            lapses += 1
+        repetitions = 0
+        interval = 0.0
+    miss = 5 - quality
+    ease = max(MIN_EASE, state.ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return CardState(min(interval, REVIEW_MAX_INTERVAL_DAYS), ease, repetitions, lapses)
+
+
+def due_date(state: CardState, now: datetime) -> datetime:
+    if not state.interval_days:
+        return now + timedelta(minutes=REVIEW_RELEARN_MINUTES)
+    return now + timedelta(days=state.interval_days)
+
+
+def fold_reviews(
+    states: Dict[int, CardState],
+    outcomes: Sequence[Tuple[int, bool]]
+) -> Dict[int, CardState]:
+    """Applique des réponses (question_id, exacte) dans l'ordre ; renvoie les cartes modifiées"""
+    changed: Dict[int, CardState] = {}
+    for question_id, correct in outcomes:
+        state = changed.get(question_id) or states.get(question_id) or CardState()
+        changed[question_id] = review(state, QUALITY_CORRECT if correct else QUALITY_WRONG)
+    return changed
+
+
+async def schedule_reviews(
+    db: AsyncSession,
+    user_id: int,
+    quiz_ids: Dict[int, int],
+    outcomes: Sequence[Tuple[int, bool]],
+    now: Optional[datetime] = None
+) -> Dict[int, datetime]:
+    """
+    Met à jour les cartes de l'utilisateur pour des réponses (question_id, exacte), dans l'ordre ;
+    quiz_ids associe chaque question à son quiz. À exécuter dans une écriture (run_write).
+    Renvoie la prochaine échéance de chaque question.
+    """
+    if not outcomes:
+        return {}
+    now = now or datetime.utcnow()
+    question_ids = list(dict.fromkeys(question_id for question_id, _ in outcomes))
+
+    rows = await db.execute(
+        select(
+            ReviewCard.question_id, ReviewCard.interval_days, ReviewCard.ease,
+            ReviewCard.repetitions, ReviewCard.lapses
+        ).where(ReviewCard.user_id == user_id, ReviewCard.question_id.in_(question_ids))
+    )
+    states = {row[0]: CardState(*row[1:]) for row in rows}
+    changed = fold_reviews(states, outcomes)
+
+    updates, inserts = [], []
+    due = {}
+    for question_id, state in changed.items():
+        due[question_id] = due_at = due_date(state, now)
+        if question_id in states:
+            updates.append({
+                "b_user_id": user_id, "b_question_id": question_id, "b_due_at": due_at,
+                "b_interval_days": state.interval_days, "b_ease": state.ease,
+                "b_repetitions": state.repetitions, "b_lapses": state.lapses, "b_last_reviewed_at": now,
+            })
+        else:
+            inserts.append({
+                "user_id": user_id, "question_id": question_id, "quiz_id": quiz_ids[question_id],
+                "due_at": due_at, "interval_days": state.interval_days, "ease": state.ease,
+                "repetitions": state.repetitions, "lapses": state.lapses, "last_reviewed_at": now,
+            })
+    if updates:
+        await db.execute(_update_card, updates)
+    if inserts:
+        await db.execute(insert(ReviewCard), inserts)
+    return due
+
+
+def due_query(user_id: int, now: datetime, limit: int):
+    """Cartes arrivées à échéance, les plus en retard d'abord (parcours borné de l'index)"""
+    return (
+        select(
+            ReviewCard.question_id, ReviewCard.quiz_id, ReviewCard.due_at, ReviewCard.repetitions,
+            Question.text, Question.options, Question.answer_mask, Question.source_page
+        )
+        .join(Question, Question.id == ReviewCard.question_id)
+        .where(ReviewCard.user_id == user_id, ReviewCard.due_at <= now)
+        .order_by(ReviewCard.due_at)
+        .limit(limit)
+    )
+
+
+async def due_cards(session: AsyncSession, user_id: int, limit: int, now: Optional[datetime] = None) -> List[tuple]:
+    return list((await session.execute(due_query(user_id, now or datetime.utcnow(), limit))).all())
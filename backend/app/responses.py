@@ -0,0 +1,93 @@
+# app/responses.py
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Optional
+
+import anyio.to_thread
+import orjson
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+
+# Extension ASGI « zero-copy send » : le serveur transmet le fichier via sendfile(2)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON sérialisée par orjson : datetime (ISO 8601), dataclasses et tableaux NumPy
+    sont gérés nativement, sans passage par jsonable_encoder ni .isoformat() ligne par ligne.
+    Classe de réponse par défaut de l'application.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Flux NDJSON : un objet JSON (orjson) par ligne, envoyé dès qu'il est produit
+    (progression des tâches longues). La compression vide son tampon à chaque ligne.
+    on_close est appelé à la fin de l'envoi, même si le flux n'a jamais été parcouru
+    (client déconnecté avant le premier événement, erreur d'envoi).
+    """
+    media_type = "application/x-ndjson"
+
+    def __init__(
+        self,
+        events: AsyncIterable[Any],
+        status_code: int = 200,
+        headers: dict = None,
+        on_close: Optional[Callable[[], None]] = None
+    ):
+        super().__init__(self._lines(events), status_code=status_code, headers=headers)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+
+    @staticmethod
+    async def _lines(events: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+        async for event in events:
+            yield orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+
+class SendfileResponse(FileResponse):
+    """
+    FileResponse (Range, If-Range, HEAD) qui délègue la copie au noyau quand le serveur ASGI
+    propose l'extension zero-copy ; sinon lecture par gros blocs (mémoire bornée à un bloc).
+    Redéfinit _handle_simple et _handle_single_range de FileResponse (méthodes internes de
+    Starlette 0.46) : version contrainte dans pyproject.toml et requirements.txt.
+    """
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope, receive, send):
+        self._zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _send_file(self, send, start: int, count: int) -> None:
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            await send({
+                "type": ZEROCOPY_EXTENSION,
+                "file": file,
+                "offset": start,
+                "count": count,
+                "more_body": False,
+            })
+        finally:
+            file.close()
+
+    async def _handle_simple(self, send, send_header_only: bool) -> None:
+        if not self._zerocopy or send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await self._send_file(send, 0, os.stat(self.path).st_size)
+
+    async def _handle_single_range(self, send, start: int, end: int, file_size: int, send_header_only: bool) -> None:
+        if not self._zerocopy or send_header_only:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._send_file(send, start, end - start)
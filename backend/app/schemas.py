@@ -1,8 +1,9 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional
 from fastapi_users import schemas
-from pydantic import ConfigDict, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 from pydantic_core import PydanticCustomError
-from datetime import datetime  # Assurez-vous que l'import est correct
+from datetime import date, datetime  # Assurez-vous que l'import est correct
 
 
 class UserCreate(schemas.BaseUserCreate):
@@ -29,4 +30,205 @@ class UserRead(schemas.BaseUser[int]):
     )
 
 class UserUpdate(schemas.BaseUserUpdate):
-    full_name: Optional[str] = None
\ No newline at end of file
+    full_name: Optional[str] = None
+
+class QuestionCreate(BaseModel):
+    text: str = Field(..., min_length=1)
+    options: List[str] = Field(..., min_length=2, max_length=16)
+    # Indices des bonnes réponses (plusieurs pour une question à choix multiples)
+    correct: List[int] = Field(..., min_length=1)
+    explanation: Optional[str] = None
+    source_page: Optional[int] = None
+
+    @field_validator('options')
+    def validate_options(cls, v):
+        # Séparateur des options stockées (OPTION_SEPARATOR, app/quiz/encoding.py)
+        if any("\x1f" in option for option in v):
+            raise PydanticCustomError("invalid_option", "Caractère interdit dans une option")
+        return v
+
+    @field_validator('correct')
+    def validate_correct(cls, v, info):
+        options = info.data.get("options") or []
+        if any(not 0 <= index < len(options) for index in v):
+            raise PydanticCustomError("invalid_answer", "Indice de bonne réponse hors des options")
+        return v
+
+class GradingOptions(BaseModel):
+    # Fraction de point retirée par réponse fausse
+    negative_marking: float = Field(0.0, ge=0.0, le=1.0)
+    # Crédit partiel sur les questions à plusieurs réponses
+    partial_credit: bool = False
+
+class AttemptAnswers(BaseModel):
+    # Indices cochés pour chaque question, dans l'ordre des positions ([] = sans réponse)
+    answers: List[List[int]]
+
+class AttemptSubmit(GradingOptions, AttemptAnswers):
+    pass
+
+class AttemptBatchSubmit(GradingOptions):
+    attempts: List[AttemptAnswers] = Field(..., min_length=1, max_length=2000)
+
+class ReviewAnswer(BaseModel):
+    question_id: int
+    # Indices cochés ([] = sans réponse)
+    answers: List[int] = Field(default_factory=list)
+
+class ReviewSubmit(BaseModel):
+    reviews: List[ReviewAnswer] = Field(..., min_length=1, max_length=500)
+
+class QCMGenerate(BaseModel):
+    question_count: int = Field(20, ge=1, le=500)
+    # Budget de tokens estimés (prompt + réponse), plafonné par QCM_JOB_MAX_TOKENS
+    max_tokens: Optional[int] = Field(None, ge=1000)
+    title: str = Field("QCM", min_length=1, max_length=200)
+
+class QuizCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    pdf_id: Optional[int] = None
+    folder_id: Optional[int] = None
+    questions: List[QuestionCreate] = Field(..., min_length=1, max_length=500)
+
+class DifficultyMix(BaseModel):
+    # Parts relatives de questions faciles, moyennes et difficiles
+    easy: float = Field(0.3, ge=0.0)
+    medium: float = Field(0.5, ge=0.0)
+    hard: float = Field(0.2, ge=0.0)
+
+class QuizAssemble(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    # Banque source : un PDF ou un dossier
+    pdf_id: Optional[int] = None
+    folder_id: Optional[int] = None
+    question_count: int = Field(20, ge=1, le=500)
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+    page_bins: int = Field(5, ge=1, le=50)
+    difficulty: DifficultyMix = Field(default_factory=DifficultyMix)
+    # Exclut les questions révisées ou répondues depuis ce nombre de jours (0 = aucune exclusion)
+    exclude_seen_days: int = Field(14, ge=0, le=365)
+    # Graine du tirage, pour un assemblage reproductible
+    seed: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_source(self):
+        if (self.pdf_id is None) == (self.folder_id is None):
+            raise PydanticCustomError("invalid_source", "Indiquer un PDF ou un dossier source")
+        if self.page_from is not None and self.page_to is not None and self.page_from > self.page_to:
+            raise PydanticCustomError("invalid_pages", "Plage de pages invalide")
+        return self
+
+# Éléments des listes chaudes : dataclasses à slots, sérialisées directement par orjson
+# (FastJSONResponse) sans dictionnaire intermédiaire ni conversion des dates
+
+@dataclass(slots=True)
+class PDFItem:
+    id: int
+    filename: str
+    file_size: int
+    uploaded_at: datetime
+
+
+@dataclass(slots=True)
+class FolderItem:
+    id: int
+    name: str
+    created_at: datetime
+    subfolder_count: int = 0
+    file_count: int = 0
+
+
+@dataclass(slots=True)
+class AdminUserItem:
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_verified: bool
+    created_at: datetime
+    last_login: Optional[datetime]
+    login_type: str
+    profile_picture: Optional[str]
+    is_superuser: bool
+
+
+@dataclass(slots=True)
+class AdminSessionItem:
+    token_id: int
+    user_id: int
+    user_email: str
+    user_fullname: Optional[str]
+    created_at: datetime
+    expires_at: datetime
+    is_active: bool
+
+
+@dataclass(slots=True)
+class QuizItem:
+    id: int
+    title: str
+    question_count: int
+    pdf_id: Optional[int]
+    folder_id: Optional[int]
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class QuestionItem:
+    id: int
+    position: int
+    text: str
+    options: List[str]
+    # Plusieurs réponses attendues : le client affiche des cases à cocher
+    multiple: bool
+    source_page: Optional[int]
+    correct: Optional[List[int]] = None
+    explanation: Optional[str] = None
+
+
+@dataclass(slots=True)
+class AttemptResult:
+    attempt_id: int
+    score: float
+    correct_count: int
+
+
+@dataclass(slots=True)
+class QuestionStatsItem:
+    question_id: int
+    position: int
+    attempt_count: int
+    correct_count: int
+    # Proportion de réponses exactes (p-value) et corrélation point-bisériale
+    difficulty: Optional[float]
+    discrimination: Optional[float]
+
+
+@dataclass(slots=True)
+class ReviewItem:
+    question_id: int
+    quiz_id: int
+    due_at: datetime
+    repetitions: int
+    text: str
+    options: List[str]
+    multiple: bool
+    source_page: Optional[int]
+
+
+@dataclass(slots=True)
+class ReviewResult:
+    question_id: int
+    correct: bool
+    due_at: datetime
+
+
+@dataclass(slots=True)
+class UsageDay:
+    day: date
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    # Coût en USD aux tarifs configurés
+    cost: float
@@ -0,0 +1,310 @@
+# benchmarks/api_load.py
+"""
+Banc de charge de l'API : lance l'application en processus (transport ASGI de httpx, sans
+réseau) ou derrière un vrai serveur uvicorn, sur une base ensemencée (benchmarks.api_seed),
+puis exécute des scénarios sous N clients concurrents et écrit débit et latences
+p50/p95/p99 dans un fichier JSON comparable d'un commit à l'autre.
+
+Usage (depuis backend/) :
+    python -m benchmarks.api_load --concurrency 20 --duration 10 --json bench.json
+    python -m benchmarks.api_load --mode uvicorn --workers 4 --scenarios list_traffic,uploads
+    python -m benchmarks.api_load --json apres.json --compare avant.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Scénario : une requête (ou une courte séquence) jouée en boucle par chaque client
+ScenarioFn = Callable[[httpx.AsyncClient, "Fixture", random.Random], Awaitable[httpx.Response]]
+SCENARIOS: Dict[str, ScenarioFn] = {}
+
+
+def scenario(name: str):
+    def register(fn: ScenarioFn) -> ScenarioFn:
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+@scenario("login_burst")
+async def login_burst(client, fixture, rng):
+    # Comptes dédiés : le mode session unique révoque les sessions précédentes à chaque login
+    return await client.post("/auth/login", data={
+        "username": rng.choice(fixture.login_emails),
+        "password": fixture.password,
+    })
+
+
+@scenario("list_traffic")
+async def list_traffic(client, fixture, rng):
+    user = rng.choice(fixture.users)
+    path = rng.choices(("/pdf/list", "/folders/list", "/custom/me"), weights=(4, 4, 2))[0]
+    return await client.get(path, headers=user.headers)
+
+
+@scenario("uploads")
+async def uploads(client, fixture, rng):
+    user = rng.choice(fixture.users)
+    files = {"file": ("cours.pdf", fixture.sample_pdf, "application/pdf")}
+    return await client.post("/pdf/upload", files=files, headers=user.headers)
+
+
+@scenario("folder_browse")
+async def folder_browse(client, fixture, rng):
+    # Navigation : racine, un dossier, puis un de ses sous-dossiers
+    user = rng.choice(fixture.users)
+    response = await client.get("/folders/list", headers=user.headers)
+    if response.status_code != 200 or not user.root_folder_ids:
+        return response
+    root_id = rng.choice(user.root_folder_ids)
+    response = await client.get("/folders/list", params={"parent_id": root_id}, headers=user.headers)
+    children = user.children.get(root_id)
+    if response.status_code != 200 or not children:
+        return response
+    return await client.get("/folders/list", params={"parent_id": rng.choice(children)}, headers=user.headers)
+
+
+@scenario("qcm_generate")
+async def qcm_generate(client, fixture, rng):
+    # Génération sur un dossier racine et ses sous-dossiers (fournisseur "stub" sans clé OpenAI) ;
+    # après le premier passage, les morceaux viennent du cache
+    user = rng.choice(fixture.users)
+    spec = {"question_count": 5}
+    if user.pdf_root_ids:
+        root_id = rng.choice(user.pdf_root_ids)
+        return await client.post(f"/qcm/folders/{root_id}/generate", json=spec, headers=user.headers)
+    return await client.post(f"/qcm/pdf/{rng.choice(user.pdf_ids)}/generate", json=spec, headers=user.headers)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentile au rang le plus proche"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, fixture, name: str, concurrency: int,
+                       duration: float, max_requests: Optional[int] = None, seed: int = 0) -> dict:
+    fn = SCENARIOS[name]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    failures = 0
+    deadline = time.perf_counter() + duration
+    remaining = [max_requests if max_requests is not None else math.inf]
+
+    async def worker(worker_id: int):
+        nonlocal failures
+        rng = random.Random(seed * 10_000 + worker_id)
+        while time.perf_counter() < deadline and remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = await fn(client, fixture, rng)
+            except httpx.HTTPError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            if response.status_code >= 400:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": failures,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 2) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "max": round(ms[-1], 2) if ms else 0.0,
+        },
+    }
+
+
+async def run_all(client: httpx.AsyncClient, fixture, names: List[str], concurrency: int,
+                  duration: float, warmup: float = 1.0, max_requests: Optional[int] = None) -> Dict[str, dict]:
+    results = {}
+    for index, name in enumerate(names):
+        if warmup > 0:
+            await run_scenario(client, fixture, name, concurrency, warmup, seed=10_000 + index)
+        results[name] = await run_scenario(client, fixture, name, concurrency, duration, max_requests, seed=index)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as probe:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn s'est arrêté (code {process.returncode})")
+            try:
+                if (await probe.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn n'a pas démarré à temps")
+
+
+async def run_asgi(fixture, args) -> Dict[str, dict]:
+    from app.main import app
+
+    # Le transport ASGI ne déclenche pas le cycle de vie : démarrage/arrêt explicites
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_all(client, fixture, args.scenarios, args.concurrency, args.duration,
+                                 args.warmup, args.max_requests)
+    finally:
+        await app.router.shutdown()
+
+
+async def run_uvicorn(fixture, args) -> Dict[str, dict]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        await _wait_ready(base_url, process)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            return await run_all(client, fixture, args.scenarios, args.concurrency, args.duration,
+                                 args.warmup, args.max_requests)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: dict, current: dict) -> List[str]:
+    """Écarts de débit et de p95 par scénario entre deux rapports"""
+    lines = []
+    for name, now in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        rps_delta = (now["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        p95_before, p95_now = before["latency_ms"]["p95"], now["latency_ms"]["p95"]
+        p95_delta = (p95_now - p95_before) / p95_before * 100 if p95_before else 0.0
+        lines.append(f"{name:>16}: {before['rps']:>9} -> {now['rps']:>9} req/s ({rps_delta:+.1f} %)  "
+                     f"p95 {p95_before} -> {p95_now} ms ({p95_delta:+.1f} %)")
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="workers uvicorn (mode uvicorn)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"liste séparée par des virgules parmi : {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de chaque scénario (s)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="échauffement avant chaque scénario (s)")
+    parser.add_argument("--max-requests", type=int, help="arrêt après ce nombre de requêtes par scénario")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--folders", type=int, default=20, help="dossiers par utilisateur")
+    parser.add_argument("--pdfs", type=int, default=50, help="PDFs par utilisateur")
+    parser.add_argument("--login-users", type=int, default=20)
+    parser.add_argument("--database-url", help="base à ensemencer (défaut : SQLite temporaire)")
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    parser.add_argument("--compare", help="rapport JSON précédent à comparer")
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"scénarios inconnus : {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="qcm-bench-")
+
+    # À définir avant l'import de l'application (moteur et dossier d'upload lus à l'import)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from benchmarks.api_seed import seed
+
+    started = time.perf_counter()
+    fixture = seed(os.environ["DATABASE_URL"], os.environ["UPLOAD_DIR"], users=args.users,
+                   folders=args.folders, pdfs=args.pdfs, login_users=args.login_users)
+    seed_seconds = time.perf_counter() - started
+
+    runner = run_asgi if args.mode == "asgi" else run_uvicorn
+    results = asyncio.run(runner(fixture, args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else None,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "dataset": {"users": args.users, "folders_per_user": args.folders,
+                        "pdfs_per_user": args.pdfs, "login_users": args.login_users},
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "scenarios": results,
+    }
+
+    for name, r in results.items():
+        lat = r["latency_ms"]
+        print(f"{name:>16}: {r['rps']:>9} req/s  p50 {lat['p50']:>7} ms  p95 {lat['p95']:>7} ms  "
+              f"p99 {lat['p99']:>7} ms  ({r['requests']} requêtes, {r['errors']} erreurs)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(json.load(f), report):
+                print(line)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/api_seed.py
+"""
+Jeu de données reproductible pour les benchmarks de l'API : N utilisateurs avec une session
+active, une arborescence de M dossiers et K PDFs chacun, plus des comptes dédiés aux logins.
+"""
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy.orm import Session
+
+from app.auth.jwt_utils import create_access_token
+from app.database import create_sync_engine_from_url, run_migrations
+from app.models import AccessToken, Folder, PDF, User
+
+PASSWORD = "Bench-Password-2024!"
+
+
+@dataclass
+class SeededUser:
+    id: int
+    email: str
+    headers: Dict[str, str]
+    root_folder_ids: List[int] = field(default_factory=list)
+    children: Dict[int, List[int]] = field(default_factory=dict)
+    pdf_ids: List[int] = field(default_factory=list)
+    # Dossiers racine dont le sous-arbre contient au moins un PDF
+    pdf_root_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Fixture:
+    users: List[SeededUser]
+    login_emails: List[str]
+    password: str = PASSWORD
+    sample_pdf: bytes = b""
+
+
+def make_sample_pdf(text: str = "Question de cours : la photosynthese produit du dioxygene.") -> bytes:
+    """PDF minimal valide (une page, une ligne de texte) avec une table xref exacte"""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def seed(database_url: str, upload_dir: str, users: int = 50, folders: int = 20, pdfs: int = 50,
+         login_users: int = 20, seed_value: int = 42) -> Fixture:
+    """
+    Applique les migrations puis insère le jeu de données. Les dossiers forment un arbre à deux
+    niveaux (racines + sous-dossiers) ; les PDFs sont répartis entre la racine et les dossiers.
+    """
+    rng = random.Random(seed_value)
+    engine = create_sync_engine_from_url(database_url)
+    with engine.begin() as connection:
+        run_migrations(connection)
+
+    os.makedirs(upload_dir, exist_ok=True)
+    sample_pdf = make_sample_pdf()
+    sample_path = os.path.join(upload_dir, "bench-sample.pdf")
+    with open(sample_path, "wb") as f:
+        f.write(sample_pdf)
+
+    # Un seul hachage : le coût du login mesuré reste celui de la vérification
+    hashed_password = PasswordHelper().hash(PASSWORD)
+    run_id = uuid.uuid4().hex[:8]
+    seeded: List[SeededUser] = []
+    login_emails: List[str] = []
+    now = datetime.utcnow()
+
+    with Session(engine) as db:
+        for i in range(users):
+            user = User(email=f"bench-{run_id}-{i}@example.com", hashed_password=hashed_password,
+                        is_active=True, is_verified=True, is_superuser=False)
+            db.add(user)
+            db.flush()
+
+            token = create_access_token({"sub": str(user.id), "jti": uuid.uuid4().hex}, timedelta(days=1))
+            db.add(AccessToken(token=token, user_id=user.id, expires_at=now + timedelta(days=1), is_valid=True))
+            entry = SeededUser(id=user.id, email=user.email, headers={"Authorization": f"Bearer {token}"})
+
+            roots = max(1, int(folders ** 0.5))
+            root_objs = [Folder(name=f"Cours {r}", user_id=user.id) for r in range(roots)]
+            db.add_all(root_objs)
+            db.flush()
+            entry.root_folder_ids = [f.id for f in root_objs]
+            child_objs = []
+            for c in range(max(0, folders - roots)):
+                parent = root_objs[c % roots]
+                child = Folder(name=f"Chapitre {c}", user_id=user.id, parent_id=parent.id)
+                child_objs.append(child)
+            db.add_all(child_objs)
+            db.flush()
+            for child in child_objs:
+                entry.children.setdefault(child.parent_id, []).append(child.id)
+
+            folder_ids = [None] + [f.id for f in root_objs + child_objs]
+            # Déjà traités : la file de traitement ne les reprend pas au démarrage de l'application
+            pdf_objs = [
+                PDF(filename=f"bench-{p}.pdf", original_filename=f"support-{p}.pdf", filepath=sample_path,
+                    file_size=len(sample_pdf), user_id=user.id, folder_id=rng.choice(folder_ids),
+                    is_processed=True, page_count=1)
+                for p in range(pdfs)
+            ]
+            db.add_all(pdf_objs)
+            db.flush()
+            entry.pdf_ids = [p.id for p in pdf_objs]
+            root_of = {f.id: f.id for f in root_objs}
+            root_of.update({child.id: child.parent_id for child in child_objs})
+            entry.pdf_root_ids = sorted({root_of[p.folder_id] for p in pdf_objs if p.folder_id is not None})
+            seeded.append(entry)
+
+        for i in range(login_users):
+            email = f"bench-login-{run_id}-{i}@example.com"
+            db.add(User(email=email, hashed_password=hashed_password, is_active=True, is_verified=True))
+            login_emails.append(email)
+        db.commit()
+
+    engine.dispose()
+    return Fixture(users=seeded, login_emails=login_emails, sample_pdf=sample_pdf)
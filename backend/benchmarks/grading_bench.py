@@ -0,0 +1,76 @@
+# benchmarks/grading_bench.py
+"""
+Débit de correction par lots (app/quiz/grading.py) : N tentatives aléatoires sur un quiz de
+Q questions (un quart à plusieurs réponses), barème avec points négatifs et crédit partiel.
+Compare la passe vectorisée (NumPy, si installé) à l'implémentation Python pure.
+
+Usage (depuis backend/) :
+    python -m benchmarks.grading_bench --attempts 100000 --questions 50 [--json resultats.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.quiz import grading
+from app.quiz.encoding import pack_answers
+from app.quiz.grading import AnswerKey, GradingRules, grade_batch
+
+
+def make_batch(attempts: int, questions: int, seed: int = 42):
+    rng = random.Random(seed)
+    key_masks = [rng.choice((1, 2, 4, 8)) | (rng.choice((1, 2, 4, 8)) if i % 4 == 0 else 0)
+                 for i in range(questions)]
+    # Réponses plausibles : la bonne réponse les deux tiers du temps
+    answers = [
+        pack_answers([mask if rng.random() < 0.66 else rng.randrange(16) for mask in key_masks])
+        for _ in range(attempts)
+    ]
+    return AnswerKey(key_masks, GradingRules(negative_marking=0.25, partial_credit=True)), answers
+
+
+def measure(fn, key, answers, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(key, answers)
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        "attempts": len(answers),
+        "median_ms": round(median * 1000, 2),
+        "attempts_per_second": round(len(answers) / median),
+    }
+
+
+def main(attempts: int, questions: int, repeat: int, python_attempts: int) -> dict:
+    key, answers = make_batch(attempts, questions)
+    results = {"questions": questions}
+    if grading.np is not None:
+        results["numpy"] = measure(grade_batch, key, answers, repeat)
+    # Python pur sur un sous-ensemble : plusieurs secondes sinon
+    results["python"] = measure(grading._grade_python, key, answers[:python_attempts], max(1, repeat // 5))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--python-attempts", type=int, default=10_000, help="tentatives corrigées en Python pur")
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = main(args.attempts, args.questions, args.repeat, args.python_attempts)
+    for engine in ("numpy", "python"):
+        if engine in results:
+            r = results[engine]
+            print(f"{engine:>7}: {r['attempts']:>7} tentatives en {r['median_ms']:>9} ms  "
+                  f"({r['attempts_per_second']:,} tentatives/s)")
+    if "numpy" not in results:
+        print("NumPy non installé : seule l'implémentation Python pure est mesurée")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,111 @@
+# benchmarks/json_serialization_bench.py
+"""
+Microbenchmark de sérialisation d'une liste de 10 000 lignes (forme de /admin/sessions) :
+- avant : dictionnaires + .isoformat() par ligne, jsonable_encoder puis JSONResponse (stdlib) ;
+- dict + JSONResponse sans jsonable_encoder ;
+- dict + FastJSONResponse (orjson) ;
+- après : dataclasses à slots + FastJSONResponse (dates natives).
+Chaque variante inclut la construction du contenu à partir des lignes SQL (tuples).
+
+Usage (depuis backend/) :
+    python -m benchmarks.json_serialization_bench --rows 10000 --repeat 20 [--json resultats.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse
+from app.schemas import AdminSessionItem
+
+
+def make_rows(count: int) -> list:
+    start = datetime(2026, 1, 1, 8, 30, 15, 123456)
+    return [
+        (i, i % 500, f"user{i % 500}@example.com", f"Utilisateur {i % 500}",
+         start + timedelta(seconds=i), start + timedelta(hours=1, seconds=i), i % 7 != 0)
+        for i in range(count)
+    ]
+
+
+def as_dicts(rows):
+    return [
+        {
+            "token_id": token_id,
+            "user_id": user_id,
+            "user_email": email,
+            "user_fullname": full_name,
+            "created_at": created_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "is_active": is_active
+        }
+        for token_id, user_id, email, full_name, created_at, expires_at, is_active in rows
+    ]
+
+
+def stdlib_with_encoder(rows) -> bytes:
+    content = {"success": True, "count": len(rows), "sessions": as_dicts(rows)}
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def stdlib(rows) -> bytes:
+    return JSONResponse(content={"success": True, "count": len(rows), "sessions": as_dicts(rows)}).body
+
+
+def orjson_dicts(rows) -> bytes:
+    return FastJSONResponse(content={"success": True, "count": len(rows), "sessions": as_dicts(rows)}).body
+
+
+def orjson_structs(rows) -> bytes:
+    sessions = [AdminSessionItem(*row) for row in rows]
+    return FastJSONResponse(content={"success": True, "count": len(sessions), "sessions": sessions}).body
+
+
+VARIANTS = [
+    ("dict + jsonable_encoder + JSONResponse", stdlib_with_encoder),
+    ("dict + JSONResponse", stdlib),
+    ("dict + FastJSONResponse", orjson_dicts),
+    ("dataclass + FastJSONResponse", orjson_structs),
+]
+
+
+def main(rows_count: int, repeat: int) -> list:
+    rows = make_rows(rows_count)
+    # Même contenu quelle que soit la variante
+    reference = json.loads(stdlib(rows))
+    results = []
+    for name, fn in VARIANTS:
+        assert json.loads(fn(rows)) == reference, name
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = fn(rows)
+            timings.append(time.perf_counter() - started)
+        results.append({
+            "variant": name,
+            "rows": rows_count,
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "min_ms": round(min(timings) * 1000, 2),
+            "bytes": len(body),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = main(args.rows, args.repeat)
+    baseline = results[0]["median_ms"]
+    for r in results:
+        print(f"{r['variant']:>40}: {r['median_ms']:>8} ms (médiane)  x{baseline / r['median_ms']:.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
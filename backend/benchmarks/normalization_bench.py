@@ -0,0 +1,99 @@
+# benchmarks/normalization_bench.py
+"""
+Nettoyage du texte avant génération (app/qcm/normalize.py) sur des documents synthétiques
+typiques : diapositives (peu de texte, en-tête, pied de page, numéro et filigrane sur chaque
+page) et polycopié (pages pleines, en-tête et pied de page courants). Mesure :
+- les tokens envoyés au LLM avant et après nettoyage (et donc les morceaux et appels évités) ;
+- le débit du nettoyage (pages/s).
+
+Usage (depuis backend/) :
+    python -m benchmarks.normalization_bench --pages 200 [--json resultats.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.core.config import QCM_CHUNK_TOKENS
+from app.qcm.chunking import chunk_pages
+from app.qcm.normalize import normalize_pages
+
+WORDS = (
+    "cellule membrane noyau protéine énergie enzyme glucose respiration photosynthèse chromosome "
+    "division mitose méiose gène allèle mutation transcription traduction ribosome lipide "
+    "organisme tissu organe système régulation homéostasie hormone neurone synapse potentiel"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 18))
+    return " ".join(words).capitalize() + "."
+
+
+def slides(pages: int, rng: random.Random):
+    return [
+        "\n".join([
+            "Université de Lyon - Faculté des sciences",
+            f"Biologie cellulaire · Cours {page // 20 + 1}",
+            *(sentence(rng) for _ in range(rng.randint(2, 5))),
+            "© 2026 - Reproduction interdite - Document de travail",
+            f"Diapositive {page} / {pages}",
+        ])
+        for page in range(1, pages + 1)
+    ]
+
+
+def course_notes(pages: int, rng: random.Random):
+    return [
+        "\n".join([
+            "Biologie cellulaire - Licence 1 - Semestre 2",
+            *(" ".join(sentence(rng) for _ in range(6)) for _ in range(rng.randint(4, 6))),
+            f"Page {page}",
+        ])
+        for page in range(1, pages + 1)
+    ]
+
+
+def measure(pages, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        normalized, report = normalize_pages(pages)
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        "pages": len(pages),
+        "tokens_before": report.tokens_before,
+        "tokens_after": report.tokens_after,
+        "saved_ratio": report.saved_ratio,
+        "chunks_before": len(chunk_pages(pages, QCM_CHUNK_TOKENS)),
+        "chunks_after": len(chunk_pages(normalized, QCM_CHUNK_TOKENS)),
+        "median_ms": round(median * 1000, 2),
+        "pages_per_second": round(len(pages) / median),
+    }
+
+
+def main(pages: int, repeat: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    return {
+        "slides": measure(slides(pages, rng), repeat),
+        "course_notes": measure(course_notes(pages, rng), repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = main(args.pages, args.repeat)
+    for name, r in results.items():
+        print(f"{name:>12}: {r['tokens_before']:>7} -> {r['tokens_after']:>7} tokens "
+              f"(-{r['saved_ratio']:.0%}), morceaux {r['chunks_before']} -> {r['chunks_after']}, "
+              f"{r['median_ms']} ms ({r['pages_per_second']:,} pages/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,179 @@
+# benchmarks/review_scheduler_bench.py
+"""
+File de révision espacée (app/quiz/scheduler.py) sur une base SQLite de N cartes
+(1M par défaut : U utilisateurs x Q questions, échéances réparties sur +/- 30 jours).
+Mesure :
+- la file « à réviser maintenant » d'un utilisateur (latence p50/p99, plan d'exécution) ;
+- la replanification groupée d'une tentative (lecture + UPDATE/INSERT groupés) ;
+- le calcul SM-2 seul (cartes/s).
+
+Usage (depuis backend/) :
+    python -m benchmarks.review_scheduler_bench --cards 1000000 --users 1000 [--json resultats.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_engine_from_url, create_sync_engine_from_url, run_migrations
+from app.models import Question, Quiz, ReviewCard, User
+from app.quiz.scheduler import CardState, due_cards, due_query, fold_reviews, schedule_reviews
+
+NOW = datetime(2026, 6, 1)
+QUESTIONS_PER_QUIZ = 50
+INSERT_CHUNK = 50_000
+
+
+def setup_database(path: str, cards: int, users: int, seed: int = 42):
+    url = f"sqlite:///{path}"
+    questions = max(1, cards // users)
+    quizzes = (questions + QUESTIONS_PER_QUIZ - 1) // QUESTIONS_PER_QUIZ
+    rng = random.Random(seed)
+    sync_engine = create_sync_engine_from_url(url, sqlite_profile=True)
+    with sync_engine.begin() as connection:
+        run_migrations(connection)
+        connection.execute(User.__table__.insert(), [
+            {"email": f"bench{i}@example.com", "is_active": True, "is_superuser": False, "is_verified": True}
+            for i in range(users)
+        ])
+        connection.execute(Quiz.__table__.insert(), [
+            {"title": f"Quiz {i}", "user_id": 1, "question_count": QUESTIONS_PER_QUIZ, "created_at": NOW}
+            for i in range(quizzes)
+        ])
+        connection.execute(Question.__table__.insert(), [
+            {"quiz_id": i // QUESTIONS_PER_QUIZ + 1, "position": i % QUESTIONS_PER_QUIZ,
+             "text": f"Question {i}", "options": "A\x1fB\x1fC\x1fD", "option_count": 4, "answer_mask": 1}
+            for i in range(questions)
+        ])
+
+        rows = []
+        for user_id in range(1, users + 1):
+            for question_id in range(1, questions + 1):
+                repetitions = rng.randrange(6)
+                rows.append({
+                    "user_id": user_id,
+                    "question_id": question_id,
+                    "quiz_id": (question_id - 1) // QUESTIONS_PER_QUIZ + 1,
+                    "due_at": NOW + timedelta(minutes=rng.randint(-30 * 1440, 30 * 1440)),
+                    "interval_days": float(repetitions * 3),
+                    "ease": 2.5,
+                    "repetitions": repetitions,
+                    "lapses": 0,
+                    "last_reviewed_at": NOW,
+                })
+                if len(rows) >= INSERT_CHUNK:
+                    connection.execute(ReviewCard.__table__.insert(), rows)
+                    rows = []
+        if rows:
+            connection.execute(ReviewCard.__table__.insert(), rows)
+        sql = str(due_query(1, NOW, 20).compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    sync_engine.dispose()
+    return url, questions, plan
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure_database(url: str, users: int, questions: int, queries: int, attempt_questions: int) -> dict:
+    engine = create_engine_from_url(url, sqlite_profile=True)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(7)
+
+    queue_timings = []
+    for _ in range(queries):
+        user_id = rng.randint(1, users)
+        async with session_maker() as session:
+            started = time.perf_counter()
+            rows = await due_cards(session, user_id, 20, NOW)
+            queue_timings.append(time.perf_counter() - started)
+            assert len(rows) <= 20
+
+    # Une tentative : attempt_questions réponses d'un utilisateur, une transaction
+    schedule_timings = []
+    attempt_questions = min(attempt_questions, questions)
+    for _ in range(queries):
+        user_id = rng.randint(1, users)
+        question_ids = rng.sample(range(1, questions + 1), attempt_questions)
+        outcomes = [(question_id, rng.random() < 0.7) for question_id in question_ids]
+        quiz_ids = {question_id: (question_id - 1) // QUESTIONS_PER_QUIZ + 1 for question_id in question_ids}
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await schedule_reviews(session, user_id, quiz_ids, outcomes, NOW)
+            await session.commit()
+            schedule_timings.append(time.perf_counter() - started)
+
+    await engine.dispose()
+    return {
+        "due_queue": {
+            "queries": queries,
+            "p50_ms": round(statistics.median(queue_timings) * 1000, 3),
+            "p99_ms": round(percentile(queue_timings, 0.99) * 1000, 3),
+        },
+        "schedule_attempt": {
+            "attempts": queries,
+            "questions_per_attempt": attempt_questions,
+            "p50_ms": round(statistics.median(schedule_timings) * 1000, 3),
+            "p99_ms": round(percentile(schedule_timings, 0.99) * 1000, 3),
+            "cards_per_second": round(queries * attempt_questions / sum(schedule_timings)),
+        },
+    }
+
+
+def measure_sm2(reviews: int) -> dict:
+    rng = random.Random(3)
+    states = {question_id: CardState() for question_id in range(1000)}
+    outcomes = [(rng.randrange(1000), rng.random() < 0.7) for _ in range(reviews)]
+    started = time.perf_counter()
+    fold_reviews(states, outcomes)
+    elapsed = time.perf_counter() - started
+    return {"reviews": reviews, "reviews_per_second": round(reviews / elapsed)}
+
+
+def main(cards: int, users: int, queries: int, attempt_questions: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        url, questions, plan = setup_database(os.path.join(tmp, "reviews.db"), cards, users)
+        seed_seconds = time.perf_counter() - started
+        results = asyncio.run(measure_database(url, users, questions, queries, attempt_questions))
+    results.update({
+        "cards": users * questions,
+        "users": users,
+        "seed_seconds": round(seed_seconds, 1),
+        "due_queue_plan": plan,
+        "sm2": measure_sm2(200_000),
+    })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--attempt-questions", type=int, default=50)
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = main(args.cards, args.users, args.queries, args.attempt_questions)
+    queue, schedule = results["due_queue"], results["schedule_attempt"]
+    print(f"{results['cards']:,} cartes ({results['users']} utilisateurs), base créée en {results['seed_seconds']} s")
+    print(f"plan : {' / '.join(results['due_queue_plan'])}")
+    print(f"file à réviser : p50 {queue['p50_ms']} ms, p99 {queue['p99_ms']} ms")
+    print(f"replanification d'une tentative ({schedule['questions_per_attempt']} questions) : "
+          f"p50 {schedule['p50_ms']} ms, p99 {schedule['p99_ms']} ms ({schedule['cards_per_second']:,} cartes/s)")
+    print(f"SM-2 seul : {results['sm2']['reviews_per_second']:,} révisions/s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,152 @@
+# benchmarks/sqlite_write_bench.py
+"""
+Compare le débit SQLite avant/après le profil de production (PRAGMA + file d'écriture unique)
+sous N clients concurrents, avec un mélange d'uploads (insertion PDF), de logins
+(révocation + création de session) et de listes de PDFs.
+
+Usage (depuis backend/) :
+    python -m benchmarks.sqlite_write_bench --clients 50 --duration 10 [--json resultats.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_engine_from_url, create_sync_engine_from_url, run_migrations
+from app.db_writer import WriteQueue
+from app.models import AccessToken, PDF, User
+
+USERS = 50
+
+
+def setup_database(path: str, sqlite_profile: bool) -> str:
+    url = f"sqlite:///{path}"
+    sync_engine = create_sync_engine_from_url(url, sqlite_profile=sqlite_profile)
+    with sync_engine.begin() as connection:
+        run_migrations(connection)
+        connection.execute(User.__table__.insert(), [
+            {"email": f"bench{i}@example.com", "is_active": True, "is_superuser": False, "is_verified": True}
+            for i in range(USERS)
+        ])
+    sync_engine.dispose()
+    return url
+
+
+def upload_job(user_id: int):
+    async def work(db: AsyncSession) -> int:
+        pdf = PDF(filename="bench.pdf", original_filename="bench.pdf", filepath="/dev/null",
+                  file_size=1024, user_id=user_id)
+        db.add(pdf)
+        await db.flush()
+        return pdf.id
+    return work
+
+
+def login_job(user_id: int, token: str):
+    async def work(db: AsyncSession):
+        now = datetime.utcnow()
+        await db.execute(update(User).where(User.id == user_id).values(last_login=now))
+        await db.execute(delete(AccessToken).where(AccessToken.user_id == user_id))
+        db.add(AccessToken(token=token, user_id=user_id, expires_at=now + timedelta(hours=1), is_valid=True))
+    return work
+
+
+async def run_scenario(name: str, url: str, sqlite_profile: bool, use_queue: bool, clients: int, duration: float) -> dict:
+    engine = create_engine_from_url(url, sqlite_profile=sqlite_profile)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queue = WriteQueue(session_maker, batch_size=64, batch_window=0) if use_queue else None
+    if queue:
+        await queue.start()
+
+    async def write(work):
+        if queue:
+            return await queue.submit(work)
+        async with session_maker() as db:
+            result = await work(db)
+            await db.commit()
+            return result
+
+    counts = {"upload": 0, "login": 0, "list": 0, "errors": 0, "locked": 0}
+    deadline = time.perf_counter() + duration
+    token_seq = iter(range(10 ** 9))
+
+    async def client(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, USERS)
+            op = rng.choices(("upload", "login", "list"), weights=(4, 2, 4))[0]
+            try:
+                if op == "upload":
+                    await write(upload_job(user_id))
+                elif op == "login":
+                    await write(login_job(user_id, f"{name}-{next(token_seq)}"))
+                else:
+                    async with session_maker() as db:
+                        result = await db.execute(
+                            select(PDF).where(PDF.user_id == user_id)
+                            .order_by(PDF.upload_date.desc(), PDF.id.desc()).limit(50)
+                        )
+                        result.scalars().all()
+                counts[op] += 1
+            except OperationalError as e:
+                counts["errors"] += 1
+                if "locked" in str(e):
+                    counts["locked"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    if queue:
+        await queue.stop()
+    await engine.dispose()
+
+    total = counts["upload"] + counts["login"] + counts["list"]
+    return {
+        "scenario": name,
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        **counts,
+    }
+
+
+async def main(clients: int, duration: float) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        scenarios = [
+            ("before", False, False),  # moteur par défaut, écritures concurrentes
+            ("after", True, True),     # PRAGMA de production + écrivain unique
+        ]
+        for name, profile, use_queue in scenarios:
+            url = setup_database(os.path.join(tmp, f"{name}.db"), profile)
+            results.append(await run_scenario(name, url, profile, use_queue, clients, duration))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de chaque scénario (s)")
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args.clients, args.duration))
+    for r in results:
+        print(f"{r['scenario']:>7}: {r['rps']:>8} req/s  ({r['requests']} requêtes, "
+              f"{r['errors']} erreurs dont {r['locked']} 'database is locked')")
+    if len(results) == 2 and results[0]["rps"]:
+        print(f"gain: x{results[1]['rps'] / results[0]['rps']:.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -3,26 +3,27 @@
 
 import asyncio
 import sys
+from dotenv import load_dotenv
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 # Import chemin absolu (ajustez selon votre structure)
 sys.path.append('.')  # Permet d'importer depuis le répertoire courant
+load_dotenv()  # DATABASE_URL peut être défini dans .env
 
 from app.models.user_model import User  # Importer le modèle User
-from app.database import DATABASE_URL  # URL de votre base de données
+from app.core.config import DATABASE_URL  # URL de votre base de données
+from app.database import create_engine_from_url  # Même fabrique de moteur que l'application
 
 async def make_user_admin(email: str):
     """Rend un utilisateur administrateur en définissant is_superuser = True"""
     
-    print(f"Connexion à la base de données: {DATABASE_URL}")
+    print(f"Connexion à la base de données: {make_url(DATABASE_URL).render_as_string(hide_password=True)}")
     
     # Créer le moteur et la session asynchrone
-    engine = create_async_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
+    engine = create_engine_from_url()
     
     async_session = sessionmaker(
         engine,
@@ -30,27 +31,30 @@ async def make_user_admin(email: str):
         expire_on_commit=False
     )
     
-    async with async_session() as session:
-        # Rechercher l'utilisateur par email
-        query = select(User).where(User.email == email)
-        result = await session.execute(query)
-        user = result.scalar_one_or_none()
+    try:
+        async with async_session() as session:
+            # Rechercher l'utilisateur par email
+            query = select(User).where(User.email == email)
+            result = await session.execute(query)
+            user = result.scalar_one_or_none()
         
-        if not user:
-            print(f"Erreur: Aucun utilisateur trouvé avec l'email '{email}'")
-            return
+            if not user:
+                print(f"Erreur: Aucun utilisateur trouvé avec l'email '{email}'")
+                return
         
-        # Vérifier si l'utilisateur est déjà administrateur
-        if user.is_superuser:
-            print(f"L'utilisateur '{email}' est déjà administrateur")
-            return
+            # Vérifier si l'utilisateur est déjà administrateur
+            if user.is_superuser:
+                print(f"L'utilisateur '{email}' est déjà administrateur")
+                return
         
-        # Mettre à jour l'utilisateur comme administrateur
-        user.is_superuser = True
-        session.add(user)
-        await session.commit()
+            # Mettre à jour l'utilisateur comme administrateur
+            user.is_superuser = True
+            session.add(user)
+            await session.commit()
         
-        print(f"L'utilisateur '{email}' est maintenant administrateur !")
+            print(f"L'utilisateur '{email}' est maintenant administrateur !")
+    finally:
+        await engine.dispose()
 
 if __name__ == "__main__":
     # Vérifier les arguments
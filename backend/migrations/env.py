@@ -1,20 +1,30 @@
 from alembic import context
 from logging.config import fileConfig
-from sqlalchemy import create_engine, pool
+from sqlalchemy import pool
 import os
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# En ligne de commande (alembic upgrade head), DATABASE_URL peut venir du fichier .env
+from dotenv import load_dotenv
+load_dotenv()
+
 from app.base import Base
-from app.models import User, AccessToken  # Import explicite de tous les modèles
+from app.core.config import DATABASE_URL
+from app.database import create_sync_engine_from_url, normalize_database_url
+from app.models import User, AccessToken, PDF, Folder  # Import explicite de tous les modèles
 
 config = context.config
-fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
+# Quand les migrations sont lancées depuis l'application (create_db_and_tables),
+# la connexion est fournie et la configuration de logging de l'application est conservée
+if config.attributes.get("connection") is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
 def run_migrations_offline():
-    url = config.get_main_option("sqlalchemy.url")
+    url = normalize_database_url(DATABASE_URL, sync=True)
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -26,20 +36,25 @@ def run_migrations_offline():
     with context.begin_transaction():
         context.run_migrations()
 
-def run_migrations_online():
-    connectable = create_engine(
-        config.get_main_option("sqlalchemy.url"),
-        poolclass=pool.NullPool,
+def do_run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        render_as_batch=True
     )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
+    connectable = create_sync_engine_from_url(poolclass=pool.NullPool)
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-            render_as_batch=True
-        )
-        with context.begin_transaction():
-            context.run_migrations()
+        do_run_migrations(connection)
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,109 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les bases existantes ont été créées par Base.metadata.create_all :
+    # on ne crée que les tables absentes pour pouvoir les rattacher à la chaîne.
+    # En mode hors ligne (--sql), aucune base à inspecter : on génère tout le schéma.
+    if op.get_context().as_sql:
+        existing_tables = set()
+    else:
+        existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing_tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("email", sa.String(length=255), nullable=False),
+            sa.Column("hashed_password", sa.String(length=1024), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("is_superuser", sa.Boolean(), nullable=False),
+            sa.Column("is_verified", sa.Boolean(), nullable=False),
+            sa.Column("full_name", sa.String(length=255), nullable=True),
+            sa.Column("profile_picture", sa.String(length=1024), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("last_login", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("oidc_sub", sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("oidc_sub"),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "access_tokens" not in existing_tables:
+        op.create_table(
+            "access_tokens",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("token", sa.String(length=1024), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("ip_address", sa.String(length=45), nullable=True),
+            sa.Column("user_agent", sa.String(length=255), nullable=True),
+            sa.Column("is_valid", sa.Boolean(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_access_tokens_token", "access_tokens", ["token"], unique=True)
+
+    if "folders" not in existing_tables:
+        op.create_table(
+            "folders",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("parent_id", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["parent_id"], ["folders.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "pdfs" not in existing_tables:
+        op.create_table(
+            "pdfs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("filename", sa.String(length=255), nullable=False),
+            sa.Column("original_filename", sa.String(length=255), nullable=False),
+            sa.Column("filepath", sa.String(length=1024), nullable=False),
+            sa.Column("file_size", sa.Integer(), nullable=False),
+            sa.Column("upload_date", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("folder_id", sa.Integer(), nullable=True),
+            sa.Column("is_processed", sa.Boolean(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=True),
+            sa.Column("description", sa.String(length=1024), nullable=True),
+            sa.Column("page_count", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["folder_id"], ["folders.id"], ondelete="SET NULL"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("pdfs")
+    op.drop_table("folders")
+    op.drop_index("ix_access_tokens_token", table_name="access_tokens")
+    op.drop_table("access_tokens")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,42 @@
+"""indexes for hot foreign keys and listing queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nom, table, colonnes) — doit rester aligné sur les __table_args__ des modèles
+INDEXES = [
+    ("ix_pdfs_user_id_upload_date", "pdfs", ["user_id", "upload_date"]),
+    ("ix_pdfs_folder_id", "pdfs", ["folder_id"]),
+    ("ix_folders_user_id_parent_id_created_at", "folders", ["user_id", "parent_id", "created_at"]),
+    ("ix_folders_parent_id", "folders", ["parent_id"]),
+    ("ix_access_tokens_user_id_is_valid", "access_tokens", ["user_id", "is_valid"]),
+    ("ix_access_tokens_expires_at", "access_tokens", ["expires_at"]),
+    ("ix_access_tokens_created_at", "access_tokens", ["created_at"]),
+    ("ix_users_created_at", "users", ["created_at"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
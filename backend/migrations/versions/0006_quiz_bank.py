@@ -0,0 +1,86 @@
+"""quizzes, questions and quiz attempts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("pdf_id", sa.Integer(), nullable=True),
+        sa.Column("folder_id", sa.Integer(), nullable=True),
+        sa.Column("question_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["pdf_id"], ["pdfs.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["folder_id"], ["folders.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quizzes_user_id_created_at", "quizzes", ["user_id", "created_at"])
+    op.create_index("ix_quizzes_pdf_id", "quizzes", ["pdf_id"])
+    op.create_index("ix_quizzes_folder_id", "quizzes", ["folder_id"])
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.SmallInteger(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("options", sa.Text(), nullable=False),
+        sa.Column("option_count", sa.SmallInteger(), nullable=False),
+        sa.Column("answer_mask", sa.Integer(), nullable=False),
+        sa.Column("explanation", sa.Text(), nullable=True),
+        sa.Column("source_page", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_questions_quiz_id_position", "questions", ["quiz_id", "position"], unique=True)
+
+    op.create_table(
+        "quiz_attempts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("answers", sa.LargeBinary(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("max_score", sa.Float(), nullable=True),
+        sa.Column("correct_count", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("graded_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quiz_attempts_quiz_id_created_at", "quiz_attempts", ["quiz_id", "created_at"])
+    op.create_index("ix_quiz_attempts_user_id_created_at", "quiz_attempts", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_quiz_attempts_user_id_created_at", table_name="quiz_attempts")
+    op.drop_index("ix_quiz_attempts_quiz_id_created_at", table_name="quiz_attempts")
+    op.drop_table("quiz_attempts")
+    op.drop_index("ix_questions_quiz_id_position", table_name="questions")
+    op.drop_table("questions")
+    op.drop_index("ix_quizzes_folder_id", table_name="quizzes")
+    op.drop_index("ix_quizzes_pdf_id", table_name="quizzes")
+    op.drop_index("ix_quizzes_user_id_created_at", table_name="quizzes")
+    op.drop_table("quizzes")
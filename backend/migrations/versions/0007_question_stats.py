@@ -0,0 +1,49 @@
+"""incremental item statistics per question
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "question_stats",
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("correct_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("score_sq_sum", sa.Float(), nullable=False),
+        sa.Column("correct_score_sum", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("question_id"),
+    )
+    op.create_index("ix_question_stats_quiz_id", "question_stats", ["quiz_id"])
+    # Lignes vides pour les questions existantes ; les tentatives déjà corrigées sont prises en
+    # compte par la reconstruction (python -m app.quiz.item_stats --rebuild)
+    op.execute(
+        "INSERT INTO question_stats "
+        "(question_id, quiz_id, attempt_count, correct_count, score_sum, score_sq_sum, correct_score_sum) "
+        "SELECT id, quiz_id, 0, 0, 0, 0, 0 FROM questions"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_question_stats_quiz_id", table_name="question_stats")
+    op.drop_table("question_stats")
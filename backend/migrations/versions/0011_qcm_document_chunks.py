@@ -0,0 +1,36 @@
+"""cache of structure-aware chunks per document hash
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "qcm_document_chunks",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("structure", sa.String(length=20), nullable=False),
+        sa.Column("chunks", sa.Text(), nullable=False),
+        sa.Column("normalization", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("qcm_document_chunks")
@@ -0,0 +1,85 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# Base de données et dossier d'upload isolés : à définir avant tout import de l'application
+_TEST_DIR = tempfile.mkdtemp(prefix="qcm-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(_TEST_DIR, 'test.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_TEST_DIR, "uploads"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_TEST_DIR, "profiles"))
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.auth.jwt_utils import create_access_token
+from app.database import async_session_maker, create_db_and_tables
+from app.models import AccessToken, User
+from app.monitoring import capture_queries
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def app():
+    from app.main import app as fastapi_app
+
+    await create_db_and_tables()
+    return fastapi_app
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
+
+
+@pytest.fixture
+def make_user(app):
+    """Crée un utilisateur et une session valide ; renvoie (user, en-têtes Authorization)"""
+    async def factory(is_superuser: bool = False):
+        async with async_session_maker() as session:
+            user = User(
+                email=f"{uuid.uuid4().hex}@example.com",
+                hashed_password=None,
+                is_active=True,
+                is_verified=True,
+                is_superuser=is_superuser
+            )
+            session.add(user)
+            await session.flush()
+            token = create_access_token({"sub": str(user.id), "jti": uuid.uuid4().hex})
+            session.add(AccessToken(
+                token=token,
+                user_id=user.id,
+                expires_at=datetime.utcnow() + timedelta(hours=1),
+                is_valid=True
+            ))
+            await session.commit()
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return factory
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Vérifie un budget de requêtes SQL :
+        with assert_max_queries(3):
+            await client.get("/pdf/list", headers=headers)
+    """
+    @contextmanager
+    def check(max_queries: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} requêtes SQL exécutées, maximum attendu {max_queries}"
+        )
+
+    return check
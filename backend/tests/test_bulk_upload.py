@@ -0,0 +1,100 @@
+# tests/test_bulk_upload.py
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_maker
+from app.models import PDF
+from app.pdf.pdf_processing import CLAIM_TIMEOUT, claim_pending
+from benchmarks.api_seed import make_sample_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+def _zip(members) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+async def test_bulk_upload_files_and_zip(client, make_user):
+    user, headers = await make_user()
+    folder_id = (await client.post("/folders/create", json={"name": "Cours"}, headers=headers)).json()["folder_id"]
+    archive = _zip({
+        "chapitre-1/cours.pdf": make_sample_pdf("Chapitre 1"),
+        "chapitre-2/cours.pdf": make_sample_pdf("Chapitre 2"),
+        "notes.txt": b"brouillon",
+        "__MACOSX/._cours.pdf": b"",
+    })
+    files = [
+        ("files", ("intro.pdf", make_sample_pdf("Introduction"), "application/pdf")),
+        ("files", ("pack.zip", archive, "application/zip")),
+        ("files", ("image.png", b"\x89PNG", "image/png")),
+    ]
+
+    etag = (await client.get("/pdf/list", headers=headers)).headers["etag"]
+    response = await client.post("/pdf/upload/bulk", files=files, data={"folder_id": str(folder_id)}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["rejected"]) == (3, 2)
+    by_name = {r["filename"]: r for r in body["results"]}
+    assert by_name["pack.zip/chapitre-2/cours.pdf"]["status"] == "created"
+    assert by_name["pack.zip/notes.txt"]["status"] == "rejected"
+    assert by_name["image.png"]["status"] == "rejected"
+
+    async with async_session_maker() as session:
+        rows = (await session.execute(
+            select(PDF.original_filename, PDF.folder_id).where(PDF.user_id == user.id)
+        )).all()
+    assert sorted(rows) == [("cours.pdf", folder_id), ("cours.pdf", folder_id), ("intro.pdf", folder_id)]
+
+    # Une seule transaction, une seule nouvelle version de la liste
+    assert (await client.get("/pdf/list", headers={**headers, "If-None-Match": etag})).status_code == 200
+
+    file_id = by_name["intro.pdf"]["file_id"]
+    assert (await client.get(f"/pdf/{file_id}/file", headers=headers)).content == make_sample_pdf("Introduction")
+
+
+async def test_bulk_upload_limits(client, make_user, monkeypatch):
+    from app.pdf import bulk_routes
+
+    monkeypatch.setattr(bulk_routes, "BULK_UPLOAD_MAX_FILES", 1)
+    user, headers = await make_user()
+    files = [
+        ("files", ("a.pdf", make_sample_pdf("A"), "application/pdf")),
+        ("files", ("b.pdf", make_sample_pdf("B"), "application/pdf")),
+        ("files", ("broken.zip", b"PK\x03\x04 pas une archive", "application/zip")),
+    ]
+    body = (await client.post("/pdf/upload/bulk", files=files, headers=headers)).json()
+    assert [r["status"] for r in body["results"]] == ["created", "rejected", "rejected"]
+
+    other, other_headers = await make_user()
+    folder_id = (await client.post("/folders/create", json={"name": "Privé"}, headers=headers)).json()["folder_id"]
+    response = await client.post("/pdf/upload/bulk", files=files[:1], data={"folder_id": str(folder_id)},
+                                 headers=other_headers)
+    assert response.status_code == 404
+
+
+async def test_pending_pdfs_claimed_by_one_worker(make_user):
+    user, _ = await make_user()
+    async with async_session_maker() as session:
+        pdf = PDF(filename="a.pdf", original_filename="a.pdf", filepath="/dev/null", file_size=1, user_id=user.id)
+        session.add(pdf)
+        await session.commit()
+
+    # Deux workers démarrent : le PDF n'est remis en file que par le premier
+    first, second = await claim_pending(), await claim_pending()
+    assert pdf.id in first and pdf.id not in second
+
+    # Réclamation expirée (worker arrêté pendant le traitement) : reprise possible
+    async with async_session_maker() as session:
+        await session.execute(update(PDF).where(PDF.id == pdf.id).values(
+            processing_started_at=datetime.utcnow() - CLAIM_TIMEOUT - timedelta(minutes=1)
+        ))
+        await session.commit()
+    assert pdf.id in await claim_pending()
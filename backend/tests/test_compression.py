@@ -0,0 +1,129 @@
+# tests/test_compression.py
+import gzip
+import zlib
+
+import anyio
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware, negotiate_encoding
+
+pytestmark = pytest.mark.anyio
+
+BIG = {"questions": [{"id": i, "text": "Quelle est la fonction de la mitochondrie ?"} for i in range(200)]}
+
+
+async def stream(request):
+    async def lines():
+        for i in range(3):
+            yield f'{{"progress": {i}}}\n'.encode()
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def build_app(**options):
+    routes = [
+        Route("/big", lambda request: JSONResponse(BIG)),
+        Route("/small", lambda request: JSONResponse({"ok": True})),
+        Route("/pdf", lambda request: Response(b"%PDF" * 1000, media_type="application/pdf")),
+        Route("/etag", lambda request: PlainTextResponse("x" * 4096, headers={"ETag": '"abc"'})),
+        Route("/stream", stream),
+    ]
+    app = Starlette(routes=routes)
+    app.add_middleware(CompressionMiddleware, minimum_size=500, **options)
+    return app
+
+
+@pytest.fixture
+async def raw_client():
+    # Client sans décompression automatique : on inspecte les octets transmis
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app()), base_url="http://test") as client:
+        yield client
+
+
+async def get_raw(client, path, encoding="gzip"):
+    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        chunks = [chunk async for chunk in response.aiter_raw()]
+    return response, chunks
+
+
+def test_negotiation():
+    assert negotiate_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert negotiate_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+
+
+async def test_large_json_is_gzipped(raw_client):
+    response, chunks = await get_raw(raw_client, "/big")
+    body = b"".join(chunks)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert b'"id":199' in gzip.decompress(body)
+
+
+async def test_small_and_non_allowlisted_responses_pass_through(raw_client):
+    response, _ = await get_raw(raw_client, "/small")
+    assert "content-encoding" not in response.headers
+    response, _ = await get_raw(raw_client, "/pdf")
+    assert "content-encoding" not in response.headers
+    response, _ = await get_raw(raw_client, "/big", encoding="identity")
+    assert "content-encoding" not in response.headers
+
+
+async def test_vary_on_every_compressible_response(raw_client):
+    # Variante identité (client sans gzip, corps sous le seuil) : un cache partagé doit aussi varier
+    for path, encoding in (("/big", "identity"), ("/small", "gzip"), ("/stream", "identity")):
+        response, _ = await get_raw(raw_client, path, encoding)
+        assert response.headers["vary"] == "Accept-Encoding"
+    response, _ = await get_raw(raw_client, "/pdf")
+    assert "vary" not in response.headers
+
+
+async def test_strong_etag_becomes_weak(raw_client):
+    response, _ = await get_raw(raw_client, "/etag")
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+async def test_stream_chunks_are_flushed_individually():
+    # Appel ASGI direct : le transport de httpx regroupe le corps, on observe ici chaque message
+    messages = []
+    disconnected = anyio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")], "scheme": "http", "server": ("test", 80),
+        "root_path": "", "http_version": "1.1",
+    }
+    await build_app()(scope, receive, send)
+    disconnected.set()
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    # Chaque morceau envoyé se décompresse immédiatement en une ligne complète
+    decompressor = zlib.decompressobj(31)
+    lines = [decompressor.decompress(message["body"]) for message in bodies]
+    assert [line for line in lines if line] == [b'{"progress": 0}\n', b'{"progress": 1}\n', b'{"progress": 2}\n']
+    assert bodies[-1]["more_body"] is False
+
+
+async def test_app_list_is_compressed(client, make_user):
+    user, headers = await make_user()
+    for i in range(30):
+        await client.post("/folders/create", json={"name": f"Dossier {i}"}, headers=headers)
+    response = await client.get("/folders/list", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["count"] == 30
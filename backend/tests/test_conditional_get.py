@@ -0,0 +1,57 @@
+# tests/test_conditional_get.py
+import pytest
+
+from benchmarks.api_seed import make_sample_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pdf_list_304_until_upload(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+
+    first = await client.get("/pdf/list", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    # Authentification uniquement : la requête de liste n'est pas exécutée
+    with assert_max_queries(2):
+        response = await client.get("/pdf/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # Autre représentation (paramètres différents) : autre ETag
+    other = await client.get("/pdf/list", params={"limit": 10}, headers=headers)
+    assert other.headers["etag"] != etag
+
+    files = {"file": ("cours.pdf", make_sample_pdf(), "application/pdf")}
+    assert (await client.post("/pdf/upload", files=files, headers=headers)).status_code == 200
+
+    response = await client.get("/pdf/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+    assert response.headers["etag"] != etag
+
+
+async def test_folder_list_changes_on_create_and_rename(client, make_user):
+    user, headers = await make_user()
+
+    etag = (await client.get("/folders/list", headers=headers)).headers["etag"]
+    created = await client.post("/folders/create", json={"name": "Chimie"}, headers=headers)
+    folder_id = created.json()["folder_id"]
+
+    response = await client.get("/folders/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert (await client.get("/folders/list", headers={**headers, "If-None-Match": etag})).status_code == 304
+
+    await client.patch(f"/folders/{folder_id}", json={"name": "Chimie organique"}, headers=headers)
+    response = await client.get("/folders/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["folders"][0]["name"] == "Chimie organique"
+
+
+async def test_me_is_conditional(client, make_user):
+    user, headers = await make_user()
+    etag = (await client.get("/custom/me", headers=headers)).headers["etag"]
+    response = await client.get("/custom/me", headers={**headers, "If-None-Match": f'W/{etag}'})
+    assert response.status_code == 304
@@ -0,0 +1,68 @@
+# tests/test_grading.py
+import random
+
+import pytest
+
+from app.quiz import grading
+from app.quiz.encoding import pack_answers
+from app.quiz.grading import AnswerKey, GradingRules, grade_batch
+
+pytestmark = pytest.mark.anyio
+
+# Clé : Q0 = B, Q1 = A+C (plusieurs réponses), Q2 = D
+KEY = [0b0010, 0b0101, 0b1000]
+
+
+@pytest.mark.parametrize("rules, expected", [
+    (GradingRules(), [3.0, 1.0, 0.0]),
+    (GradingRules(negative_marking=0.25), [3.0, 0.5, -0.5]),
+    (GradingRules(partial_credit=True), [3.0, 1.5, 0.0]),
+])
+def test_grade_batch_rules(rules, expected):
+    answers = [
+        pack_answers([0b0010, 0b0101, 0b1000]),  # tout juste
+        pack_answers([0b0010, 0b0001, 0b0001]),  # Q1 à moitié, Q2 fausse
+        pack_answers([0b0001, 0b0000, 0b0100]),  # Q0 fausse, Q1 sans réponse, Q2 fausse
+    ]
+    grades = grade_batch(AnswerKey(KEY, rules), answers)
+    assert grades.scores == expected
+    assert grades.correct_counts == [3, 1, 0]
+    assert grades.max_score == 3.0
+
+
+def test_numpy_and_python_agree():
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    key_masks = [rng.choice([1, 2, 4, 8, 5, 10, 7]) for _ in range(40)]
+    answers = [pack_answers([rng.randrange(16) for _ in key_masks]) for _ in range(200)]
+    rules = GradingRules(negative_marking=0.5, partial_credit=True)
+
+    reference = grading._grade_python(AnswerKey(key_masks, rules), answers)
+    graded = grade_batch(AnswerKey(key_masks, rules), answers)
+    assert graded.scores == pytest.approx(reference.scores)
+    assert graded.correct_counts == reference.correct_counts
+
+
+async def test_batch_submission(client, make_user):
+    user, headers = await make_user()
+    questions = [
+        {"text": "Q0", "options": ["A", "B", "C", "D"], "correct": [1]},
+        {"text": "Q1", "options": ["A", "B", "C", "D"], "correct": [0, 2]},
+    ]
+    quiz_id = (await client.post("/quizzes", json={"title": "Quiz", "questions": questions},
+                                 headers=headers)).json()["quiz_id"]
+
+    batch = {"attempts": [{"answers": [[1], [0, 2]]}, {"answers": [[0], []]}], "negative_marking": 0.5}
+    response = await client.post(f"/quizzes/{quiz_id}/attempts/batch", json=batch, headers=headers)
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [r["score"] for r in results] == [2.0, -0.5]
+    assert results[0]["attempt_id"] < results[1]["attempt_id"]
+
+    single = await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[1], [0]]}, headers=headers)
+    assert single.json()["results"][0]["correct_count"] == 1
+
+    wrong_length = await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[1]]}, headers=headers)
+    assert wrong_length.status_code == 400
+    bad_option = await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[7], []]}, headers=headers)
+    assert bad_option.status_code == 400
@@ -0,0 +1,90 @@
+# tests/test_item_stats.py
+import math
+import random
+
+import pytest
+
+from app.database import async_session_maker
+from app.quiz.grading import AnswerKey, grade_batch
+from app.quiz.encoding import pack_answers
+from app.quiz.item_stats import StatsAccumulator, discrimination, rebuild_quiz_stats
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = [
+    {"text": "Q0", "options": ["A", "B", "C", "D"], "correct": [1]},
+    {"text": "Q1", "options": ["A", "B", "C", "D"], "correct": [0, 2]},
+    {"text": "Q2", "options": ["A", "B", "C", "D"], "correct": [3]},
+]
+
+
+def _pearson(xs, ys):
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    return cov / math.sqrt(sum((x - mx) ** 2 for x in xs) * sum((y - my) ** 2 for y in ys))
+
+
+def test_point_biserial_matches_pearson():
+    rng = random.Random(3)
+    key = AnswerKey([0b0010, 0b0101, 0b1000])
+    answers = [pack_answers([rng.randrange(16) for _ in range(3)]) for _ in range(300)]
+    grades = grade_batch(key, answers)
+
+    accumulator = StatsAccumulator([10, 11, 12])
+    accumulator.add(grades)
+    for index, row in enumerate(accumulator.rows()):
+        xs = [float(bool(correct[index])) for correct in grades.correct]
+        r = discrimination(row["attempt_count"], row["correct_count"], row["score_sum"],
+                           row["score_sq_sum"], row["correct_score_sum"])
+        assert r == pytest.approx(_pearson(xs, grades.scores))
+
+
+def test_discrimination_undefined_for_constant_item():
+    # Tout le monde répond juste : variance nulle, corrélation indéfinie
+    assert discrimination(4, 4, 6.0, 10.0, 6.0) is None
+    assert discrimination(0, 0, 0.0, 0.0, 0.0) is None
+
+
+async def test_incremental_stats_match_rebuild(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+    quiz_id = (await client.post("/quizzes", json={"title": "Quiz", "questions": QUESTIONS},
+                                 headers=headers)).json()["quiz_id"]
+
+    response = await client.get(f"/quizzes/{quiz_id}/stats", headers=headers)
+    assert response.status_code == 200
+    assert [q["attempt_count"] for q in response.json()["questions"]] == [0, 0, 0]
+
+    await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[1], [0, 2], [3]]}, headers=headers)
+    batch = {"attempts": [
+        {"answers": [[1], [0], [3]]},
+        {"answers": [[0], [0, 2], []]},
+        {"answers": [[2], [], [0]]},
+    ]}
+    await client.post(f"/quizzes/{quiz_id}/attempts/batch", json=batch, headers=headers)
+
+    # Authentification (token + utilisateur) puis une seule requête sur les agrégats
+    with assert_max_queries(3):
+        response = await client.get(f"/quizzes/{quiz_id}/stats", headers=headers)
+    body = response.json()
+    assert body["attempt_count"] == 4
+    incremental = body["questions"]
+    assert [q["correct_count"] for q in incremental] == [2, 2, 2]
+    assert [q["difficulty"] for q in incremental] == [0.5, 0.5, 0.5]
+
+    async with async_session_maker() as session:
+        assert await rebuild_quiz_stats(session, quiz_id) == 4
+        await session.commit()
+    rebuilt = (await client.get(f"/quizzes/{quiz_id}/stats", headers=headers)).json()["questions"]
+    for before, after in zip(incremental, rebuilt):
+        assert after["correct_count"] == before["correct_count"]
+        assert after["discrimination"] == pytest.approx(before["discrimination"])
+
+
+async def test_stats_of_other_user_quiz(client, make_user):
+    _, owner_headers = await make_user()
+    _, other_headers = await make_user()
+    quiz_id = (await client.post("/quizzes", json={"title": "Quiz", "questions": QUESTIONS},
+                                 headers=owner_headers)).json()["quiz_id"]
+    response = await client.get(f"/quizzes/{quiz_id}/stats", headers=other_headers)
+    assert response.status_code == 404
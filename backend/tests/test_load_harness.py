@@ -0,0 +1,29 @@
+# tests/test_load_harness.py
+import os
+
+import pytest
+
+from app.core.config import DATABASE_URL
+from benchmarks.api_load import SCENARIOS, percentile, run_all
+from benchmarks.api_seed import seed
+
+pytestmark = pytest.mark.anyio
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+async def test_scenarios_run_against_seeded_app(client):
+    fixture = seed(DATABASE_URL, os.environ["UPLOAD_DIR"], users=3, folders=5, pdfs=4, login_users=0)
+    names = [name for name in SCENARIOS if name != "login_burst"]
+
+    results = await run_all(client, fixture, names, concurrency=2, duration=10, warmup=0, max_requests=6)
+
+    for name in names:
+        assert results[name]["requests"] == 6, name
+        assert results[name]["errors"] == 0, results[name]["statuses"]
+        assert results[name]["latency_ms"]["p50"] > 0
@@ -0,0 +1,60 @@
+# tests/test_logging.py
+import io
+import json
+import logging
+
+import pytest
+
+from app.core.logging_config import SamplingFilter, request_id_var, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    setup_logging(level="DEBUG", log_format="json", levels="tests.noisy=WARNING", stream=stream)
+    yield stream
+    # Retour à la configuration de l'application
+    setup_logging()
+
+
+def records(stream):
+    shutdown_logging()  # vide la file
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_record_carries_request_id_and_extra(log_stream):
+    token = request_id_var.set("req-123")
+    try:
+        logging.getLogger("tests.logging").info("PDF %s importé", 42, extra={"user_id": 7})
+    finally:
+        request_id_var.reset(token)
+
+    [record] = [r for r in records(log_stream) if r["logger"] == "tests.logging"]
+    assert record["msg"] == "PDF 42 importé"
+    assert record["request_id"] == "req-123"
+    assert record["user_id"] == 7
+    assert record["level"] == "INFO"
+
+
+def test_per_module_levels(log_stream):
+    logging.getLogger("tests.noisy").info("ignoré")
+    logging.getLogger("tests.noisy").warning("gardé")
+    messages = [r["msg"] for r in records(log_stream) if r["logger"] == "tests.noisy"]
+    assert messages == ["gardé"]
+
+
+def test_sampling_only_applies_to_debug():
+    sampler = SamplingFilter(rate=0.0)
+    debug = logging.LogRecord("x", logging.DEBUG, __file__, 1, "debug", None, None)
+    warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "warning", None, None)
+    assert not sampler.filter(debug)
+    assert sampler.filter(warning)
+
+
+@pytest.mark.anyio
+async def test_request_id_header_round_trip(client):
+    response = await client.get("/", headers={"X-Request-ID": "abc"})
+    assert response.headers["x-request-id"] == "abc"
+
+    response = await client.get("/")
+    assert len(response.headers["x-request-id"]) == 32
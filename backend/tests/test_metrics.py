@@ -0,0 +1,19 @@
+# tests/test_metrics.py
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_exposes_route_templates(client, make_user):
+    user, headers = await make_user()
+    await client.get("/pdf/list", headers=headers)
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+
+    # Étiquette = gabarit de route (cardinalité bornée), pas le chemin brut
+    assert 'http_requests_total{method="GET",route="/pdf/list",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/pdf/list"}' in body
+    assert 'db_queries_per_request_count{route="GET /pdf/list"}' in body
+    assert "http_requests_in_progress" in body
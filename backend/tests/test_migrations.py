@@ -0,0 +1,17 @@
+# tests/test_migrations.py
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+import app.models  # noqa: F401  (enregistre tous les modèles dans Base.metadata)
+from app.base import Base
+from app.database import run_migrations
+
+
+def test_migrations_match_models():
+    """La chaîne de migrations produit exactement le schéma déclaré par les modèles"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        run_migrations(connection)
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    assert diff == []
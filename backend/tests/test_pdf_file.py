@@ -0,0 +1,89 @@
+# tests/test_pdf_file.py
+import hashlib
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_maker
+from app.models import PDF
+from app.responses import ZEROCOPY_EXTENSION, SendfileResponse
+from benchmarks.api_seed import make_sample_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+async def _upload(client, headers, content):
+    files = {"file": ("cours.pdf", content, "application/pdf")}
+    response = await client.post("/pdf/upload", files=files, headers=headers)
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+async def test_file_full_range_and_304(client, make_user):
+    user, headers = await make_user()
+    content = make_sample_pdf()
+    pdf_id = await _upload(client, headers, content)
+
+    response = await client.get(f"/pdf/{pdf_id}/file", headers=headers)
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+
+    partial = await client.get(f"/pdf/{pdf_id}/file", headers={**headers, "Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == content[:10]
+    assert partial.headers["content-range"] == f"bytes 0-9/{len(content)}"
+
+    cached = await client.get(f"/pdf/{pdf_id}/file", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+async def test_file_of_other_user_is_404(client, make_user):
+    owner, owner_headers = await make_user()
+    other, other_headers = await make_user()
+    pdf_id = await _upload(client, owner_headers, make_sample_pdf())
+
+    response = await client.get(f"/pdf/{pdf_id}/file", headers=other_headers)
+    assert response.status_code == 404
+
+
+async def test_missing_hash_is_computed_and_stored(client, make_user):
+    user, headers = await make_user()
+    content = make_sample_pdf("Ancien document sans empreinte")
+    pdf_id = await _upload(client, headers, content)
+    async with async_session_maker() as session:
+        await session.execute(update(PDF).where(PDF.id == pdf_id).values(content_hash=None))
+        await session.commit()
+
+    response = await client.get(f"/pdf/{pdf_id}/file", headers=headers)
+    digest = hashlib.sha256(content).hexdigest()
+    assert response.headers["etag"] == f'"{digest}"'
+    async with async_session_maker() as session:
+        assert await session.scalar(select(PDF.content_hash).where(PDF.id == pdf_id)) == digest
+
+
+async def test_zerocopy_extension_is_used(tmp_path):
+    path = tmp_path / "cours.pdf"
+    path.write_bytes(b"0123456789" * 100)
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == ZEROCOPY_EXTENSION:
+            # Ce que ferait le serveur avec os.sendfile
+            message["file"].seek(message["offset"])
+            message = {**message, "body": message["file"].read(message["count"])}
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"range", b"bytes=10-19")],
+             "extensions": {ZEROCOPY_EXTENSION: {}}}
+    await SendfileResponse(str(path), media_type="application/pdf")(scope, receive, send)
+
+    assert messages[0]["status"] == 206
+    assert messages[1]["type"] == ZEROCOPY_EXTENSION
+    assert messages[1]["body"] == b"0123456789"
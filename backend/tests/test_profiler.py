@@ -0,0 +1,59 @@
+# tests/test_profiler.py
+import json
+
+import pytest
+
+from app.monitoring.profiler import profiler
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def reset_profiler():
+    yield
+    profiler.configure(False)
+    profiler.clear_profiles()
+
+
+async def test_profiler_requires_admin(client, make_user):
+    user, headers = await make_user()
+    response = await client.post("/admin/profiler", params={"enabled": True}, headers=headers)
+    assert response.status_code == 403
+
+
+async def test_route_profiling_ring_and_download(client, make_user, reset_profiler):
+    admin, admin_headers = await make_user(is_superuser=True)
+    user, headers = await make_user()
+
+    response = await client.post("/admin/profiler", headers=admin_headers, params={
+        "enabled": True, "route": "/pdf/list", "interval_ms": 1, "format": "speedscope"
+    })
+    assert response.status_code == 200
+
+    profiler.max_files = 2
+    try:
+        for _ in range(3):
+            await client.get("/pdf/list", headers=headers)
+        await client.get("/folders/list", headers=headers)
+    finally:
+        profiler.max_files = 100
+
+    profiles = (await client.get("/admin/profiler", headers=admin_headers)).json()["profiler"]["profiles"]
+    # Anneau borné, et seule la route ciblée est profilée
+    assert 1 <= len(profiles) <= 2
+    assert all("pdf_list" in name for name in profiles)
+
+    response = await client.get(f"/admin/profiler/profiles/{profiles[0]}", headers=admin_headers)
+    assert response.status_code == 200
+    document = json.loads(response.content)
+    assert document["profiles"][0]["type"] == "sampled"
+    assert document["shared"]["frames"]
+
+    response = await client.get("/admin/profiler/profiles/..%2Fsecret", headers=admin_headers)
+    assert response.status_code == 404
+
+
+async def test_disabled_profiler_records_nothing(client, make_user, reset_profiler):
+    user, headers = await make_user()
+    await client.get("/pdf/list", headers=headers)
+    assert profiler.list_profiles() == []
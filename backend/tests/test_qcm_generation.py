@@ -0,0 +1,127 @@
+# tests/test_qcm_generation.py
+import uuid
+
+import orjson
+import pytest
+
+from app.database import async_session_maker
+from app.models import PDF
+from app.qcm.chunking import chunk_pages
+from app.qcm.extraction import ExtractedDocument
+from app.qcm.llm import StubGenerator, parse_questions
+from app.qcm.planner import Document, capped_apportion, plan_generation
+
+pytestmark = pytest.mark.anyio
+
+PARAGRAPH = (
+    "La photosynthèse transforme l'énergie lumineuse en énergie chimique. "
+    "Les chloroplastes contiennent la chlorophylle qui absorbe la lumière. "
+    "Le dioxyde de carbone est fixé pendant le cycle de Calvin."
+)
+
+
+def make_pages(count: int):
+    return [f"{PARAGRAPH}\n\n{PARAGRAPH} Page {page}." for page in range(1, count + 1)]
+
+
+def test_chunks_keep_page_spans():
+    chunks = chunk_pages(make_pages(6), max_tokens=120)
+    assert len(chunks) > 1
+    assert chunks[0].page_start == 1 and chunks[-1].page_end == 6
+    assert all(chunk.tokens <= 120 for chunk in chunks)
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+
+
+def test_capped_apportion():
+    assert capped_apportion(10, [1, 1, 8], cap=4) == [3, 3, 4]
+    assert capped_apportion(50, [1, 1], cap=4) == [4, 4]
+
+
+def test_plan_respects_budget():
+    documents = [Document(i, None, f"doc{i}", chunk_pages(make_pages(8), max_tokens=120)) for i in range(3)]
+    keys = {i: [f"{i}-{chunk.index}" for chunk in document.chunks] for i, document in enumerate(documents)}
+
+    unlimited = plan_generation(documents, 30, 10 ** 9, 10, keys, {})
+    assert unlimited.planned_questions == 30 and unlimited.skipped_calls == 0
+
+    budget = unlimited.estimated_tokens // 3
+    plan = plan_generation(documents, 30, budget, 10, keys, {})
+    assert plan.estimated_tokens <= budget
+    assert plan.skipped_calls > 0
+    # Les appels retenus sont répartis entre tous les documents
+    assert {call.document for call in plan.calls} == {0, 1, 2}
+
+    # Un morceau en cache ne coûte rien
+    cached = plan_generation(documents, 30, 0, 10, keys, {key: 10 for key_list in keys.values() for key in key_list})
+    assert cached.planned_questions == 30 and cached.estimated_tokens == 0
+
+
+async def test_stub_generator_is_deterministic():
+    generator = StubGenerator()
+    first = await generator.generate(PARAGRAPH, 2)
+    second = await generator.generate(PARAGRAPH, 2)
+    assert len(first.questions) == 2
+    assert first.questions == second.questions
+    assert all(len(question.options) == 4 for question in first.questions)
+
+
+async def test_folder_generation_streams_and_caches(client, make_user, monkeypatch):
+    # pypdf n'est pas sollicité : le texte des pages est fourni par le test
+    texts = {}
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(texts[path]))
+
+    user, headers = await make_user()
+    root_id = (await client.post("/folders/create", json={"name": "Biologie"}, headers=headers)).json()["folder_id"]
+    child_id = (await client.post(
+        "/folders/create", json={"name": "Chapitre 1", "parent_id": root_id}, headers=headers
+    )).json()["folder_id"]
+    async with async_session_maker() as session:
+        for folder_id, pages in ((root_id, 4), (child_id, 8)):
+            path = f"/nonexistent/{uuid.uuid4().hex}.pdf"
+            texts[path] = make_pages(pages)
+            session.add(PDF(filename=path, original_filename=f"cours-{pages}.pdf", filepath=path,
+                            file_size=1, user_id=user.id, folder_id=folder_id))
+        await session.commit()
+
+    async def generate():
+        response = await client.post(f"/qcm/folders/{root_id}/generate",
+                                     json={"question_count": 12, "title": "Révision"}, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [orjson.loads(line) for line in response.text.splitlines()]
+
+    events = await generate()
+    planned = next(event for event in events if event["event"] == "planned")
+    done = events[-1]
+    assert planned["documents"] == 2 and planned["cached_calls"] == 0
+    assert done["event"] == "done" and done["failed_chunks"] == 0
+    assert len(done["quiz_ids"]) == 2
+    assert done["questions"] == planned["planned_questions"] == 12
+
+    quiz = (await client.get(f"/quizzes/{done['quiz_ids'][0]}", headers=headers)).json()
+    assert quiz["title"].startswith("Révision - cours-")
+    assert all(question["source_page"] for question in quiz["questions"])
+
+    # Deuxième génération : tous les morceaux viennent du cache
+    events = await generate()
+    planned = next(event for event in events if event["event"] == "planned")
+    assert planned["cached_calls"] == planned["calls"]
+    assert events[-1]["tokens"] == 0
+
+
+async def test_generation_not_found(client, make_user):
+    user, headers = await make_user()
+    response = await client.post("/qcm/folders/999999/generate", json={}, headers=headers)
+    assert response.status_code == 404
+    folder_id = (await client.post("/folders/create", json={"name": "Vide"}, headers=headers)).json()["folder_id"]
+    response = await client.post(f"/qcm/folders/{folder_id}/generate", json={}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Aucun PDF dans ce dossier"
+
+
+def test_generated_options_with_separator_dropped():
+    items = [
+        {"text": "Q1", "options": ["A\x1fB", "C"], "correct": [0]},
+        {"text": "Q2", "options": ["A", "B"], "correct": [1]},
+    ]
+    assert [question.text for question in parse_questions(items)] == ["Q2"]
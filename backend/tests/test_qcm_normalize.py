@@ -0,0 +1,56 @@
+# tests/test_qcm_normalize.py
+from app.qcm.normalize import normalize_pages
+
+SENTENCES = [
+    "La membrane plasmique délimite la cellule et contrôle les échanges.",
+    "Le noyau contient l'information génétique sous forme d'ADN.",
+    "Les mitochondries produisent l'énergie nécessaire à la cellule.",
+    "Le réticulum endoplasmique participe à la synthèse des protéines.",
+]
+
+
+def slide(number: int, total: int) -> str:
+    return "\n".join([
+        "Université de Lyon - Biologie cellulaire L1",
+        f"Chapitre 3 · Séance {number}",
+        SENTENCES[number % 4],
+        f"Exemple {number} : observation au microscope optique.",
+        "Document réservé aux étudiants",
+        f"{number} / {total}",
+    ])
+
+
+def test_repeated_headers_footers_and_page_numbers_removed():
+    pages, report = normalize_pages([slide(i, 12) for i in range(1, 13)])
+
+    assert len(pages) == 12
+    assert pages[0] == f"{SENTENCES[1]}\nExemple 1 : observation au microscope optique."
+    assert "Université de Lyon - Biologie cellulaire L1" in report.boilerplate
+    assert "Document réservé aux étudiants" in report.boilerplate
+    assert report.removed_lines == 12 * 4
+    assert report.saved_tokens > 0 and report.saved_ratio > 0.4
+
+
+def test_short_documents_keep_repeated_lines():
+    # Deux pages : rien ne permet de distinguer un en-tête d'un titre ; seuls les numéros partent
+    pages, report = normalize_pages([slide(1, 2), slide(2, 2)])
+    assert pages[0].startswith("Université de Lyon")
+    assert report.removed_lines == 2
+
+
+def test_numbers_in_page_body_kept():
+    table = "Population de la ville\nAnnée\nHabitants\n1999\n58\n2005\n61\nSource : INSEE\n12"
+    steps = "Protocole\nOn mesure la température.\n1\nChauffer\n2\nRefroidir\nOn compare les mesures.\nConclusion"
+    pages, report = normalize_pages([table, steps])
+    # Seul le numéro de page, en pied de page, est retiré
+    assert pages[0] == "Population de la ville\nAnnée\nHabitants\n1999\n58\n2005\n61\nSource : INSEE"
+    assert pages[1] == steps
+    assert report.removed_lines == 1
+
+
+def test_typography_fixes():
+    text = "La photo\u00adsynthèse trans-\nforme l'énergie\u00a0  lumineuse.\n\n\n\nLe dioxy-\nGène est rejeté. Une e\ufb03cace réaction."
+    pages, _ = normalize_pages([text])
+    assert pages == [
+        "La photosynthèse transforme l'énergie lumineuse.\n\nLe dioxy-\nGène est rejeté. Une efficace réaction."
+    ]
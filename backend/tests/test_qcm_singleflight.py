@@ -0,0 +1,146 @@
+# tests/test_qcm_singleflight.py
+import asyncio
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import delete
+
+from app.core.config import QCM_JOB_MAX_TOKENS
+from app.database import async_session_maker
+from app.models import PDF, QCMGenerationLease
+from app.qcm import job
+from app.qcm.extraction import ExtractedDocument
+from app.qcm.singleflight import _flights, acquire_lease, flight_key, lease_progress, release_lease
+
+pytestmark = pytest.mark.anyio
+
+PAGE = (
+    "Le cycle de Krebs oxyde l'acétyl-CoA en dioxyde de carbone dans la matrice mitochondriale. "
+    "Il produit du NADH et du FADH2 qui alimentent la chaîne respiratoire."
+)
+
+
+def test_flight_key():
+    key = flight_key(["a", "b"], 10, 5000, "gpt-4o-mini")
+    assert key == flight_key(["b", "a"], 10, 5000, "gpt-4o-mini")
+    assert key != flight_key(["a", "b"], 20, 5000, "gpt-4o-mini")
+    # Budget différent : autres appels retenus, pas de regroupement
+    assert key != flight_key(["a", "b"], 10, 4000, "gpt-4o-mini")
+    assert key != flight_key(["a", "b"], 10, 5000, "gpt-4o")
+    # Empreinte inconnue : pas de regroupement
+    assert flight_key(["a", None], 10, 5000, "gpt-4o-mini") is None
+    assert flight_key([], 10, 5000, "gpt-4o-mini") is None
+
+
+async def shared_pdf(client, make_user, texts, content_hash):
+    """Un utilisateur et sa copie du PDF partagé (même fichier, même empreinte)"""
+    user, headers = await make_user()
+    path = f"/nonexistent/{content_hash}.pdf"
+    texts[path] = [f"{PAGE} Page {page}, {content_hash}." for page in range(1, 7)]
+    async with async_session_maker() as session:
+        pdf = PDF(filename=path, original_filename="krebs.pdf", filepath=path, file_size=1,
+                  user_id=user.id, content_hash=content_hash)
+        session.add(pdf)
+        await session.commit()
+        return pdf.id, headers
+
+
+def parse(response):
+    assert response.status_code == 200
+    return [orjson.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("short", [False, True])
+async def test_identical_generations_share_llm_calls(client, make_user, monkeypatch, short):
+    texts = {}
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(texts[path]))
+    calls = []
+    generate_questions = job.generate_questions
+
+    async def counting(generator, text, count):
+        calls.append(text)
+        # Appels assez lents pour que les demandes se chevauchent
+        await asyncio.sleep(0.05)
+        generation = await generate_questions(generator, text, count)
+        if short:
+            # Le modèle renvoie moins de questions que demandé : le cache ne couvre pas la demande
+            generation = replace(generation, questions=generation.questions[:1])
+        return generation
+
+    monkeypatch.setattr("app.qcm.job.generate_questions", counting)
+    content_hash = uuid.uuid4().hex * 2
+    students = [await shared_pdf(client, make_user, texts, content_hash) for _ in range(4)]
+
+    responses = await asyncio.gather(*(
+        client.post(f"/qcm/pdf/{pdf_id}/generate", json={"question_count": 6}, headers=headers)
+        for pdf_id, headers in students
+    ))
+    runs = [parse(response) for response in responses]
+
+    plans = [next(event for event in events if event["event"] == "planned") for events in runs]
+    leaders = [events for events in runs if events[0]["event"] != "coalesced"]
+    assert len(leaders) == 1
+    # Chaque morceau n'est envoyé qu'une fois au LLM
+    assert len(calls) == len(set(calls)) == plans[0]["calls"] > 0
+    for events, plan in zip(runs, plans):
+        if events[0]["event"] == "coalesced":
+            assert any(event["event"] == "waiting" for event in events)
+            assert plan["cached_calls"] == plan["calls"]
+        # Chaque étudiant reçoit son propre quiz
+        assert events[-1]["event"] == "done" and len(events[-1]["quiz_ids"]) == 1
+    assert len({events[-1]["quiz_ids"][0] for events in runs}) == len(students)
+    assert not _flights
+
+    async with async_session_maker() as session:
+        key = flight_key([content_hash], 6, QCM_JOB_MAX_TOKENS, job.get_generator().model)
+        assert await session.get(QCMGenerationLease, key) is None
+
+
+async def test_waits_for_lease_held_by_another_worker(client, make_user, monkeypatch):
+    texts = {}
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(texts[path]))
+    monkeypatch.setattr("app.qcm.singleflight.QCM_LEASE_POLL_INTERVAL", 0.02)
+    content_hash = uuid.uuid4().hex * 2
+    pdf_id, headers = await shared_pdf(client, make_user, texts, content_hash)
+    key = flight_key([content_hash], 5, QCM_JOB_MAX_TOKENS, job.get_generator().model)
+
+    async with async_session_maker() as session:
+        session.add(QCMGenerationLease(flight_key=key, owner="other-worker", done_calls=1, total_calls=3,
+                                       expires_at=datetime.utcnow() + timedelta(seconds=60)))
+        await session.commit()
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.1)
+        async with async_session_maker() as session:
+            await session.execute(delete(QCMGenerationLease).where(QCMGenerationLease.flight_key == key))
+            await session.commit()
+
+    response, _ = await asyncio.gather(
+        client.post(f"/qcm/pdf/{pdf_id}/generate", json={"question_count": 5}, headers=headers),
+        other_worker_finishes(),
+    )
+    events = parse(response)
+    assert events[0] == {"event": "coalesced"}
+    assert events[1] == {"event": "waiting", "done": 1, "total": 3}
+    assert events[-1]["event"] == "done" and events[-1]["quiz_ids"]
+
+
+async def test_expired_lease_is_taken_over():
+    key = uuid.uuid4().hex * 2
+    async with async_session_maker() as session:
+        session.add(QCMGenerationLease(flight_key=key, owner="lost-worker",
+                                       expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        await session.commit()
+    assert await lease_progress(key) is None
+
+    assert await acquire_lease(key, "a" * 32)
+    assert await lease_progress(key) == (0, 0)
+    assert not await acquire_lease(key, "b" * 32)
+    # Seul le détenteur rend le bail
+    await release_lease(key, "b" * 32)
+    assert await lease_progress(key) is not None
+    await release_lease(key, "a" * 32)
+    assert await lease_progress(key) is None
@@ -0,0 +1,122 @@
+# tests/test_qcm_structure.py
+import uuid
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.database import async_session_maker
+from app.models import PDF
+from app.qcm.chunking import chunk_document, chunk_pages, chunk_sections
+from app.qcm.job import build_document
+from app.qcm.extraction import FONTS, TEXT, ExtractedDocument, Heading, font_headings, outline_headings
+from app.qcm.structure import split_sections, text_headings
+
+pytestmark = pytest.mark.anyio
+
+BODY = "La cellule échange de la matière avec son milieu par diffusion et par transport actif. "
+
+
+def course(sections: int = 6, sentences: int = 6):
+    """Une page par section : « N. Titre » puis le corps"""
+    return [f"{n}. Notion {n}\n" + BODY * sentences for n in range(1, sections + 1)]
+
+
+def test_outline_headings_follow_nesting():
+    items = [SimpleNamespace(title="Chapitre 1", page=0), [SimpleNamespace(title="1.1 Membrane", page=1)],
+             SimpleNamespace(title="Chapitre 2", page=3)]
+    reader = SimpleNamespace(outline=items, get_destination_page_number=lambda item: item.page)
+    assert outline_headings(reader) == [
+        Heading("Chapitre 1", 1, 1), Heading("1.1 Membrane", 2, 2), Heading("Chapitre 2", 4, 1)
+    ]
+
+
+def test_font_headings_levels_from_sizes():
+    runs = [[
+        ("Chapitre 1 : ", 18.0), ("La cellule\n", 18.0),
+        ("Un long paragraphe de corps de texte qui domine la page.\n", 10.0),
+        ("1.1 Membrane\n", 14.0), ("Encore du corps de texte, assez long lui aussi.", 10.0),
+    ]]
+    assert font_headings(runs) == [Heading("Chapitre 1 : La cellule", 1, 1), Heading("1.1 Membrane", 1, 2)]
+
+
+def test_text_headings_patterns():
+    pages = ["CHAPITRE DEUX\n1.2 La membrane plasmique\n1. voir le schéma\n2. Observer la cellule au microscope.\nPartie II - Génétique"]
+    assert text_headings(pages) == [
+        Heading("CHAPITRE DEUX", 1, 1), Heading("1.2 La membrane plasmique", 1, 2), Heading("Partie II - Génétique", 1, 1)
+    ]
+
+
+def test_sections_split_on_heading_lines():
+    pages = ["Préambule.\nIntroduction\nTexte d'introduction.", "Suite sans titre.\nConclusion\nFin."]
+    headings = [Heading("Introduction", 1), Heading("Titre absent de la page", 2), Heading("Conclusion", 2)]
+    sections = split_sections(pages, headings)
+    assert [(s.title, s.page_start, s.page_end) for s in sections] == [
+        (None, 1, 1), ("Introduction", 1, 1), ("Titre absent de la page", 2, 2), ("Conclusion", 2, 2)
+    ]
+    assert sections[1].paragraphs == [(1, "Introduction Texte d'introduction.")]
+
+
+def test_chunks_align_with_sections():
+    pages = course()
+    chunks, structure = chunk_document(pages, [], "none", max_tokens=260)
+    assert structure == TEXT
+    # Chaque morceau commence par un titre : aucune notion n'est coupée en deux
+    assert all(chunk.text.startswith(f"{chunk.title}") for chunk in chunks)
+    assert [chunk.title for chunk in chunks] == [f"{n}. Notion {n}" for n in range(1, 7, 2)]
+    assert len(chunks) <= len(chunk_pages(pages, 260))
+
+    # Une section plus longue que max_tokens est coupée entre paragraphes, sous son titre
+    long_section = split_sections(["1. Long\n" + "\n\n".join([BODY * 3] * 6)], [Heading("1. Long", 1)])
+    chunks = chunk_sections(long_section, max_tokens=100)
+    assert len(chunks) > 1 and {chunk.title for chunk in chunks} == {"1. Long"}
+
+
+def test_running_header_in_large_font_is_not_a_heading(monkeypatch):
+    pages, headings = [], []
+    for page in range(1, 11):
+        chapter = ["Chapitre 1 Glucides", "Chapitre 2 Lipides"][page > 5] if page in (1, 6) else None
+        pages.append("\n".join(["Biochimie L2", *([chapter] if chapter else []), BODY * 12]))
+        # Polices : l'en-tête courant est aussi gros que les titres de chapitre
+        headings.append(Heading("Biochimie L2", page, 1))
+        if chapter:
+            headings.append(Heading(chapter, page, 1))
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(pages, headings, FONTS))
+
+    document = build_document(1, None, "biochimie.pdf", "/nonexistent/biochimie.pdf")
+    assert document.structure == FONTS
+    assert {chunk.title for chunk in document.chunks} == {"Chapitre 1 Glucides", "Chapitre 2 Lipides"}
+    # Aucun morceau ne franchit le changement de chapitre
+    assert all(chunk.page_end <= 5 or chunk.page_start >= 6 for chunk in document.chunks)
+
+
+async def test_document_chunking_cached_by_content_hash(client, make_user, monkeypatch):
+    calls = []
+
+    def extract(path):
+        calls.append(path)
+        return ExtractedDocument(pages, [Heading(f"{n}. Notion {n}", n) for n in range(1, 7)], FONTS)
+
+    monkeypatch.setattr("app.qcm.job.extract_document", extract)
+    pages = course()
+    user, headers = await make_user()
+    folder_id = (await client.post("/folders/create", json={"name": "Cours"}, headers=headers)).json()["folder_id"]
+    content_hash = uuid.uuid4().hex * 2
+    async with async_session_maker() as session:
+        for name in ("cours.pdf", "copie.pdf"):
+            session.add(PDF(filename=name, original_filename=name, filepath=f"/nonexistent/{name}",
+                            file_size=1, content_hash=content_hash, user_id=user.id, folder_id=folder_id))
+        await session.commit()
+
+    async def planned():
+        response = await client.post(f"/qcm/folders/{folder_id}/generate", json={"question_count": 4}, headers=headers)
+        return next(event for event in map(orjson.loads, response.text.splitlines()) if event["event"] == "planned")
+
+    first = await planned()
+    assert first["structured_documents"] == 2
+    # Deux copies du même fichier : découpé une fois, puis lu depuis le cache
+    assert len(calls) == 1
+    second = await planned()
+    assert len(calls) == 1
+    assert second["chunks"] == first["chunks"]
+    assert second["structured_documents"] == 2
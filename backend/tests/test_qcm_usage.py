@@ -0,0 +1,130 @@
+# tests/test_qcm_usage.py
+import uuid
+from datetime import timedelta
+
+import orjson
+import pytest
+from sqlalchemy import func, select
+from starlette.requests import ClientDisconnect
+
+from app.database import async_session_maker
+from app.db_writer import run_write
+from app.models import PDF, LLMUsage
+from app.responses import NDJSONResponse
+from app.qcm import quota
+from app.qcm.extraction import ExtractedDocument
+from app.qcm.job import run_generation
+from app.qcm.tokens import approximate_tokens, token_cost
+from app.qcm.usage import daily_usage, rebuild_daily_usage, today
+
+pytestmark = pytest.mark.anyio
+
+PAGE = (
+    "La mitose est la division d'une cellule mère en deux cellules filles identiques. "
+    "Pendant la prophase, les chromosomes se condensent et deviennent visibles. "
+    "La métaphase aligne les chromosomes sur la plaque équatoriale."
+)
+
+
+def test_approximate_tokens():
+    assert approximate_tokens("") == 0
+    assert approximate_tokens("le chat dort") == 3
+    assert approximate_tokens("1234567") == 3
+    # Mots longs découpés en sous-mots ; ordre de grandeur d'un texte de cours
+    assert approximate_tokens("anticonstitutionnellement") > 3
+    assert len(PAGE) / 6 < approximate_tokens(PAGE) < len(PAGE) / 3
+
+
+def test_token_cost(monkeypatch):
+    monkeypatch.setattr("app.qcm.tokens.QCM_PROMPT_PRICE_PER_MTOK", 1.0)
+    monkeypatch.setattr("app.qcm.tokens.QCM_COMPLETION_PRICE_PER_MTOK", 4.0)
+    assert token_cost(1_000_000, 500_000) == 3.0
+
+
+async def make_pdf_folder(client, headers, user_id, texts, pages=6):
+    folder_id = (await client.post("/folders/create", json={"name": "Biologie"}, headers=headers)).json()["folder_id"]
+    # Texte propre au test : les morceaux ne sont pas déjà en cache
+    marker = uuid.uuid4().hex
+    path = f"/nonexistent/{marker}.pdf"
+    texts[path] = [f"{PAGE} Page {page}, {marker}." for page in range(1, pages + 1)]
+    async with async_session_maker() as session:
+        session.add(PDF(filename=path, original_filename="cellule.pdf", filepath=path,
+                        file_size=1, user_id=user_id, folder_id=folder_id))
+        await session.commit()
+    return folder_id
+
+
+async def test_usage_recorded_per_job_and_day(client, make_user, monkeypatch):
+    texts = {}
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(texts[path]))
+    user, headers = await make_user()
+    folder_id = await make_pdf_folder(client, headers, user.id, texts)
+
+    response = await client.post(f"/qcm/folders/{folder_id}/generate", json={"question_count": 4}, headers=headers)
+    events = [orjson.loads(line) for line in response.text.splitlines()]
+    planned = next(event for event in events if event["event"] == "planned")
+    done = events[-1]
+    assert planned["estimated_tokens"] > 0 and planned["estimated_cost"] > 0
+    assert done["tokens"] > 0
+
+    async with async_session_maker() as session:
+        calls, tokens = (await session.execute(
+            select(func.count(), func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens))
+            .where(LLMUsage.job_id == done["job_id"])
+        )).one()
+    assert calls == planned["calls"]
+    assert tokens == done["tokens"]
+
+    body = (await client.get("/qcm/usage", headers=headers)).json()
+    assert body["used_today"] == done["tokens"]
+    assert body["days"][0]["calls"] == calls
+    assert body["remaining_today"] == body["daily_limit"] - done["tokens"]
+
+    # Les agrégats reconstruits depuis le journal sont identiques
+    async def rebuild(db):
+        return await rebuild_daily_usage(db, today(), user.id)
+
+    assert await run_write(rebuild) == 1
+    async with async_session_maker() as session:
+        rebuilt = await daily_usage(session, user.id, today() - timedelta(days=1))
+    assert [(day.calls, day.prompt_tokens + day.completion_tokens) for day in rebuilt] == [(calls, done["tokens"])]
+
+
+async def test_quota_enforced_at_admission(client, make_user, monkeypatch):
+    texts = {}
+    monkeypatch.setattr("app.qcm.job.extract_document", lambda path: ExtractedDocument(texts[path]))
+    user, headers = await make_user()
+    folder_id = await make_pdf_folder(client, headers, user.id, texts)
+
+    # Générations simultanées : la place est libérée à la fin de la génération
+    admissions = [quota.Admission(user.id, 1000) for _ in range(quota.QCM_USER_MAX_JOBS)]
+    response = await client.post(f"/qcm/folders/{folder_id}/generate", json={}, headers=headers)
+    assert response.status_code == 429
+    for admission in admissions:
+        admission.release()
+    assert user.id not in quota._jobs
+
+    # Quota quotidien : le budget est réduit au reste, puis la génération est refusée
+    monkeypatch.setattr(quota, "QCM_USER_DAILY_TOKENS", 2000)
+    response = await client.post(f"/qcm/folders/{folder_id}/generate", json={"question_count": 2}, headers=headers)
+    events = [orjson.loads(line) for line in response.text.splitlines()]
+    assert events[1]["event"] == "planned" and events[1]["budget"] == 2000
+    assert events[-1]["tokens"] > 0
+    monkeypatch.setattr(quota, "QCM_USER_DAILY_TOKENS", events[-1]["tokens"] + 500)
+    response = await client.post(f"/qcm/folders/{folder_id}/generate", json={}, headers=headers)
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Quota quotidien de génération atteint"
+
+
+async def test_admission_released_when_stream_never_starts(make_user):
+    user, _ = await make_user()
+    admission = quota.Admission(user.id, 5000)
+    response = NDJSONResponse(run_generation(user.id, [], 4, admission, "QCM"), on_close=admission.release)
+
+    async def send(message):
+        # Client déconnecté avant le premier événement
+        raise OSError("connection reset")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, send)
+    assert user.id not in quota._jobs and user.id not in quota._reserved
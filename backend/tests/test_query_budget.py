@@ -0,0 +1,46 @@
+# tests/test_query_budget.py
+import pytest
+
+from app.database import async_session_maker
+from app.models import Folder, PDF
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed_folders(user_id: int, count: int):
+    async with async_session_maker() as session:
+        for i in range(count):
+            folder = Folder(name=f"Dossier {i}", user_id=user_id)
+            session.add(folder)
+            await session.flush()
+            session.add(Folder(name=f"Sous-dossier {i}", user_id=user_id, parent_id=folder.id))
+            for j in range(i):
+                session.add(PDF(
+                    filename=f"{i}-{j}.pdf", original_filename=f"{i}-{j}.pdf",
+                    filepath="/dev/null", file_size=1, user_id=user_id, folder_id=folder.id
+                ))
+        await session.commit()
+
+
+async def test_pdf_list_query_budget(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+
+    # Authentification (token + utilisateur) puis une requête pour la page
+    with assert_max_queries(3):
+        response = await client.get("/pdf/list", headers=headers)
+    assert response.status_code == 200
+
+
+async def test_folder_list_query_budget_is_constant(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+    await seed_folders(user.id, 10)
+
+    # Authentification, page de dossiers, comptages groupés : indépendant du nombre de dossiers
+    with assert_max_queries(5):
+        response = await client.get("/folders/list", headers=headers)
+    assert response.status_code == 200
+
+    folders = {folder["name"]: folder for folder in response.json()["folders"]}
+    assert len(folders) == 10
+    assert folders["Dossier 3"]["subfolder_count"] == 1
+    assert folders["Dossier 3"]["file_count"] == 3
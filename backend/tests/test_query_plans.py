@@ -0,0 +1,95 @@
+# tests/test_query_plans.py
+# Vérifie via EXPLAIN QUERY PLAN que les requêtes des routes chaudes utilisent un index
+# sur le schéma produit par la chaîne de migrations Alembic.
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.dialects import sqlite
+
+from app.database import run_migrations
+from app.models import AccessToken, Folder, LLMUsage, PDF, Question, QuestionStats, Quiz, User
+from app.quiz.assembly import pool_query
+from app.quiz.scheduler import due_query
+from app.pagination import PageParams, encode_cursor, keyset_query
+
+FIRST_PAGE = PageParams(cursor=None, limit=50)
+NEXT_PAGE = PageParams(cursor=encode_cursor(datetime(2026, 1, 1), 42), limit=50)
+
+# (nom, requête, tri attendu sans tri temporaire)
+HOT_QUERIES = [
+    ("pdf_list", keyset_query(select(PDF).where(PDF.user_id == 1), PDF.upload_date, PDF.id, FIRST_PAGE), True),
+    ("pdf_list_cursor", keyset_query(select(PDF).where(PDF.user_id == 1), PDF.upload_date, PDF.id, NEXT_PAGE), True),
+    ("folder_list_root", keyset_query(
+        select(Folder).where(Folder.user_id == 1, Folder.parent_id == None),
+        Folder.created_at, Folder.id, FIRST_PAGE
+    ), True),
+    ("folder_list_child", keyset_query(
+        select(Folder).where(Folder.user_id == 1, Folder.parent_id == 3),
+        Folder.created_at, Folder.id, NEXT_PAGE
+    ), True),
+    ("folder_subfolders", select(Folder).where(Folder.parent_id == 3), False),
+    ("folder_files", select(PDF).where(PDF.folder_id == 3), False),
+    ("folder_page_subfolder_counts", select(Folder.parent_id, func.count()).where(
+        Folder.parent_id.in_([3, 4, 5])
+    ).group_by(Folder.parent_id), False),
+    ("folder_page_file_counts", select(PDF.folder_id, func.count()).where(
+        PDF.folder_id.in_([3, 4, 5])
+    ).group_by(PDF.folder_id), False),
+    ("token_lookup", select(AccessToken).where(AccessToken.token == "t", AccessToken.is_valid == True), False),
+    ("session_limit", select(AccessToken).where(AccessToken.user_id == 1).order_by(AccessToken.created_at.asc()), False),
+    ("active_sessions", select(AccessToken).where(
+        AccessToken.user_id == 1, AccessToken.is_valid == True
+    ).order_by(AccessToken.created_at.desc()), False),
+    ("revoke_all_sessions", delete(AccessToken).where(AccessToken.user_id == 1), False),
+    ("expired_sessions", delete(AccessToken).where(AccessToken.expires_at < datetime(2026, 1, 1)), False),
+    ("quiz_list", keyset_query(select(Quiz).where(Quiz.user_id == 1), Quiz.created_at, Quiz.id, FIRST_PAGE), True),
+    ("quiz_list_cursor", keyset_query(select(Quiz).where(Quiz.user_id == 1), Quiz.created_at, Quiz.id, NEXT_PAGE), True),
+    ("quiz_questions", select(Question).where(Question.quiz_id == 1).order_by(Question.position), True),
+    ("quiz_stats", select(Question.position, QuestionStats).outerjoin(
+        QuestionStats, QuestionStats.question_id == Question.id
+    ).where(Question.quiz_id == 1).order_by(Question.position), True),
+    ("quiz_stats_rebuild", delete(QuestionStats).where(QuestionStats.quiz_id == 1), False),
+    ("review_due", due_query(1, datetime(2026, 1, 1), 20), True),
+    ("question_pool_pdf", pool_query(1, 3, None), False),
+    ("question_pool_folder", pool_query(1, None, 3), False),
+    ("llm_usage_job", select(LLMUsage).where(LLMUsage.job_id == "0" * 32), False),
+    ("llm_usage_rollup", select(LLMUsage).where(
+        LLMUsage.user_id == 1, LLMUsage.created_at >= datetime(2026, 1, 1)
+    ), False),
+    ("admin_users", keyset_query(select(User), User.created_at, User.id, FIRST_PAGE), True),
+    ("admin_users_cursor", keyset_query(select(User), User.created_at, User.id, NEXT_PAGE), True),
+    ("admin_sessions", keyset_query(
+        select(AccessToken, User).join(User), AccessToken.created_at, AccessToken.id, FIRST_PAGE
+    ), True),
+]
+
+
+@pytest.fixture(scope="module")
+def migrated_connection(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("db") / "plans.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as connection:
+        run_migrations(connection)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def explain(connection, statement):
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+@pytest.mark.parametrize("name,statement,ordered", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_index(migrated_connection, name, statement, ordered):
+    plan = explain(migrated_connection, statement)
+
+    # "SCAN <table>" sans index = parcours complet de la table
+    full_scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step]
+    assert not full_scans, f"{name}: parcours complet {full_scans} dans {plan}"
+
+    # Les listes paginées doivent lire l'index dans l'ordre, sans trier toute la table
+    if ordered:
+        sorts = [step for step in plan if "TEMP B-TREE" in step]
+        assert not sorts, f"{name}: tri temporaire {sorts} dans {plan}"
@@ -0,0 +1,94 @@
+# tests/test_quiz_assembly.py
+from collections import Counter
+from random import Random
+
+import pytest
+
+from app.quiz.assembly import (
+    EASY, HARD, MEDIUM, AssemblyConstraints, InsufficientPool, QuestionPool, apportion, assemble, page_bins
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def make_pool(size: int = 600) -> QuestionPool:
+    # Pages 1 à 100 ; un tiers facile, un tiers difficile, un tiers sans statistiques (moyen)
+    rows = []
+    for i in range(1, size + 1):
+        stats = [(20, 18), (20, 2), (None, None)][i % 3]
+        rows.append((i, f"Question {i}", (i - 1) % 100 + 1, *stats))
+    return QuestionPool(rows, data_version=1)
+
+
+def test_apportion_and_bins():
+    assert apportion(10, (0.3, 0.5, 0.2)) == [3, 5, 2]
+    assert sum(apportion(7, (1, 1, 1))) == 7
+    assert page_bins(1, 100, 4) == [(1, 25), (26, 50), (51, 75), (76, 100)]
+    assert page_bins(3, 4, 5) == [(3, 3), (4, 4)]
+
+
+def test_assembly_respects_constraints():
+    pool = make_pool()
+    excluded = set(range(1, 200))
+    constraints = AssemblyConstraints(question_count=40, page_from=1, page_to=100, page_bins=4)
+    assembly = assemble(pool, constraints, excluded, Random(1))
+
+    assert len(set(assembly.question_ids)) == 40
+    assert not excluded & set(assembly.question_ids)
+    assert assembly.composition == {EASY: 12, MEDIUM: 20, HARD: 8}
+    # Couverture : chaque quart du document est représenté à parts égales
+    quarters = Counter(((question_id - 1) % 100) // 25 for question_id in assembly.question_ids)
+    assert sorted(quarters.values()) == [10, 10, 10, 10]
+
+
+def test_assembly_backfills_then_fails():
+    pool = make_pool(30)
+    # 10 questions difficiles seulement : les autres niveaux complètent
+    assembly = assemble(pool, AssemblyConstraints(question_count=20, difficulty_mix=(0, 0, 1)), set(), Random(2))
+    assert assembly.composition[HARD] == 10
+    assert len(assembly.question_ids) == 20
+
+    with pytest.raises(InsufficientPool) as error:
+        assemble(pool, AssemblyConstraints(question_count=31), set(), Random(2))
+    assert error.value.available == 30
+
+
+def test_pool_deduplicates_copies():
+    pool = QuestionPool([(1, "Capitale ?", 1, 0, 0), (2, "capitale  ?", 1, 0, 0), (3, "Autre", 2, 0, 0)], 1)
+    assert pool.size == 2
+    assert pool.canonical[2] == 1
+
+
+async def test_assemble_from_folder_bank(client, make_user):
+    user, headers = await make_user()
+    folder_id = (await client.post("/folders/create", json={"name": "Cours"}, headers=headers)).json()["folder_id"]
+    questions = [
+        {"text": f"Question {i}", "options": ["A", "B"], "correct": [i % 2], "source_page": i + 1}
+        for i in range(12)
+    ]
+    await client.post("/quizzes", json={"title": "Chapitre 1", "folder_id": folder_id, "questions": questions[:6]},
+                      headers=headers)
+    await client.post("/quizzes", json={"title": "Chapitre 2", "folder_id": folder_id, "questions": questions[6:]},
+                      headers=headers)
+
+    spec = {"title": "Révision", "folder_id": folder_id, "question_count": 8, "seed": 3}
+    response = await client.post("/quizzes/assemble", json=spec, headers=headers)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["question_count"] == 8
+    assert body["pool_size"] == 12
+
+    quiz = (await client.get(f"/quizzes/{body['quiz_id']}", headers=headers)).json()
+    pages = [question["source_page"] for question in quiz["questions"]]
+    assert pages == sorted(pages) and len(set(pages)) == 8
+
+    # Le quiz assemblé recopie la banque : il n'en augmente pas la taille
+    spec["question_count"] = 13
+    response = await client.post("/quizzes/assemble", json=spec, headers=headers)
+    assert response.status_code == 409
+
+
+async def test_assemble_requires_one_source(client, make_user):
+    user, headers = await make_user()
+    response = await client.post("/quizzes/assemble", json={"title": "Révision"}, headers=headers)
+    assert response.status_code == 422
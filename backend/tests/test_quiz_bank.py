@@ -0,0 +1,92 @@
+# tests/test_quiz_bank.py
+import pytest
+
+from app.quiz.encoding import indices_from_mask, mask_from_indices, pack_answers, unpack_answers
+
+pytestmark = pytest.mark.anyio
+
+
+def make_questions(count: int):
+    return [
+        {
+            "text": f"Question {i}",
+            "options": ["A", "B", "C", "D"],
+            "correct": [i % 4] if i % 3 else [0, 2],
+            "explanation": f"Explication {i}",
+            "source_page": i // 10 + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def test_encoding_roundtrip():
+    assert indices_from_mask(mask_from_indices([0, 2, 15])) == [0, 2, 15]
+    assert unpack_answers(pack_answers([1, 5, 0x8000])) == [1, 5, 0x8000]
+    with pytest.raises(ValueError):
+        mask_from_indices([16])
+
+
+async def test_quiz_loads_in_one_query(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+    created = await client.post("/quizzes", json={"title": "Révisions", "questions": make_questions(100)},
+                                headers=headers)
+    assert created.status_code == 201
+    quiz_id = created.json()["quiz_id"]
+
+    # Authentification (token + utilisateur) puis une seule requête pour le quiz et ses 100 questions
+    with assert_max_queries(3):
+        response = await client.get(f"/quizzes/{quiz_id}", params={"include_answers": True}, headers=headers)
+    body = response.json()
+    assert [q["position"] for q in body["questions"]] == list(range(100))
+    assert body["questions"][1]["correct"] == [1]
+    assert body["questions"][0]["correct"] == [0, 2]
+    assert body["questions"][0]["multiple"] is True
+    assert body["questions"][0]["options"] == ["A", "B", "C", "D"]
+
+    hidden = (await client.get(f"/quizzes/{quiz_id}", headers=headers)).json()
+    assert hidden["questions"][1]["correct"] is None
+
+
+async def test_quiz_list_and_delete(client, make_user, assert_max_queries):
+    user, headers = await make_user()
+    pdf_id = (await client.post("/pdf/upload", files={"file": ("cours.pdf", b"%PDF-1.4", "application/pdf")},
+                                headers=headers)).json()["file_id"]
+    for i in range(3):
+        await client.post("/quizzes", json={"title": f"Quiz {i}", "pdf_id": pdf_id if i else None,
+                                            "questions": make_questions(5)}, headers=headers)
+
+    with assert_max_queries(3):
+        listing = await client.get("/quizzes/list", params={"limit": 2}, headers=headers)
+    body = listing.json()
+    assert [q["title"] for q in body["quizzes"]] == ["Quiz 2", "Quiz 1"]
+    assert body["quizzes"][0]["question_count"] == 5
+    assert body["next_cursor"]
+
+    by_pdf = (await client.get("/quizzes/list", params={"pdf_id": pdf_id}, headers=headers)).json()
+    assert by_pdf["count"] == 2
+
+    quiz_id = body["quizzes"][0]["id"]
+    other, other_headers = await make_user()
+    assert (await client.get(f"/quizzes/{quiz_id}", headers=other_headers)).status_code == 404
+    assert (await client.delete(f"/quizzes/{quiz_id}", headers=other_headers)).status_code == 404
+
+    etag = listing.headers["etag"]
+    assert (await client.delete(f"/quizzes/{quiz_id}", headers=headers)).status_code == 200
+    assert (await client.get(f"/quizzes/{quiz_id}", headers=headers)).status_code == 404
+    relisted = await client.get("/quizzes/list", params={"limit": 2}, headers={**headers, "If-None-Match": etag})
+    assert relisted.status_code == 200
+
+
+async def test_invalid_answer_index_rejected(client, make_user):
+    user, headers = await make_user()
+    questions = [{"text": "Q", "options": ["A", "B"], "correct": [2]}]
+    response = await client.post("/quizzes", json={"title": "Quiz", "questions": questions}, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_option_with_separator_rejected(client, make_user):
+    user, headers = await make_user()
+    questions = [{"text": "Q", "options": ["A\x1fB", "C"], "correct": [0]}]
+    response = await client.post("/quizzes", json={"title": "Quiz", "questions": questions}, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "invalid_option"
@@ -0,0 +1,37 @@
+# tests/test_responses.py
+from datetime import datetime
+
+import pytest
+
+from app.database import async_session_maker
+from app.models import Folder, PDF
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_payloads_keep_their_shape(client, make_user):
+    user, headers = await make_user(is_superuser=True)
+    async with async_session_maker() as session:
+        session.add(Folder(name="Biologie", user_id=user.id))
+        session.add(PDF(filename="a.pdf", original_filename="cours.pdf", filepath="/dev/null",
+                        file_size=12, user_id=user.id))
+        await session.commit()
+
+    [pdf] = (await client.get("/pdf/list", headers=headers)).json()["pdfs"]
+    assert set(pdf) == {"id", "filename", "file_size", "uploaded_at"}
+    assert pdf["filename"] == "cours.pdf"
+    datetime.fromisoformat(pdf["uploaded_at"])
+
+    [folder] = (await client.get("/folders/list", headers=headers)).json()["folders"]
+    assert folder["name"] == "Biologie"
+    assert (folder["subfolder_count"], folder["file_count"]) == (0, 0)
+
+    users = (await client.get("/admin/users", params={"limit": 200}, headers=headers)).json()["users"]
+    me = next(u for u in users if u["id"] == user.id)
+    assert me["login_type"] == "password" and me["last_login"] is None
+    datetime.fromisoformat(me["created_at"])
+
+    sessions = (await client.get("/admin/sessions", params={"limit": 200}, headers=headers)).json()["sessions"]
+    mine = next(s for s in sessions if s["user_id"] == user.id)
+    assert mine["user_email"] == user.email
+    datetime.fromisoformat(mine["expires_at"])
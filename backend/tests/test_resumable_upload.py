@@ -0,0 +1,139 @@
+# tests/test_resumable_upload.py
+import base64
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_maker
+from app.models import PDF, UploadSession
+from app.pdf import upload_routes
+from app.pdf.upload_routes import purge_expired_uploads
+from benchmarks.api_seed import make_sample_pdf
+
+pytestmark = pytest.mark.anyio
+
+CHUNK = {"Tus-Resumable": "1.0.0", "Content-Type": "application/offset+octet-stream"}
+
+
+def _metadata(**values) -> str:
+    return ",".join(f"{k} {base64.b64encode(str(v).encode()).decode()}" for k, v in values.items())
+
+
+async def _create(client, headers, content, **metadata):
+    response = await client.post("/pdf/uploads", headers={
+        **headers,
+        "Tus-Resumable": "1.0.0",
+        "Upload-Length": str(len(content)),
+        "Upload-Metadata": _metadata(filename="gros-cours.pdf", **metadata),
+    })
+    assert response.status_code == 201, response.text
+    assert response.headers["upload-offset"] == "0"
+    return response.headers["location"]
+
+
+async def test_upload_in_chunks_with_resume(client, make_user):
+    user, headers = await make_user()
+    created = await client.post("/folders/create", json={"name": "Annales"}, headers=headers)
+    folder_id = created.json()["folder_id"]
+    content = make_sample_pdf() * 20
+    location = await _create(client, headers, content, folder_id=folder_id)
+
+    first = await client.patch(location, content=content[:1000], headers={**headers, **CHUNK, "Upload-Offset": "0"})
+    assert first.status_code == 204
+    assert first.headers["upload-offset"] == "1000"
+
+    # Reprise : le client redemande l'offset avant de continuer
+    status = await client.head(location, headers=headers)
+    assert status.headers["upload-offset"] == "1000"
+    assert status.headers["upload-length"] == str(len(content))
+
+    # Offset périmé : conflit, rien n'est écrit
+    stale = await client.patch(location, content=b"x" * 10, headers={**headers, **CHUNK, "Upload-Offset": "0"})
+    assert stale.status_code == 409
+
+    last = await client.patch(location, content=content[1000:], headers={**headers, **CHUNK, "Upload-Offset": "1000"})
+    assert last.status_code == 204
+    pdf_id = int(last.headers["upload-pdf-id"])
+
+    async with async_session_maker() as session:
+        pdf = await session.get(PDF, pdf_id)
+        assert pdf.folder_id == folder_id
+        assert pdf.file_size == len(content)
+        assert pdf.content_hash == hashlib.sha256(content).hexdigest()
+        assert await session.scalar(select(UploadSession).where(UploadSession.user_id == user.id)) is None
+
+    download = await client.get(f"/pdf/{pdf_id}/file", headers=headers)
+    assert download.content == content
+    assert (await client.head(location, headers=headers)).status_code == 404
+
+
+async def test_concurrent_chunk_from_another_worker(client, make_user, monkeypatch):
+    user, headers = await make_user()
+    content = make_sample_pdf() * 20
+    location = await _create(client, headers, content)
+    upload_id = location.rsplit("/", 1)[-1]
+    append_chunk = upload_routes._append_chunk
+
+    async def racing_append(request, path, offset, remaining):
+        written = await append_chunk(request, path, offset, remaining)
+        # Un autre worker a enregistré un morceau au même offset pendant l'écriture
+        async with async_session_maker() as session:
+            await session.execute(update(UploadSession).where(UploadSession.id == upload_id).values(upload_offset=500))
+            await session.commit()
+        return written
+
+    monkeypatch.setattr(upload_routes, "_append_chunk", racing_append)
+    response = await client.patch(location, content=content, headers={**headers, **CHUNK, "Upload-Offset": "0"})
+    # Le PATCH perdant ne fait pas avancer l'offset et ne crée pas le PDF
+    assert response.status_code == 409
+    assert response.headers["upload-offset"] == "500"
+    async with async_session_maker() as session:
+        assert await session.scalar(select(PDF.id).where(PDF.user_id == user.id)) is None
+
+
+async def test_chunk_beyond_length_and_validation(client, make_user):
+    user, headers = await make_user()
+    content = make_sample_pdf()
+    location = await _create(client, headers, content)
+
+    too_long = await client.patch(location, content=content + b"extra", headers={**headers, **CHUNK, "Upload-Offset": "0"})
+    assert too_long.status_code == 413
+
+    wrong_type = await client.patch(location, content=content, headers={**headers, "Upload-Offset": "0"})
+    assert wrong_type.status_code == 415
+
+    other, other_headers = await make_user()
+    assert (await client.head(location, headers=other_headers)).status_code == 404
+
+    not_pdf = await client.post("/pdf/uploads", headers={
+        **headers, "Upload-Length": "10", "Upload-Metadata": _metadata(filename="notes.txt"),
+    })
+    assert not_pdf.status_code == 400
+
+
+async def test_expired_uploads_are_purged(client, make_user):
+    user, headers = await make_user()
+    location = await _create(client, headers, make_sample_pdf())
+    upload_id = location.rsplit("/", 1)[1]
+
+    async with async_session_maker() as session:
+        upload = await session.get(UploadSession, upload_id)
+        assert os.path.exists(upload.filepath)
+        await session.execute(update(UploadSession).where(UploadSession.id == upload_id)
+                              .values(expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        await session.commit()
+
+    assert (await client.head(location, headers=headers)).status_code == 410
+    assert await purge_expired_uploads() >= 1
+    assert not os.path.exists(upload.filepath)
+    assert (await client.head(location, headers=headers)).status_code == 404
+
+
+async def test_cancel_upload(client, make_user):
+    user, headers = await make_user()
+    location = await _create(client, headers, make_sample_pdf())
+    assert (await client.delete(location, headers=headers)).status_code == 204
+    assert (await client.head(location, headers=headers)).status_code == 404
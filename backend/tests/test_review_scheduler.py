@@ -0,0 +1,104 @@
+# tests/test_review_scheduler.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session_maker
+from app.models import ReviewCard
+from app.quiz.scheduler import QUALITY_CORRECT, QUALITY_WRONG, CardState, fold_reviews, review
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = [
+    {"text": "Capitale de la France ?", "options": ["Lyon", "Paris"], "correct": [1]},
+    {"text": "Nombres pairs ?", "options": ["1", "2", "3", "4"], "correct": [1, 3]},
+]
+
+
+def test_sm2_intervals():
+    state = CardState()
+    intervals = []
+    for _ in range(4):
+        state = review(state, QUALITY_CORRECT)
+        intervals.append(state.interval_days)
+    assert intervals == [1.0, 6.0, 15.0, 38.0]
+    assert state.repetitions == 4
+
+    state = review(state, QUALITY_WRONG)
+    assert (state.interval_days, state.repetitions, state.lapses) == (0.0, 0, 1)
+    assert state.ease < 2.5
+
+
+def test_fold_applies_answers_in_order():
+    changed = fold_reviews({}, [(1, True), (2, False), (1, True)])
+    assert changed[1].repetitions == 2
+    assert changed[2].repetitions == 0
+
+
+async def test_attempt_schedules_reviews(client, make_user):
+    user, headers = await make_user()
+    quiz_id = (await client.post("/quizzes", json={"title": "Révisions", "questions": QUESTIONS},
+                                 headers=headers)).json()["quiz_id"]
+
+    # Q0 juste (revue demain), Q1 fausse (revue dans quelques minutes)
+    await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[1], [1]]}, headers=headers)
+    response = await client.get("/reviews/due", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+
+    async with async_session_maker() as session:
+        await session.execute(
+            update(ReviewCard).where(ReviewCard.user_id == user.id, ReviewCard.repetitions == 0)
+            .values(due_at=datetime.utcnow() - timedelta(minutes=1))
+        )
+        await session.commit()
+
+    due = (await client.get("/reviews/due", headers=headers)).json()["reviews"]
+    assert [item["text"] for item in due] == ["Nombres pairs ?"]
+    assert due[0]["multiple"] is True
+    assert "correct" not in due[0]
+
+    response = await client.post("/reviews", json={"reviews": [
+        {"question_id": due[0]["question_id"], "answers": [1, 3]}
+    ]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["correct"] is True
+    assert (await client.get("/reviews/due", headers=headers)).json()["count"] == 0
+
+
+async def test_batch_submission_leaves_review_cards_alone(client, make_user):
+    user, headers = await make_user()
+    quiz_id = (await client.post("/quizzes", json={"title": "Révisions", "questions": QUESTIONS},
+                                 headers=headers)).json()["quiz_id"]
+    await client.post(f"/quizzes/{quiz_id}/attempts", json={"answers": [[1], [1]]}, headers=headers)
+
+    async def cards():
+        async with async_session_maker() as session:
+            rows = await session.execute(
+                select(ReviewCard.question_id, ReviewCard.interval_days, ReviewCard.ease,
+                       ReviewCard.repetitions, ReviewCard.due_at)
+                .where(ReviewCard.user_id == user.id).order_by(ReviewCard.question_id)
+            )
+            return rows.all()
+
+    before = await cards()
+    assert len(before) == 2 and before[0].repetitions == 1
+
+    # Copies de toute une classe, enregistrées au nom de l'enseignant : pas des révisions
+    batch = {"attempts": [{"answers": [[1], [1, 3]]}] * 500}
+    response = await client.post(f"/quizzes/{quiz_id}/attempts/batch", json=batch, headers=headers)
+    assert response.status_code == 201
+    assert await cards() == before
+
+
+async def test_review_of_other_user_question(client, make_user):
+    _, owner_headers = await make_user()
+    _, other_headers = await make_user()
+    quiz_id = (await client.post("/quizzes", json={"title": "Quiz", "questions": QUESTIONS},
+                                 headers=owner_headers)).json()["quiz_id"]
+    question_id = (await client.get(f"/quizzes/{quiz_id}", headers=owner_headers)).json()["questions"][0]["id"]
+
+    response = await client.post("/reviews", json={"reviews": [{"question_id": question_id, "answers": [1]}]},
+                                 headers=other_headers)
+    assert response.status_code == 404